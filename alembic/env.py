@@ -9,14 +9,15 @@ from app.models import Base
 # from app.models.asset import Asset
 # from app.models.other_model import OtherModel
 
-from app.config import DATABASE_URL
+from app.database import database_url
+from app.models.asset_search import is_search_object
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
 
-# Set the sqlalchemy.url in the alembic config
-config.set_main_option('sqlalchemy.url', DATABASE_URL)
+# Set the sqlalchemy.url in the alembic config (same driver and sslmode as the app)
+config.set_main_option('sqlalchemy.url', database_url().replace('%', '%%'))
 
 # Interpret the config file for Python logging.
 if config.config_file_name is not None:
@@ -25,11 +26,28 @@ if config.config_file_name is not None:
 # add your model's MetaData object here
 target_metadata = Base.metadata
 
+def created_on_this_dialect(object) -> bool:
+    # Model objects limited to other dialects with ddl_if() (the PostgreSQL
+    # partial index) are never created here, so autogenerate must not propose them
+    ddl_if = getattr(object, "_ddl_if", None)
+    if ddl_if is None or ddl_if.dialect is None:
+        return True
+    dialects = [ddl_if.dialect] if isinstance(ddl_if.dialect, str) else ddl_if.dialect
+    return context.get_context().dialect.name in dialects
+
+def include_object(object, name, type_, reflected, compare_to):
+    # The full-text search tables, column and indexes come from raw DDL, not
+    # the models, so autogenerate must not propose dropping them
+    if is_search_object(name, type_):
+        return False
+    return reflected or created_on_this_dialect(object)
+
 def run_migrations_offline() -> None:
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -48,6 +66,7 @@ def run_migrations_online() -> None:
         context.configure(
             connection=connection, 
             target_metadata=target_metadata,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
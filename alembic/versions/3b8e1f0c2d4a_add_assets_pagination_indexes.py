@@ -0,0 +1,29 @@
+"""add_assets_pagination_indexes
+
+Revision ID: 3b8e1f0c2d4a
+Revises: c5f5cf94cff3
+Create Date: 2026-10-18 09:12:41.530219
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b8e1f0c2d4a'
+down_revision: Union[str, None] = 'c5f5cf94cff3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_assets_facility_status_id', 'assets', ['facility_name', 'status', 'id'])
+    op.create_index('ix_assets_status_id', 'assets', ['status', 'id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_assets_status_id', table_name='assets')
+    op.drop_index('ix_assets_facility_status_id', table_name='assets')
@@ -0,0 +1,34 @@
+"""add_warranty_expiry_indexes
+
+Revision ID: 4f1d8b62a7c3
+Revises: e3a9c71f2b58
+Create Date: 2026-10-18 14:22:09.846120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f1d8b62a7c3'
+down_revision: Union[str, None] = 'e3a9c71f2b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_assets_facility_warranty_expiry', 'assets', ['facility_name', 'warranty_expiry', 'id'])
+    if op.get_bind().dialect.name == 'postgresql':
+        op.create_index('ix_assets_active_facility_warranty_expiry', 'assets',
+                        ['facility_name', 'warranty_expiry', 'id'],
+                        postgresql_where=sa.text("status = 'ACTIVE'"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_assets_active_facility_warranty_expiry', table_name='assets')
+    op.drop_index('ix_assets_facility_warranty_expiry', table_name='assets')
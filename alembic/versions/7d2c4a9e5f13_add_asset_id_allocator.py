@@ -0,0 +1,46 @@
+"""add_asset_id_allocator
+
+Revision ID: 7d2c4a9e5f13
+Revises: 3b8e1f0c2d4a
+Create Date: 2026-10-18 10:24:07.118342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2c4a9e5f13'
+down_revision: Union[str, None] = '3b8e1f0c2d4a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    allocator = op.create_table('asset_id_allocator',
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('next_value', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+    # Continue numbering after the highest existing ASTnnnn id
+    bind = op.get_bind()
+    highest = bind.execute(sa.text(
+        "SELECT MAX(CAST(SUBSTR(asset_id, 4) AS INTEGER)) FROM assets WHERE asset_id LIKE 'AST%'"
+    )).scalar() or 0
+
+    if bind.dialect.name == 'postgresql':
+        op.execute(sa.schema.CreateSequence(sa.Sequence('asset_id_seq', start=1, increment=1)))
+        bind.execute(sa.text("SELECT setval('asset_id_seq', :value, false)"), {"value": highest + 1})
+
+    op.bulk_insert(allocator, [{'name': 'asset', 'next_value': highest + 1}])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(sa.schema.DropSequence(sa.Sequence('asset_id_seq')))
+    op.drop_table('asset_id_allocator')
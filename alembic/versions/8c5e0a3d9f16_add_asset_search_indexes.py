@@ -0,0 +1,75 @@
+"""add_asset_search_indexes
+
+Revision ID: 8c5e0a3d9f16
+Revises: 4f1d8b62a7c3
+Create Date: 2026-10-18 15:37:52.410963
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c5e0a3d9f16'
+down_revision: Union[str, None] = '4f1d8b62a7c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Words are indexed for these columns; serial numbers get a trigram index
+COLUMNS = "asset_name, manufacturer, model, supplier"
+NEW_VALUES = "new.asset_name, new.manufacturer, new.model, new.supplier"
+OLD_VALUES = "old.asset_name, old.manufacturer, old.model, old.supplier"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.execute(
+            "ALTER TABLE assets ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (to_tsvector('simple', "
+            "coalesce(asset_name, '') || ' ' || coalesce(manufacturer, '') || ' ' || coalesce(model, '') || ' ' || "
+            "coalesce(supplier, ''))) STORED"
+        )
+        op.execute("CREATE INDEX ix_assets_search_vector ON assets USING gin (search_vector)")
+        op.execute("CREATE INDEX ix_assets_serial_number_trgm ON assets USING gin (serial_number gin_trgm_ops)")
+    elif dialect == 'sqlite':
+        op.execute(
+            f"CREATE VIRTUAL TABLE assets_fts USING fts5({COLUMNS}, content='assets', content_rowid='id', prefix='2 3')"
+        )
+        op.execute(
+            "CREATE VIRTUAL TABLE assets_serial_fts USING fts5("
+            "serial_number, content='assets', content_rowid='id', tokenize='trigram')"
+        )
+        op.execute(f"""CREATE TRIGGER assets_fts_insert AFTER INSERT ON assets BEGIN
+            INSERT INTO assets_fts(rowid, {COLUMNS}) VALUES (new.id, {NEW_VALUES});
+            INSERT INTO assets_serial_fts(rowid, serial_number) VALUES (new.id, new.serial_number);
+        END""")
+        op.execute(f"""CREATE TRIGGER assets_fts_delete AFTER DELETE ON assets BEGIN
+            INSERT INTO assets_fts(assets_fts, rowid, {COLUMNS}) VALUES ('delete', old.id, {OLD_VALUES});
+            INSERT INTO assets_serial_fts(assets_serial_fts, rowid, serial_number) VALUES ('delete', old.id, old.serial_number);
+        END""")
+        op.execute(f"""CREATE TRIGGER assets_fts_update AFTER UPDATE OF {COLUMNS}, serial_number ON assets BEGIN
+            INSERT INTO assets_fts(assets_fts, rowid, {COLUMNS}) VALUES ('delete', old.id, {OLD_VALUES});
+            INSERT INTO assets_serial_fts(assets_serial_fts, rowid, serial_number) VALUES ('delete', old.id, old.serial_number);
+            INSERT INTO assets_fts(rowid, {COLUMNS}) VALUES (new.id, {NEW_VALUES});
+            INSERT INTO assets_serial_fts(rowid, serial_number) VALUES (new.id, new.serial_number);
+        END""")
+        # Index the rows that are already there
+        op.execute("INSERT INTO assets_fts(assets_fts) VALUES ('rebuild')")
+        op.execute("INSERT INTO assets_serial_fts(assets_serial_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute("DROP INDEX ix_assets_serial_number_trgm")
+        op.execute("DROP INDEX ix_assets_search_vector")
+        op.execute("ALTER TABLE assets DROP COLUMN search_vector")
+    elif dialect == 'sqlite':
+        for trigger in ('assets_fts_insert', 'assets_fts_delete', 'assets_fts_update'):
+            op.execute(f"DROP TRIGGER {trigger}")
+        op.execute("DROP TABLE assets_serial_fts")
+        op.execute("DROP TABLE assets_fts")
@@ -0,0 +1,30 @@
+"""add_assets_version_and_updated_at
+
+Revision ID: 9a4f6b1d8c27
+Revises: 7d2c4a9e5f13
+Create Date: 2026-10-18 11:02:55.604117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4f6b1d8c27'
+down_revision: Union[str, None] = '7d2c4a9e5f13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('assets', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('assets', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('assets', 'updated_at')
+    op.drop_column('assets', 'version')
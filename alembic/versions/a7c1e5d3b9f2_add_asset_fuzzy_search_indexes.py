@@ -0,0 +1,61 @@
+"""add_asset_fuzzy_search_indexes
+
+Revision ID: a7c1e5d3b9f2
+Revises: d41f7a2c9e60
+Create Date: 2026-10-18 21:04:17.226531
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c1e5d3b9f2'
+down_revision: Union[str, None] = 'd41f7a2c9e60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Trigrams of these columns let /search find misspelt words
+COLUMNS = "asset_name, manufacturer, model, supplier"
+NEW_VALUES = "new.asset_name, new.manufacturer, new.model, new.supplier"
+OLD_VALUES = "old.asset_name, old.manufacturer, old.model, old.supplier"
+SEARCH_TEXT = (
+    "coalesce(asset_name, '') || ' ' || coalesce(manufacturer, '') || ' ' || coalesce(model, '') || ' ' || "
+    "coalesce(supplier, '')"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute(f"CREATE INDEX ix_assets_search_text_trgm ON assets USING gin (({SEARCH_TEXT}) gin_trgm_ops)")
+    elif dialect == 'sqlite':
+        op.execute(
+            f"CREATE VIRTUAL TABLE assets_text_fts USING fts5({COLUMNS}, content='assets', content_rowid='id', "
+            "tokenize='trigram')"
+        )
+        op.execute(f"""CREATE TRIGGER assets_text_fts_insert AFTER INSERT ON assets BEGIN
+            INSERT INTO assets_text_fts(rowid, {COLUMNS}) VALUES (new.id, {NEW_VALUES});
+        END""")
+        op.execute(f"""CREATE TRIGGER assets_text_fts_delete AFTER DELETE ON assets BEGIN
+            INSERT INTO assets_text_fts(assets_text_fts, rowid, {COLUMNS}) VALUES ('delete', old.id, {OLD_VALUES});
+        END""")
+        op.execute(f"""CREATE TRIGGER assets_text_fts_update AFTER UPDATE OF {COLUMNS} ON assets BEGIN
+            INSERT INTO assets_text_fts(assets_text_fts, rowid, {COLUMNS}) VALUES ('delete', old.id, {OLD_VALUES});
+            INSERT INTO assets_text_fts(rowid, {COLUMNS}) VALUES (new.id, {NEW_VALUES});
+        END""")
+        # Index the rows that are already there
+        op.execute("INSERT INTO assets_text_fts(assets_text_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute("DROP INDEX ix_assets_search_text_trgm")
+    elif dialect == 'sqlite':
+        for trigger in ('assets_text_fts_insert', 'assets_text_fts_delete', 'assets_text_fts_update'):
+            op.execute(f"DROP TRIGGER {trigger}")
+        op.execute("DROP TABLE assets_text_fts")
@@ -0,0 +1,68 @@
+"""create_asset_import_tables
+
+Revision ID: d41f7a2c9e60
+Revises: 8c5e0a3d9f16
+Create Date: 2026-10-18 19:12:40.583127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41f7a2c9e60'
+down_revision: Union[str, None] = '8c5e0a3d9f16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    status_enum = postgresql.ENUM('ACTIVE', 'INACTIVE', name='status', create_type=False)
+    op.create_table('asset_imports',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('created_by', sa.String(), nullable=False),
+        sa.Column('rows_read', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('rows_invalid', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('rows_duplicate', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('rows_imported', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('error', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('asset_import_rows',
+        sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), autoincrement=True, nullable=False),
+        sa.Column('import_id', sa.Integer(), nullable=False),
+        sa.Column('row_number', sa.Integer(), nullable=False),
+        sa.Column('asset_name', sa.String(), nullable=True),
+        sa.Column('value', sa.Numeric(), nullable=True),
+        sa.Column('purchase_date', sa.Date(), nullable=True),
+        sa.Column('manufacturer', sa.String(), nullable=True),
+        sa.Column('model', sa.String(), nullable=True),
+        sa.Column('serial_number', sa.String(), nullable=True),
+        sa.Column('supplier', sa.String(), nullable=True),
+        sa.Column('warranty', sa.Integer(), nullable=True),
+        sa.Column('warranty_expiry', sa.Date(), nullable=True),
+        sa.Column('status', status_enum, nullable=True),
+        sa.Column('facility_name', sa.String(), nullable=True),
+        sa.Column('error', sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_asset_import_rows_import_row', 'asset_import_rows', ['import_id', 'row_number'])
+    op.create_index('ix_asset_import_rows_import_serial', 'asset_import_rows', ['import_id', 'serial_number', 'row_number'])
+    if op.get_bind().dialect.name == 'postgresql':
+        # Staging only: skip the WAL for bulk loads (contents are lost on a crash)
+        op.execute("ALTER TABLE asset_import_rows SET UNLOGGED")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_asset_import_rows_import_serial', table_name='asset_import_rows')
+    op.drop_index('ix_asset_import_rows_import_row', table_name='asset_import_rows')
+    op.drop_table('asset_import_rows')
+    op.drop_table('asset_imports')
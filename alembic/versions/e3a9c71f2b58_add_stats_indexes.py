@@ -0,0 +1,31 @@
+"""add_stats_indexes
+
+Revision ID: e3a9c71f2b58
+Revises: b6e2d5a0f941
+Create Date: 2026-10-18 13:05:40.517238
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a9c71f2b58'
+down_revision: Union[str, None] = 'b6e2d5a0f941'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_assets_manufacturer', 'assets', ['manufacturer'],
+                    postgresql_include=['value', 'warranty_expiry'])
+    op.create_index('ix_assets_purchase_date', 'assets', ['purchase_date'],
+                    postgresql_include=['value', 'warranty_expiry'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_assets_purchase_date', table_name='assets')
+    op.drop_index('ix_assets_manufacturer', table_name='assets')
@@ -1,100 +1,570 @@
+from sqlalchemy import case, delete, false, func, insert, literal, or_, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from datetime import datetime
-from app.models.assets import Asset
-from app.schemas.assets import AssetCreate
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Iterator, List, Optional, Tuple
+import base64
+import binascii
+from app.models.assets import Asset, Status
+from app.config import settings
+from app.schemas.assets import AssetCreate, AssetResponse
+from app.id_allocator import asset_id_allocator
+from app.facility_index import facility_index
+from app.asset_cache import asset_cache
+from app.asset_stats import asset_stats, group_key, summarize
+from app.search import search_hits
+from app.utils.etag import if_match_versions
+from app.utils.export import to_json_value
+from app.utils.single_flight import SingleFlight
+from app.change_feed import CREATE, UPDATE, DELETE, asset_payload, change_notifier, record_changes
+from app.change_broker import change_broker, change_event
+from app.models.asset_changes import AssetChange
 from fastapi import HTTPException, status
 
+# Asset columns in the same order as the AssetResponse fields
+RESPONSE_COLUMNS = [Asset.__table__.c[name] for name in AssetResponse.model_fields]
+# What the asset cache holds: the response plus the revision for ETags
+CACHED_COLUMNS = RESPONSE_COLUMNS + [Asset.__table__.c.version]
+RESPONSE_FIELDS = [column.name for column in RESPONSE_COLUMNS]
+# List endpoints: the cached columns plus the primary key for cursors
+LIST_COLUMNS = CACHED_COLUMNS + [Asset.__table__.c.id]
+
+PRECONDITION_FAILED = "Asset was modified by another request"
+
+# Concurrent identical reads (GET /{id}, /get/all) share one query; writes
+# make later reads start afresh
+asset_reads = SingleFlight(enabled=settings.READ_COALESCING)
+
+# INSERT constructs with ON CONFLICT DO NOTHING, by dialect name
+CONFLICT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def is_serial_conflict(error: IntegrityError) -> bool:
+    """
+    Whether error is a duplicate serial number, going by the violated
+    constraint's name where the driver reports it, else by the message.
+    """
+    diag = getattr(error.orig, "diag", None)
+    return "serial_number" in (getattr(diag, "constraint_name", None) or str(error.orig))
+
+
 class AssetCRUD:
     @staticmethod
-    def create_asset(db: Session, asset: AssetCreate) -> Asset:
-        # Get the last asset and extract the numeric part of the ID
-        last_asset = db.query(Asset).order_by(Asset.id.desc()).first()
-        
-        if last_asset:
-            try:
-                # Try to extract number after 'AST'
-                if last_asset.asset_id.startswith("AST"):
-                    last_id = int(last_asset.asset_id[3:])
-                    next_id = last_id + 1
-                else:
-                    # If the format is different, start with 1
-                    next_id = 1
-            except (ValueError, IndexError):
-                # If there's any error parsing the ID, start with 1
-                next_id = 1
+    def create_asset(db: Session, asset: AssetCreate):
+        """
+        Insert one asset with a single INSERT ... RETURNING. A duplicate serial
+        number is caught by the unique index (ON CONFLICT DO NOTHING where the
+        dialect has it) instead of a SELECT beforehand.
+        """
+        # Taken from this worker's reserved block, no round trip in the common case
+        new_asset_id = asset_id_allocator.next_id(db)
+        table = Asset.__table__
+        insert_ignoring = CONFLICT_INSERTS.get(db.get_bind().dialect.name)
+        if insert_ignoring is not None:
+            stmt = insert_ignoring(table).on_conflict_do_nothing(index_elements=[table.c.serial_number])
         else:
-            next_id = 1
-        
-        new_asset_id = f"AST{str(next_id).zfill(4)}"  # Format: AST0001, AST0002, etc.
-
-        # Check if serial number already exists
-        existing_serial_number = db.query(Asset).filter(Asset.serial_number == asset.serial_number).first()
+            stmt = insert(table)
+        stmt = stmt.values(asset_id=new_asset_id, **asset.model_dump()).returning(*CACHED_COLUMNS)
 
-        if existing_serial_number:
+        try:
+            db_asset = db.execute(stmt).first()
+        except IntegrityError as error:
+            db.rollback()
+            # With ON CONFLICT a duplicate serial number returns no row, so this
+            # is another constraint (e.g. an asset_id already taken): let it
+            # surface, and don't hand the id out again
+            if insert_ignoring is not None or not is_serial_conflict(error):
+                raise
+            db_asset = None
+        if db_asset is None:
+            db.rollback()
+            # Nothing was inserted, so the id can go to the next asset
+            asset_id_allocator.release(new_asset_id)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Asset with this Serial Number already exists"
             )
 
-        db_asset = Asset(
-            asset_id=new_asset_id,
-            asset_name=asset.asset_name,
-            value=asset.value,
-            purchase_date=asset.purchase_date,
-            manufacturer=asset.manufacturer,
-            model=asset.model,
-            serial_number=asset.serial_number,
-            supplier=asset.supplier,
-            warranty=asset.warranty,
-            warranty_expiry=asset.warranty_expiry,
-            status=asset.status,
-            facility_name=asset.facility_name
-        )
-        
-        db.add(db_asset)
+        change = {
+            "asset_id": new_asset_id,
+            "operation": CREATE,
+            "version": db_asset.version,
+            "payload": asset_payload(db_asset._mapping, RESPONSE_FIELDS),
+        }
+        record_changes(db, [change])
         db.commit()
-        db.refresh(db_asset)
-        
+        facility_index.add(db_asset.facility_name)
+        asset_stats.invalidate()
+        asset_reads.forget()
+        change_notifier.notify()
+        change_broker.publish([change_event(change)])
         return db_asset
 
     @staticmethod
-    def update_asset(db: Session, id: str, asset: AssetCreate) -> Asset:
-        # Filter by asset_id (string) instead of id (integer)
-        db_asset = db.query(Asset).filter(Asset.asset_id == id).first()
-        if not db_asset:
-            raise HTTPException(status_code=404, detail="Asset not found")
-        
-        for key, value in asset.dict(exclude_unset=True).items():
-            setattr(db_asset, key, value)
-        
+    def create_assets(db: Session, assets: List[AssetCreate]) -> List[dict]:
+        """
+        Create many assets in one transaction.
+
+        Serial numbers are checked with a single IN query, ids are reserved in
+        one step and the rows go in as one multi-row INSERT ... RETURNING.
+        Returns one result per input item, in input order.
+        """
+        # Reserved before the session's first query (see AssetIdBlockAllocator);
+        # ids left over by rejected items are handed back below
+        asset_ids = asset_id_allocator.reserve(db, len(assets))
+        serial_numbers = {asset.serial_number for asset in assets}
+        taken = set(db.scalars(
+            select(Asset.serial_number).where(Asset.serial_number.in_(serial_numbers))
+        ))
+
+        results = []
+        rows = []
+        for index, asset in enumerate(assets):
+            if asset.serial_number in taken:
+                results.append({
+                    "index": index,
+                    "success": False,
+                    "error": "Asset with this Serial Number already exists"
+                })
+                continue
+            # Later duplicates inside the same batch are rejected too
+            taken.add(asset.serial_number)
+            results.append({"index": index, "success": True})
+            rows.append(asset.model_dump())
+
+        for row, asset_id in zip(rows, asset_ids):
+            row["asset_id"] = asset_id
+        asset_id_allocator.release(*asset_ids[len(rows):])
+        if not rows:
+            return results
+
+        try:
+            # Plain rows rather than ORM objects, which commit() would expire
+            created = db.execute(
+                insert(Asset.__table__).returning(*RESPONSE_COLUMNS, sort_by_parameter_order=True),
+                rows
+            ).mappings().all()
+            changes = [
+                {
+                    "asset_id": row["asset_id"],
+                    "operation": CREATE,
+                    "version": 1,
+                    "payload": asset_payload(row, RESPONSE_FIELDS),
+                }
+                for row in created
+            ]
+            record_changes(db, changes)
+            db.commit()
+        except IntegrityError as error:
+            db.rollback()
+            if not is_serial_conflict(error):
+                raise
+            # A concurrent request took one of the serial numbers after our check
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Asset with this Serial Number already exists"
+            )
+
+        for row in created:
+            facility_index.add(row["facility_name"])
+        asset_stats.invalidate()
+        asset_reads.forget()
+        change_notifier.notify()
+        change_broker.publish([change_event(change) for change in changes])
+
+        created = iter(created)
+        for result in results:
+            if result["success"]:
+                result["asset"] = next(created)
+        return results
+
+    @staticmethod
+    def missing_or_stale(db: Session, id: str, versions: Optional[List[int]]) -> HTTPException:
+        """
+        Why a guarded write matched no row: 412 if the asset exists but is
+        not at a revision If-Match accepts, otherwise 404.
+        """
+        if versions is not None and db.scalar(select(literal(1)).where(Asset.asset_id == id)) is not None:
+            return HTTPException(
+                status_code=status.HTTP_412_PRECONDITION_FAILED,
+                detail=PRECONDITION_FAILED
+            )
+        return HTTPException(status_code=404, detail="Asset not found")
+
+    @staticmethod
+    def update_asset(db: Session, id: str, asset: AssetCreate, if_match: Optional[str] = None):
+        """
+        Apply the update with one UPDATE ... RETURNING. If-Match becomes a
+        version condition in the WHERE clause, and the revision only moves
+        when a value actually changes, as with the ORM's change tracking.
+        """
+        table = Asset.__table__
+        values = asset.model_dump(exclude_unset=True)
+        changed = or_(*(table.c[key].is_distinct_from(value) for key, value in values.items()))
+        versions = if_match_versions(if_match, id)
+        old_row = None
+
+        stmt = update(table).values(
+            **values,
+            version=case((changed, table.c.version + 1), else_=table.c.version),
+            updated_at=case((changed, func.now()), else_=table.c.updated_at),
+        )
+        if versions is not None:
+            stmt = stmt.where(table.c.version.in_(versions))
+        if db.get_bind().dialect.name == "postgresql":
+            # RETURNING can read the pre-update row from a joined, locked copy
+            old = (
+                select(table.c.id, table.c.facility_name, table.c.status)
+                .where(table.c.asset_id == id)
+                .with_for_update()
+                .subquery("old")
+            )
+            stmt = stmt.where(table.c.id == old.c.id).returning(
+                *CACHED_COLUMNS,
+                old.c.facility_name.label("old_facility_name"),
+                old.c.status.label("old_status"),
+            )
+        else:
+            # Other backends only return the new row; SQLite is in-process, so
+            # the extra read costs no round trip
+            old_row = db.execute(
+                select(table.c.facility_name.label("old_facility_name"), table.c.status.label("old_status"))
+                .where(table.c.asset_id == id)
+            ).first()
+            stmt = stmt.where(table.c.asset_id == id).returning(*CACHED_COLUMNS)
+
+        try:
+            db_asset = db.execute(stmt).first()
+        except IntegrityError as error:
+            db.rollback()
+            if not is_serial_conflict(error):
+                raise
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Asset with this Serial Number already exists"
+            )
+        if db_asset is None:
+            db.rollback()
+            raise AssetCRUD.missing_or_stale(db, id, versions)
+        old = (old_row or db_asset)._mapping
+        old_facility_name = old["old_facility_name"]
+        # Sent with the event so filtered /stream subscribers see assets leave their view
+        old_status = asset_payload(old, ["old_status"])["old_status"]
+
+        change = {
+            "asset_id": id,
+            "operation": UPDATE,
+            "version": db_asset.version,
+            # Submitted values as given, like the ORM object used to hold them
+            "payload": asset_payload({**db_asset._mapping, **values}, RESPONSE_FIELDS),
+        }
+        record_changes(db, [change])
         db.commit()
-        db.refresh(db_asset)
+        asset_cache.delete(id)
+        facility_index.move(old_facility_name, db_asset.facility_name)
+        asset_stats.invalidate()
+        asset_reads.forget()
+        change_notifier.notify()
+        change_broker.publish([change_event(change, previous_facility_name=old_facility_name, previous_status=old_status)])
         return db_asset
 
     @staticmethod
-    def delete_asset(db: Session, id: str) -> dict:
-        # Filter by asset_id instead of id
-        db_asset = db.query(Asset).filter(Asset.asset_id == id).first()
-        if not db_asset:
-            raise HTTPException(status_code=404, detail="Asset not found")
-        
-        db.delete(db_asset)
+    def delete_asset(db: Session, id: str, if_match: Optional[str] = None) -> dict:
+        """Remove the asset with one DELETE ... RETURNING, If-Match checked in its WHERE clause."""
+        table = Asset.__table__
+        versions = if_match_versions(if_match, id)
+        stmt = (
+            delete(table)
+            .where(table.c.asset_id == id)
+            .returning(table.c.version, table.c.facility_name, table.c.status)
+        )
+        if versions is not None:
+            stmt = stmt.where(table.c.version.in_(versions))
+        deleted = db.execute(stmt).first()
+        if deleted is None:
+            db.rollback()
+            raise AssetCRUD.missing_or_stale(db, id, versions)
+
+        facility_name = deleted.facility_name
+        asset_status = asset_payload(deleted._mapping, ["status"])["status"]
+        # Tombstone so mirrors can drop the asset too
+        change = {
+            "asset_id": id,
+            "operation": DELETE,
+            "version": deleted.version,
+            "payload": None,
+        }
+        record_changes(db, [change])
         db.commit()
+        asset_cache.delete(id)
+        facility_index.remove(facility_name)
+        asset_stats.invalidate()
+        asset_reads.forget()
+        change_notifier.notify()
+        change_broker.publish([change_event(change, facility_name, asset_status)])
         return {"message": "Asset deleted successfully"}
 
     @staticmethod
-    def get_asset_by_id(db: Session, id: str) -> Asset:
+    def get_asset_by_id(db: Session, id: str) -> dict:
+        """Return the asset's AssetResponse fields and version, read through the asset cache."""
+        cached = asset_cache.get(id)
+        if cached is not None:
+            return cached
+
+        # Taken before the read, so a write committing meanwhile keeps it out of the cache
+        epoch = asset_cache.epochs([id])[id]
         # Filter by asset_id instead of id
-        db_asset = db.query(Asset).filter(Asset.asset_id == id).first()
-        if not db_asset:
+        row = db.execute(
+            select(*CACHED_COLUMNS).where(Asset.asset_id == id)
+        ).mappings().first()
+        if not row:
             raise HTTPException(status_code=404, detail="Asset not found")
+        db_asset = dict(row)
+        asset_cache.set(id, db_asset, epoch)
         return db_asset
 
+    @staticmethod
+    def get_assets_by_ids(db: Session, ids: List[str]) -> Tuple[List[dict], List[str]]:
+        """
+        Look up many assets at once: cache hits first, then one IN query for
+        the rest. Returns the assets found, in the order of ids (repeated ids
+        once), and the ids that don't exist.
+        """
+        wanted = list(dict.fromkeys(ids))
+        found = asset_cache.get_many(wanted)
+        misses = [asset_id for asset_id in wanted if asset_id not in found]
+        if misses:
+            epochs = asset_cache.epochs(misses)
+            rows = db.execute(select(*CACHED_COLUMNS).where(Asset.asset_id.in_(misses))).mappings()
+            for row in rows:
+                db_asset = dict(row)
+                found[db_asset["asset_id"]] = db_asset
+                asset_cache.set(db_asset["asset_id"], db_asset, epochs[db_asset["asset_id"]])
+        assets = [found[asset_id] for asset_id in wanted if asset_id in found]
+        missing = [asset_id for asset_id in wanted if asset_id not in found]
+        return assets, missing
+
     @staticmethod
     def get_all_facility_names(db: Session) -> list:
-        facility_names = db.query(Asset.facility_name).distinct().all()
-        return [name[0] for name in facility_names]
+        # Served from the in-process index; the database is only read when cold
+        return facility_index.names(db)
+
+    @staticmethod
+    def encode_cursor(last_id) -> str:
+        # Opaque to clients; for /get/all just the last primary key seen
+        return base64.urlsafe_b64encode(str(last_id).encode()).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> int:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            return int(base64.urlsafe_b64decode(padded.encode()).decode())
+        except (ValueError, binascii.Error, UnicodeDecodeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
 
     @staticmethod
-    def get_all_assets(db: Session) -> list:
-        return db.query(Asset).all()
+    def encode_expiry_cursor(warranty_expiry: date, last_id: int) -> str:
+        return AssetCRUD.encode_cursor(f"{warranty_expiry.isoformat()}:{last_id}")
+
+    @staticmethod
+    def decode_expiry_cursor(cursor: str) -> Tuple[date, int]:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            expiry, _, last_id = base64.urlsafe_b64decode(padded.encode()).decode().partition(":")
+            return date.fromisoformat(expiry), int(last_id)
+        except (ValueError, binascii.Error, UnicodeDecodeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+
+    @staticmethod
+    def filter_assets(query, status_filter: Optional[str] = None, facility: Optional[str] = None):
+        # Unknown status values can never match, so short-circuit instead of
+        # letting the Enum column reject them at bind time
+        if status_filter:
+            try:
+                query = query.filter(Asset.status == Status(status_filter))
+            except ValueError:
+                query = query.filter(false())
+        if facility:
+            query = query.filter(Asset.facility_name == facility)
+        return query
+
+    @staticmethod
+    def get_all_assets(
+        db: Session,
+        skip: int = 0,
+        limit: int = 100,
+        status_filter: Optional[str] = None,
+        facility: Optional[str] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[list, Optional[str]]:
+        """
+        Return one page of assets ordered by id, plus the cursor for the next page.
+
+        When a cursor is given the page starts right after it (keyset pagination)
+        and skip is ignored, so deep pages cost the same as the first one.
+        Assets are plain LIST_COLUMNS rows, not ORM objects.
+        """
+        query = AssetCRUD.filter_assets(select(*LIST_COLUMNS), status_filter, facility).order_by(Asset.id)
+
+        if cursor:
+            query = query.filter(Asset.id > AssetCRUD.decode_cursor(cursor))
+        elif skip:
+            query = query.offset(skip)
+
+        assets = db.execute(query.limit(limit)).all()
+
+        next_cursor = None
+        if limit and len(assets) == limit:
+            next_cursor = AssetCRUD.encode_cursor(assets[-1].id)
+        return assets, next_cursor
+
+    @staticmethod
+    def get_expiring_assets(
+        db: Session,
+        facility: str,
+        days: int = 30,
+        include_inactive: bool = False,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        today: Optional[date] = None
+    ) -> Tuple[list, Optional[str]]:
+        """
+        One page of a facility's assets whose warranty expires within the next
+        days, soonest first, plus the cursor for the next page.
+
+        A range scan over the (facility_name, warranty_expiry, id) index (the
+        partial ACTIVE-only one on PostgreSQL) that starts at the cursor, so
+        each page reads only the rows it returns. Assets are LIST_COLUMNS rows.
+        """
+        today = today or date.today()
+        query = select(*LIST_COLUMNS).filter(
+            Asset.facility_name == facility,
+            Asset.warranty_expiry >= today,
+            Asset.warranty_expiry <= today + timedelta(days=days)
+        )
+        if not include_inactive:
+            # Inlined rather than bound, so prepared statements can still
+            # match the partial index's WHERE status = 'ACTIVE'
+            query = query.filter(
+                Asset.status == literal(Status.ACTIVE, Asset.__table__.c.status.type, literal_execute=True)
+            )
+        if cursor:
+            query = query.filter(
+                tuple_(Asset.warranty_expiry, Asset.id) > tuple_(*AssetCRUD.decode_expiry_cursor(cursor))
+            )
+
+        assets = db.execute(query.order_by(Asset.warranty_expiry, Asset.id).limit(limit)).all()
+
+        next_cursor = None
+        if limit and len(assets) == limit:
+            next_cursor = AssetCRUD.encode_expiry_cursor(assets[-1].warranty_expiry, assets[-1].id)
+        return assets, next_cursor
+
+
+    @staticmethod
+    def search_assets(
+        db: Session,
+        q: str,
+        status_filter: Optional[str] = None,
+        facility: Optional[str] = None,
+        limit: int = 20
+    ) -> list:
+        """
+        Best matches for q as LIST_COLUMNS rows, most relevant first (see
+        app.search.search_hits).
+        """
+        candidate_ids = None
+        if status_filter or facility:
+            candidate_ids = AssetCRUD.filter_assets(select(Asset.id), status_filter, facility)
+        hits = search_hits(q, db.get_bind().dialect.name, candidate_ids, settings.SEARCH_MAX_CANDIDATES)
+        if hits is None:
+            return []
+        return db.execute(
+            select(*LIST_COLUMNS)
+            .join(hits, hits.c.id == Asset.id)
+            .order_by(hits.c.score, Asset.id)
+            .limit(limit)
+        ).all()
+
+    @staticmethod
+    def stream_assets(
+        db: Session,
+        status_filter: Optional[str] = None,
+        facility: Optional[str] = None,
+        batch_size: int = 1000
+    ) -> Iterator[List]:
+        """
+        Yield every matching asset as batches of plain rows.
+
+        Rows are read through a server-side cursor batch_size at a time, so
+        memory stays flat no matter how large the table is.
+        """
+        query = AssetCRUD.filter_assets(select(*RESPONSE_COLUMNS), status_filter, facility)
+        result = db.execute(
+            query.order_by(Asset.id).execution_options(yield_per=batch_size)
+        )
+        for batch in result.partitions():
+            yield batch
+
+
+    @staticmethod
+    def get_changes(db: Session, cursor: Optional[str] = None, limit: int = 100) -> Tuple[list, str]:
+        """
+        Return up to limit changes committed after cursor, oldest first, plus
+        the cursor to resume from (unchanged when there is nothing new).
+        """
+        since = AssetCRUD.decode_cursor(cursor) if cursor else 0
+        changes = db.scalars(
+            select(AssetChange).where(AssetChange.seq > since).order_by(AssetChange.seq).limit(limit)
+        ).all()
+        last_seq = changes[-1].seq if changes else since
+        return changes, AssetCRUD.encode_cursor(last_seq)
+
+    @staticmethod
+    def compute_stats(
+        db: Session,
+        group_by: str,
+        status_filter: Optional[str] = None,
+        facility: Optional[str] = None,
+        today: Optional[date] = None
+    ) -> dict:
+        """
+        Counts, value totals and warranty coverage per group from one GROUP BY
+        query; the overall totals are added up from the groups.
+        """
+        key = group_key(group_by, db.get_bind().dialect.name).label("key")
+        under_warranty = func.sum(case((Asset.warranty_expiry >= (today or date.today()), 1), else_=0))
+        query = select(key, func.count(), func.sum(Asset.value), under_warranty)
+        query = AssetCRUD.filter_assets(query, status_filter, facility)
+        rows = db.execute(query.group_by(key).order_by(key)).all()
+
+        groups = [summarize(to_json_value(row[0]), row[1], row[2], row[3]) for row in rows]
+        totals = summarize(
+            None,
+            sum(group["count"] for group in groups),
+            sum((group["total_value"] for group in groups), Decimal(0)),
+            sum(group["under_warranty"] for group in groups)
+        )
+        return {"group_by": group_by, "groups": groups, "totals": totals}
+
+    @staticmethod
+    def get_stats(
+        db: Session,
+        group_by: str,
+        status_filter: Optional[str] = None,
+        facility: Optional[str] = None
+    ) -> dict:
+        """compute_stats through the short-TTL cache that writes invalidate."""
+        today = date.today()
+        return asset_stats.get(
+            (group_by, status_filter, facility, today),
+            lambda: AssetCRUD.compute_stats(db, group_by, status_filter, facility, today)
+        )
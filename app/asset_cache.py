@@ -0,0 +1,194 @@
+import json
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+from app.utils.blocking import call_blocking
+from app.utils.cache import TTLCache
+
+
+class AssetCacheBackend(ABC):
+    """
+    Storage for cached asset payloads (the AssetResponse columns as a dict),
+    keyed by asset_id.
+
+    A read-through fill takes epochs() before reading the database and passes
+    the asset's epoch to set(), which skips the write if delete() ran for
+    that asset in between; otherwise a read racing with an update could put
+    the old row back after the update invalidated it.
+    """
+
+    @abstractmethod
+    def get(self, asset_id: str) -> Optional[dict]:
+        ...
+
+    def get_many(self, asset_ids: List[str]) -> Dict[str, dict]:
+        """The cached ones among asset_ids, keyed by asset_id."""
+        found = {}
+        for asset_id in asset_ids:
+            asset = self.get(asset_id)
+            if asset is not None:
+                found[asset_id] = asset
+        return found
+
+    @abstractmethod
+    def epochs(self, asset_ids: List[str]) -> Dict[str, Any]:
+        """Current epoch of each asset, to pass to set()."""
+
+    @abstractmethod
+    def set(self, asset_id: str, asset: dict, epoch: Any) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, asset_id: str) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+    @abstractmethod
+    def stats(self) -> dict:
+        ...
+
+
+class InMemoryAssetCache(AssetCacheBackend):
+    """Per-process LRU with a TTL."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        # One epoch for all assets, bumped by every delete
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    def get(self, asset_id: str) -> Optional[dict]:
+        asset = self._cache.get(asset_id)
+        # Callers get their own copy; the cached dict is shared
+        return dict(asset) if asset is not None else None
+
+    def epochs(self, asset_ids: List[str]) -> Dict[str, Any]:
+        with self._lock:
+            return dict.fromkeys(asset_ids, self._epoch)
+
+    def set(self, asset_id: str, asset: dict, epoch: Any) -> None:
+        with self._lock:
+            if epoch == self._epoch:
+                self._cache.set(asset_id, dict(asset))
+
+    def delete(self, asset_id: str) -> None:
+        with self._lock:
+            self._epoch += 1
+            self._cache.delete(asset_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._epoch += 1
+            self._cache.clear()
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+class RedisAssetCache(AssetCacheBackend):
+    """
+    Cache shared by every worker, kept in Redis (or any client with the sync
+    redis-py API). Values are stored as JSON, so Decimal and date fields come
+    back as strings and are parsed by AssetResponse. The client is the sync
+    one; round trips made on the event loop go through call_blocking.
+
+    Each asset has its own epoch key, incremented by delete(); set() is a
+    script that only writes the value while the epoch is unchanged, so the
+    guard holds across workers.
+    """
+
+    # KEYS: value key, epoch key; ARGV: value, expected epoch, ttl
+    SET_IF_EPOCH = """
+    if (redis.call('GET', KEYS[2]) or '0') == ARGV[2] then
+        redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[3])
+    end
+    """
+
+    def __init__(self, client, ttl: int, prefix: str = "asset"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._set_if_epoch = client.register_script(self.SET_IF_EPOCH)
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs):
+        # Optional dependency, only needed when a shared cache is configured
+        import redis
+        return cls(redis.from_url(url), **kwargs)
+
+    def get(self, asset_id: str) -> Optional[dict]:
+        raw = call_blocking(self.client.get, f"{self.prefix}:{asset_id}")
+        with self._lock:
+            if raw is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(raw)
+
+    def get_many(self, asset_ids: List[str]) -> Dict[str, dict]:
+        if not asset_ids:
+            return {}
+        # One MGET instead of a round trip per id
+        values = call_blocking(self.client.mget, [f"{self.prefix}:{asset_id}" for asset_id in asset_ids])
+        found = {asset_id: json.loads(raw) for asset_id, raw in zip(asset_ids, values) if raw is not None}
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(asset_ids) - len(found)
+        return found
+
+    def epochs(self, asset_ids: List[str]) -> Dict[str, Any]:
+        if not asset_ids:
+            return {}
+        values = call_blocking(self.client.mget, [f"{self.prefix}-epoch:{asset_id}" for asset_id in asset_ids])
+        return {asset_id: raw or b"0" for asset_id, raw in zip(asset_ids, values)}
+
+    def set(self, asset_id: str, asset: dict, epoch: Any) -> None:
+        call_blocking(
+            self._set_if_epoch,
+            keys=[f"{self.prefix}:{asset_id}", f"{self.prefix}-epoch:{asset_id}"],
+            args=[json.dumps(asset, default=str), epoch, self.ttl],
+        )
+
+    def delete(self, asset_id: str) -> None:
+        pipe = self.client.pipeline()
+        pipe.incr(f"{self.prefix}-epoch:{asset_id}")
+        # Only has to outlive reads that were in flight during the write
+        pipe.expire(f"{self.prefix}-epoch:{asset_id}", max(self.ttl, 60))
+        pipe.delete(f"{self.prefix}:{asset_id}")
+        call_blocking(pipe.execute)
+
+    def clear(self) -> None:
+        for key in self.client.scan_iter(f"{self.prefix}:*"):
+            self.client.delete(key)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        # Size and evictions are managed by Redis itself
+        return {
+            "size": 0,
+            "maxsize": 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": 0,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+def create_asset_cache(url: str) -> AssetCacheBackend:
+    """Build the cache from ASSET_CACHE_URL (memory:// or redis://...)."""
+    if not url or url.startswith("memory://"):
+        return InMemoryAssetCache(maxsize=settings.ASSET_CACHE_SIZE, ttl=settings.ASSET_CACHE_TTL)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisAssetCache.from_url(url, ttl=settings.ASSET_CACHE_TTL)
+    raise ValueError(f"Unsupported asset cache: {url}")
+
+
+asset_cache = create_asset_cache(settings.ASSET_CACHE_URL)
@@ -0,0 +1,363 @@
+import asyncio
+import csv
+import io
+import logging
+import tempfile
+import threading
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import AsyncIterator, BinaryIO, Iterator, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import delete, exists, func, insert, or_, select, true, update
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.AssetsCrud import CONFLICT_INSERTS, RESPONSE_COLUMNS, RESPONSE_FIELDS, AssetCRUD, asset_reads
+from app.asset_stats import asset_stats
+from app.change_broker import change_broker, resync_event
+from app.change_feed import CREATE, asset_payload, change_notifier, record_changes
+from app.config import settings
+from app.database import SessionLocal, get_engine
+from app.facility_index import facility_index
+from app.id_allocator import asset_id_allocator, asset_id_sql
+from app.models.asset_imports import AssetImport, AssetImportRow
+from app.models.assets import Asset
+from app.models.id_allocator import asset_id_seq
+from app.schemas.assets import AssetCreate
+from app.utils.export import to_json_value
+from app.utils.request_timing import request_timer
+
+logger = logging.getLogger("assets-service")
+
+QUEUED = "queued"
+VALIDATING = "validating"
+MERGING = "merging"
+COMPLETED = "completed"
+FAILED = "failed"
+
+DUPLICATE_SERIAL = "Asset with this Serial Number already exists"
+
+# CSV columns read from the file: the AssetCreate fields; others are ignored
+FIELDS = list(AssetCreate.model_fields)
+REQUIRED_FIELDS = [name for name, field in AssetCreate.model_fields.items() if field.is_required()]
+STAGED_COLUMNS = ["import_id", "row_number"] + FIELDS
+
+
+class ImportInterrupted(Exception):
+    """The worker is shutting down; the job is given up between chunks."""
+
+
+async def spool_upload(chunks: AsyncIterator[bytes], max_bytes: int) -> BinaryIO:
+    """
+    Copy a request body to an anonymous temporary file as it arrives, so
+    the upload is never held in memory. Returns the file rewound.
+    """
+    source = await run_in_threadpool(tempfile.TemporaryFile)
+    size = 0
+    try:
+        async for chunk in chunks:
+            size += len(chunk)
+            if size > max_bytes:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"Imports are limited to {max_bytes} bytes"
+                )
+            if chunk:
+                await run_in_threadpool(source.write, chunk)
+        if not size:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="The CSV file is empty")
+        await run_in_threadpool(source.seek, 0)
+    except BaseException:
+        source.close()
+        raise
+    return source
+
+
+def read_chunks(source: BinaryIO, chunk_rows: int) -> Iterator[List[Tuple[int, dict]]]:
+    """
+    The file's records in chunks of (row_number, record), the header being
+    row 1 as in a spreadsheet. Raises ValueError if required columns are missing.
+    """
+    reader = csv.DictReader(io.TextIOWrapper(source, encoding="utf-8-sig", newline=""))
+    missing = [name for name in REQUIRED_FIELDS if name not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+    records = enumerate(reader, start=2)
+    while True:
+        chunk = list(islice(records, chunk_rows))
+        if not chunk:
+            return
+        yield chunk
+
+
+def describe(exc: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in exc.errors())
+
+
+def validate_chunk(chunk: List[Tuple[int, dict]]) -> Tuple[List[dict], List[dict]]:
+    """Split a chunk into staging rows for valid assets and rejected rows with their errors."""
+    valid, invalid = [], []
+    for row_number, record in chunk:
+        # Empty cells count as missing, so defaults apply and required fields say so
+        values = {name: record[name] for name in FIELDS if record.get(name)}
+        try:
+            asset = AssetCreate.model_validate(values)
+        except ValidationError as exc:
+            invalid.append({"row_number": row_number, "error": describe(exc)})
+        else:
+            valid.append({"row_number": row_number, **asset.model_dump()})
+    return valid, invalid
+
+
+def copy_rows(db: Session, import_id: int, rows: List[dict]) -> None:
+    """Load staging rows with COPY ... FROM STDIN (PostgreSQL, psycopg2)."""
+    buffer = io.StringIO()
+    # Every value quoted: in CSV COPY only unquoted empty fields are NULL
+    writer = csv.writer(buffer, quoting=csv.QUOTE_ALL)
+    writer.writerows(
+        [import_id, row["row_number"], *(to_json_value(row[name]) for name in FIELDS)] for row in rows
+    )
+    buffer.seek(0)
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {AssetImportRow.__tablename__} ({', '.join(STAGED_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+    finally:
+        cursor.close()
+
+
+def stage_rows(db: Session, import_id: int, valid: List[dict], invalid: List[dict]) -> None:
+    """Add one chunk to the staging table: COPY on PostgreSQL, executemany elsewhere."""
+    staged = AssetImportRow.__table__
+    if valid:
+        if db.get_bind().dialect.name == "postgresql":
+            copy_rows(db, import_id, valid)
+        else:
+            db.execute(insert(staged), [{"import_id": import_id, **row} for row in valid])
+    if invalid:
+        db.execute(insert(staged), [{"import_id": import_id, **row} for row in invalid])
+
+
+def pending(import_id: int):
+    """Staged rows still headed for assets."""
+    staged = AssetImportRow.__table__
+    return (staged.c.import_id == import_id) & staged.c.error.is_(None)
+
+
+def mark_duplicates(db: Session, import_id: int) -> int:
+    """
+    Reject staged rows whose serial number is already taken, by an asset or
+    by an earlier row of the file. Returns how many were rejected.
+    """
+    staged = AssetImportRow.__table__
+    earlier = staged.alias("earlier")
+    stmt = update(staged).where(
+        pending(import_id),
+        or_(
+            exists().where(Asset.__table__.c.serial_number == staged.c.serial_number),
+            exists().where(
+                earlier.c.import_id == import_id,
+                earlier.c.serial_number == staged.c.serial_number,
+                earlier.c.row_number < staged.c.row_number,
+            ),
+        )
+    ).values(error=DUPLICATE_SERIAL)
+    return db.execute(stmt).rowcount
+
+
+def merge_statement(dialect_name: str, import_id: int, numbers: Optional[range]):
+    """
+    INSERT ... SELECT of the pending rows into assets, in file order.
+    asset_ids are assigned in SQL, from asset_id_seq on PostgreSQL or from the
+    reserved numbers elsewhere; ON CONFLICT skips serial numbers taken since
+    mark_duplicates. Returns the created assets' RESPONSE_COLUMNS.
+    """
+    staged = AssetImportRow.__table__
+    columns = [staged.c[name] for name in FIELDS]
+    if numbers is None:
+        number = asset_id_seq.next_value()
+        numbered = select(number.label("number"), *columns).where(pending(import_id)).order_by(staged.c.row_number)
+    else:
+        rank = func.row_number().over(order_by=staged.c.row_number)
+        numbered = select((rank + (numbers.start - 1)).label("number"), *columns).where(pending(import_id))
+    # A subquery, so each row's number is drawn once and used in one place
+    numbered = numbered.subquery("numbered")
+    # SQLite needs a WHERE clause before ON CONFLICT in INSERT ... SELECT
+    rows = select(
+        asset_id_sql(numbered.c.number, dialect_name), *(numbered.c[name] for name in FIELDS)
+    ).where(true())
+
+    table = Asset.__table__
+    insert_ignoring = CONFLICT_INSERTS.get(dialect_name)
+    stmt = (insert_ignoring or insert)(table).from_select(["asset_id"] + FIELDS, rows)
+    if insert_ignoring is not None:
+        stmt = stmt.on_conflict_do_nothing(index_elements=[table.c.serial_number])
+    return stmt.returning(*RESPONSE_COLUMNS)
+
+
+def merge_pending(db: Session, job: AssetImport) -> List:
+    """
+    Move the job's pending rows into assets in one statement and log their
+    changes; rows that lost their serial number meanwhile are rejected.
+    Commits; returns the created assets.
+    """
+    staged = AssetImportRow.__table__
+    dialect_name = db.get_bind().dialect.name
+    count = db.scalar(select(func.count()).select_from(staged).where(pending(job.id)))
+    numbers = None
+    if dialect_name != "postgresql":
+        # Reserved in a transaction of its own; end ours first, as an open
+        # SQLite read transaction would hold up the reservation's commit
+        db.commit()
+        numbers = asset_id_allocator.reserve_range(db, count)
+
+    created = db.execute(merge_statement(dialect_name, job.id, numbers)).all() if count else []
+    if len(created) < count:
+        created_serials = {row.serial_number for row in created}
+        lost = [
+            row.id for row in db.execute(select(staged.c.id, staged.c.serial_number).where(pending(job.id)))
+            if row.serial_number not in created_serials
+        ]
+        db.execute(update(staged).where(staged.c.id.in_(lost)).values(error=DUPLICATE_SERIAL))
+        job.rows_duplicate += len(lost)
+    # Only the rejected rows stay, as the job's error report
+    db.execute(delete(staged).where(pending(job.id)))
+
+    changes = [
+        {
+            "asset_id": row.asset_id,
+            "operation": CREATE,
+            "version": 1,
+            "payload": asset_payload(row._mapping, RESPONSE_FIELDS),
+        }
+        for row in created
+    ]
+    record_changes(db, changes)
+    job.rows_imported = len(created)
+    job.status = COMPLETED
+    job.finished_at = datetime.now(timezone.utc)
+    db.commit()
+
+    if created:
+        for facility_name, added in Counter(row.facility_name for row in created).items():
+            facility_index.add(facility_name, added)
+        asset_stats.invalidate()
+        asset_reads.forget()
+        change_notifier.notify()
+        # One event rather than one per row, which would overflow every
+        # subscriber's queue; streams catch up from /changes
+        change_broker.publish([resync_event(len(changes))])
+    return created
+
+
+def run_import(import_id: int, source: BinaryIO, stop: threading.Event) -> None:
+    """
+    Validate, stage and merge one uploaded file; runs in a worker thread.
+    Progress is committed after every chunk, so any worker can report it.
+    """
+    # Not part of the request that started the job
+    request_timer.set(None)
+    db = SessionLocal(bind=get_engine())
+    try:
+        job = db.get(AssetImport, import_id)
+        job.status = VALIDATING
+        db.commit()
+        for chunk in read_chunks(source, settings.IMPORT_CHUNK_ROWS):
+            if stop.is_set():
+                raise ImportInterrupted("Interrupted by a shutdown; upload the file again")
+            valid, invalid = validate_chunk(chunk)
+            stage_rows(db, import_id, valid, invalid)
+            job.rows_read += len(chunk)
+            job.rows_invalid += len(invalid)
+            db.commit()
+
+        job.status = MERGING
+        job.rows_duplicate = mark_duplicates(db, import_id)
+        db.commit()
+        created = merge_pending(db, job)
+        logger.info(
+            "Import %d: %d rows, %d imported, %d invalid, %d duplicates",
+            import_id, job.rows_read, len(created), job.rows_invalid, job.rows_duplicate
+        )
+    except Exception as exc:
+        db.rollback()
+        if not isinstance(exc, (ValueError, ImportInterrupted)):
+            logger.exception("Import %d failed", import_id)
+        fail_import(db, import_id, str(exc))
+    finally:
+        db.close()
+        source.close()
+
+
+def fail_import(db: Session, import_id: int, error: str) -> None:
+    """Mark the job failed; nothing was merged, so only its rejected rows are kept."""
+    db.execute(delete(AssetImportRow.__table__).where(pending(import_id)))
+    db.execute(
+        update(AssetImport.__table__)
+        .where(AssetImport.id == import_id)
+        .values(status=FAILED, error=error, finished_at=datetime.now(timezone.utc))
+    )
+    db.commit()
+
+
+def create_import(db: Session, username: str) -> AssetImport:
+    """Register a queued job, dropping jobs (and reports) past IMPORT_RETENTION_DAYS."""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.IMPORT_RETENTION_DAYS)
+    expired = select(AssetImport.id).where(AssetImport.finished_at < cutoff)
+    db.execute(delete(AssetImportRow.__table__).where(AssetImportRow.import_id.in_(expired)))
+    db.execute(delete(AssetImport.__table__).where(AssetImport.finished_at < cutoff))
+    job = AssetImport(status=QUEUED, created_by=username)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def get_import(db: Session, import_id: int) -> AssetImport:
+    job = db.get(AssetImport, import_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Import not found")
+    return job
+
+
+def get_import_errors(
+    db: Session, import_id: int, limit: int = 100, cursor: Optional[str] = None
+) -> Tuple[list, Optional[str]]:
+    """One page of the job's rejected rows in file order, plus the cursor for the next page."""
+    get_import(db, import_id)
+    staged = AssetImportRow.__table__
+    query = select(staged.c.row_number, staged.c.error).where(staged.c.import_id == import_id)
+    if cursor:
+        query = query.where(staged.c.row_number > AssetCRUD.decode_cursor(cursor))
+    errors = db.execute(query.order_by(staged.c.row_number).limit(limit)).all()
+    next_cursor = None
+    if len(errors) == limit:
+        next_cursor = AssetCRUD.encode_cursor(errors[-1].row_number)
+    return errors, next_cursor
+
+
+class ImportRunner:
+    """Runs import jobs on worker threads and stops them between chunks on shutdown."""
+
+    def __init__(self):
+        self._tasks = set()
+        self._stop = threading.Event()
+
+    def start(self, import_id: int, source: BinaryIO) -> None:
+        task = asyncio.ensure_future(run_in_threadpool(run_import, import_id, source, self._stop))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def shutdown(self) -> None:
+        self._stop.set()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._stop = threading.Event()
+
+
+import_runner = ImportRunner()
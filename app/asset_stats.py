@@ -0,0 +1,67 @@
+import threading
+from decimal import Decimal
+from typing import Callable, Hashable, Optional
+
+from sqlalchemy import func
+
+from app.config import settings
+from app.models.assets import Asset
+from app.utils.cache import TTLCache
+
+def group_key(group_by: str, dialect: str):
+    """SQL expression for the grouping key; purchase months are "YYYY-MM"."""
+    if group_by == "purchase_month":
+        if dialect == "postgresql":
+            return func.to_char(Asset.purchase_date, "YYYY-MM")
+        return func.strftime("%Y-%m", Asset.purchase_date)
+    return getattr(Asset, group_by)
+
+
+def summarize(key: Optional[str], count: int, total_value, under_warranty: int) -> dict:
+    """One /stats row; the average is rounded to cents."""
+    total_value = Decimal(total_value or 0)
+    return {
+        "key": key,
+        "count": count,
+        "total_value": total_value,
+        "avg_value": (total_value / count).quantize(Decimal("0.01")) if count else Decimal(0),
+        "under_warranty": under_warranty,
+        "warranty_coverage": under_warranty / count if count else 0.0,
+    }
+
+
+class StatsCache:
+    """
+    Short-lived cache of /stats results. AssetCRUD invalidates it after every
+    write it commits; the TTL bounds staleness from other workers' writes.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 256):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        # Bumped by every write so a computation racing with one is not kept
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, compute: Callable[[], dict]) -> dict:
+        stats = self._cache.get(key)
+        if stats is not None:
+            return stats
+
+        with self._lock:
+            epoch = self._epoch
+        stats = compute()
+        with self._lock:
+            if epoch == self._epoch:
+                self._cache.set(key, stats)
+        return stats
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._epoch += 1
+            self._cache.clear()
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+asset_stats = StatsCache(ttl=settings.STATS_CACHE_TTL)
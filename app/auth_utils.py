@@ -3,7 +3,11 @@ from fastapi.security import OAuth2PasswordBearer, SecurityScopes
 from jose import JWTError, jwt
 from pydantic import BaseModel, ValidationError
 from typing import Optional, List
+import hashlib
 import logging
+from app.config import settings
+from app.utils.cache import TTLCache
+from app.utils.request_timing import timed
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -33,11 +37,57 @@ oauth2_scheme = OAuth2PasswordBearer(
     }
 )
 
+# Verified tokens, keyed by a hash of the token so raw credentials are not kept
+token_cache = TTLCache(maxsize=settings.TOKEN_CACHE_SIZE, ttl=settings.TOKEN_CACHE_TTL)
+
 # Helper functions
+def verify_token(token: str) -> TokenData:
+    """
+    Decode and verify a bearer token, reusing earlier verifications.
+
+    Raises JWTError or ValidationError for invalid tokens; only valid tokens
+    are cached, until their exp claim or the cache TTL, whichever is sooner.
+    """
+    key = hashlib.sha256(token.encode()).digest()
+    token_data = token_cache.get(key)
+    if token_data is not None:
+        return token_data
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Validating token: %s...", token[:10])
+
+    # Decode JWT token
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    logger.debug("Token payload: %s", payload)
+
+    username: str = payload.get("sub")
+    if username is None:
+        logger.error("Token missing 'sub' claim")
+        raise JWTError("Token missing 'sub' claim")
+
+    # Check if role is in the token payload
+    role: str = payload.get("role")
+    if role is None:
+        # Try alternate keys that might be used
+        role = payload.get("scopes", [None])[0]  # Try scopes array
+        if role is None:
+            role = "ADMIN"  # Default to ADMIN for testing
+            logger.warning("Role not found in token, defaulting to %s", role)
+
+    token_data = TokenData(username=username, role=role)
+    token_cache.set(key, token_data, expires_at=payload.get("exp"))
+    return token_data
+
 async def get_current_user(
     security_scopes: SecurityScopes, 
     token: str = Depends(oauth2_scheme)
 ):
+    # Counted as "auth" in the request's Server-Timing header
+    with timed("auth"):
+        return authorize(security_scopes, token)
+
+def authorize(security_scopes: SecurityScopes, token: str) -> User:
+    """Verify the bearer token and check its role against the required scopes."""
     if security_scopes.scopes:
         authenticate_value = f'Bearer scope="{security_scopes.scope_str}"'
     else:
@@ -50,30 +100,7 @@ async def get_current_user(
     )
     
     try:
-        # Log the token for debugging
-        logger.info(f"Validating token: {token[:10]}...")
-        
-        # Decode JWT token
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        logger.info("Token verified successfully with SECRET_KEY")
-        logger.info(f"Token payload: {payload}")
-        
-        username: str = payload.get("sub")
-        if username is None:
-            logger.error("Token missing 'sub' claim")
-            raise credentials_exception
-        
-        # Check if role is in the token payload
-        role: str = payload.get("role")
-        if role is None:
-            # Try alternate keys that might be used
-            role = payload.get("scopes", [None])[0]  # Try scopes array
-            if role is None:
-                role = "ADMIN"  # Default to ADMIN for testing
-                logger.warning(f"Role not found in token, defaulting to {role}")
-        
-        token_data = TokenData(username=username, role=role)
-        
+        token_data = verify_token(token)
     except (JWTError, ValidationError) as e:
         logger.error(f"Token validation error: {str(e)}")
         raise credentials_exception
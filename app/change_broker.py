@@ -0,0 +1,209 @@
+import asyncio
+import json
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+from app.config import settings
+from app.utils.blocking import call_blocking
+
+logger = logging.getLogger("assets-service")
+
+# Sent instead of per-asset events for bulk writes such as imports
+RESYNC = "resync"
+
+
+def change_event(change: dict, facility_name: Optional[str] = None, status: Optional[str] = None,
+                 previous_facility_name: Optional[str] = None, previous_status: Optional[str] = None) -> dict:
+    """
+    A committed change-log row as pushed to /stream subscribers. facility_name
+    and status are carried at the top level so deletes can be filtered too;
+    updates also carry the values from before the change.
+    """
+    payload = change["payload"] or {}
+    return {
+        "operation": change["operation"],
+        "asset_id": change["asset_id"],
+        "version": change["version"],
+        "facility_name": payload.get("facility_name", facility_name),
+        "status": payload.get("status", status),
+        "previous_facility_name": previous_facility_name,
+        "previous_status": previous_status,
+        "asset": change["payload"],
+    }
+
+
+def resync_event(count: int) -> dict:
+    """
+    One event standing in for count changes that are too many to push one by
+    one; every subscriber gets it and catches up from /changes.
+    """
+    return {
+        "operation": RESYNC,
+        "asset_id": None,
+        "version": None,
+        "facility_name": None,
+        "status": None,
+        "previous_facility_name": None,
+        "previous_status": None,
+        "asset": None,
+        "count": count,
+    }
+
+
+class Subscription:
+    """
+    One /stream client: a bounded queue of events matching its filters.
+
+    A subscriber that falls queue_size events behind is dropped rather than
+    allowed to buffer without limit; get() then returns None and the client
+    is expected to reconnect and catch up from /changes.
+    """
+
+    def __init__(self, broker: "ChangeBroker", queue_size: int,
+                 facility: Optional[str] = None, status: Optional[str] = None):
+        self.broker = broker
+        self.facility = facility
+        self.status = status
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(queue_size)
+        self.dropped = False
+
+    def matches(self, event: dict) -> bool:
+        """
+        Whether the asset is in this subscriber's view after the change or,
+        for updates, was in it before, so moves out of the view are seen too.
+        """
+        if event["operation"] == RESYNC:
+            return True
+        return (self._in_view(event["facility_name"], event["status"])
+                or self._in_view(event.get("previous_facility_name"), event.get("previous_status")))
+
+    def _in_view(self, facility_name: Optional[str], status: Optional[str]) -> bool:
+        return ((self.facility is None or facility_name == self.facility)
+                and (self.status is None or status == self.status))
+
+    def put(self, events: List[dict]) -> None:
+        # Runs on the subscriber's event loop
+        if self.dropped:
+            return
+        for event in events:
+            try:
+                self.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self.dropped = True
+                self.broker.dropped_total += 1
+                self.broker.unsubscribe(self)
+                # Make room for the end-of-stream marker
+                while not self.queue.empty():
+                    self.queue.get_nowait()
+                self.queue.put_nowait(None)
+                logger.warning("Dropped slow /stream subscriber")
+                return
+
+    async def get(self, timeout: float) -> Optional[dict]:
+        """Next event; raises asyncio.TimeoutError when idle for timeout seconds."""
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+    def close(self) -> None:
+        self.broker.unsubscribe(self)
+
+
+class ChangeBroker(ABC):
+    """
+    Fan-out of committed asset changes to /stream subscribers.
+
+    publish() is called after commit, from worker threads or the event loop;
+    subscribe() is called on the event loop serving the stream.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self.dropped_total = 0
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def publish(self, events: List[dict]) -> None:
+        """Send events to the subscribers of every worker sharing this broker."""
+
+    def subscribe(self, facility: Optional[str] = None, status: Optional[str] = None) -> Subscription:
+        subscription = Subscription(self, self.queue_size, facility, status)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def deliver(self, events: List[dict]) -> None:
+        """Hand events to the matching local subscribers."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            matching = [event for event in events if subscription.matches(event)]
+            if matching:
+                subscription.loop.call_soon_threadsafe(subscription.put, matching)
+
+    def stats(self) -> dict:
+        return {"subscribers": len(self._subscribers), "dropped": self.dropped_total}
+
+
+class InMemoryChangeBroker(ChangeBroker):
+    """Per-process fan-out; subscribers only see writes made by this worker."""
+
+    def publish(self, events: List[dict]) -> None:
+        if events:
+            self.deliver(events)
+
+
+class RedisChangeBroker(ChangeBroker):
+    """
+    Fan-out across workers through a Redis pub/sub channel. Every write is
+    published to the channel, and each worker relays what it receives to its
+    own subscribers.
+    """
+
+    def __init__(self, url: str, queue_size: int, channel: str = "asset-changes"):
+        super().__init__(queue_size)
+        # Optional dependency, only needed when a shared broker is configured
+        import redis
+        self.url = url
+        self.channel = channel
+        self.client = redis.from_url(url)
+        self._relay = None
+
+    def publish(self, events: List[dict]) -> None:
+        if events:
+            # Called after commit, on the event loop when USE_ASYNC_DB is on
+            call_blocking(self.client.publish, self.channel, json.dumps(events))
+
+    def subscribe(self, facility: Optional[str] = None, status: Optional[str] = None) -> Subscription:
+        if self._relay is None or self._relay.done():
+            self._relay = asyncio.get_running_loop().create_task(self._relay_messages())
+        return super().subscribe(facility, status)
+
+    async def _relay_messages(self) -> None:
+        import redis.asyncio as redis
+        pubsub = redis.from_url(self.url).pubsub()
+        await pubsub.subscribe(self.channel)
+        try:
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    self.deliver(json.loads(message["data"]))
+        finally:
+            await pubsub.aclose()
+
+
+def create_change_broker(url: str) -> ChangeBroker:
+    """Build the broker from CHANGE_BROKER_URL (memory:// or redis://...)."""
+    if not url or url.startswith("memory://"):
+        return InMemoryChangeBroker(queue_size=settings.STREAM_QUEUE_SIZE)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisChangeBroker(url, queue_size=settings.STREAM_QUEUE_SIZE)
+    raise ValueError(f"Unsupported change broker: {url}")
+
+
+change_broker = create_change_broker(settings.CHANGE_BROKER_URL)
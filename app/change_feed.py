@@ -0,0 +1,98 @@
+import asyncio
+import threading
+from typing import Iterable, List
+
+from sqlalchemy import func, insert, literal, select, text
+from sqlalchemy.orm import Session
+
+from app.models.asset_changes import AssetChange
+from app.utils.export import to_json_value
+
+CREATE = "create"
+UPDATE = "update"
+DELETE = "delete"
+
+# Any constant works; it only has to be the same for every writer
+CHANGE_LOG_LOCK_ID = 7_461_133
+
+
+def asset_payload(values: dict, columns: Iterable[str]) -> dict:
+    """JSON-safe AssetResponse fields for the change log."""
+    return {name: to_json_value(values[name]) for name in columns}
+
+
+def record_changes(db: Session, changes: List[dict]) -> None:
+    """
+    Append change rows in the caller's transaction, so they commit (or roll
+    back) together with the asset write.
+
+    Each change is a dict with asset_id, operation, version and payload.
+    """
+    if not changes:
+        return
+    if db.get_bind().dialect.name == "postgresql":
+        # Serialize change-log writers until commit, so seq order matches commit
+        # order and a reader never sees seq N+1 before N is visible
+        if len(changes) == 1:
+            # Single writes take the lock in the INSERT itself, saving a round trip
+            db.execute(locked_change_insert(changes[0]))
+            return
+        db.execute(text("SELECT pg_advisory_xact_lock(:lock_id)"), {"lock_id": CHANGE_LOG_LOCK_ID})
+    db.execute(insert(AssetChange.__table__), changes)
+
+
+def locked_change_insert(change: dict):
+    """
+    INSERT ... SELECT of one change row from the advisory lock's result, so
+    the lock is held before the row (and its seq) is produced.
+    """
+    table = AssetChange.__table__
+    lock = select(func.pg_advisory_xact_lock(CHANGE_LOG_LOCK_ID)).subquery("change_log_lock")
+    row = select(*(literal(change[name], table.c[name].type) for name in change)).select_from(lock)
+    return insert(table).from_select(list(change), row)
+
+
+class ChangeNotifier:
+    """Wakes long-polling /changes requests in this process after a write commits."""
+
+    def __init__(self):
+        self._waiters = set()
+        self._lock = threading.Lock()
+
+    def waiter(self) -> "ChangeWaiter":
+        return ChangeWaiter(self)
+
+    def notify(self) -> None:
+        # Writes commit on worker threads or on the event loop thread
+        with self._lock:
+            waiters = list(self._waiters)
+        for loop, event in waiters:
+            loop.call_soon_threadsafe(event.set)
+
+
+class ChangeWaiter:
+    """
+    Register before querying, then wait(): a write committed in between still
+    wakes us. Writes made by other workers are only seen on the next poll.
+    """
+
+    def __init__(self, notifier: ChangeNotifier):
+        self.notifier = notifier
+        self.entry = (asyncio.get_running_loop(), asyncio.Event())
+        with notifier._lock:
+            notifier._waiters.add(self.entry)
+
+    async def wait(self, timeout: float) -> None:
+        try:
+            await asyncio.wait_for(self.entry[1].wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        with self.notifier._lock:
+            self.notifier._waiters.discard(self.entry)
+
+
+change_notifier = ChangeNotifier()
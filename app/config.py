@@ -13,6 +13,105 @@ class Settings(BaseSettings):
     FACILITY_SERVICE_URL: str = os.getenv("FACILITY_SERVICE_URL", "https://healthcare-facility-service.onrender.com")
     ASSETS_SERVICE_URL: str = os.getenv("ASSETS_SERVICE_URL", "https://healthcare-assets-service.onrender.com")
     
+    # Serve requests through the asyncio engine (asyncpg/aiosqlite); set to
+    # false to fall back to the sync engine in a threadpool
+    USE_ASYNC_DB: bool = os.getenv("USE_ASYNC_DB", "true").lower() in ("1", "true", "yes")
+
+    # Bulk export: rows fetched per server-side cursor batch
+    EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+    # asset_id numbers each worker reserves per allocator round trip
+    ASSET_ID_BLOCK_SIZE: int = int(os.getenv("ASSET_ID_BLOCK_SIZE", "50"))
+
+    # Largest batch accepted by /addAssets
+    BULK_CREATE_MAX_ITEMS: int = int(os.getenv("BULK_CREATE_MAX_ITEMS", "1000"))
+
+    # Verified bearer tokens kept in memory (entries also expire at the token's exp)
+    TOKEN_CACHE_SIZE: int = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+    TOKEN_CACHE_TTL: int = int(os.getenv("TOKEN_CACHE_TTL", "300"))
+
+    # Rate limiting: memory:// keeps counters per process, redis://... shares
+    # them across workers. Role/route limits look like "ADMIN=300,STAFF=200"
+    # and "/export=10,/addAssets=20" (requests per minute).
+    RATE_LIMIT_PER_MINUTE: int = int(os.getenv("RATE_LIMIT_PER_MINUTE", "100"))
+    RATE_LIMIT_STORAGE_URL: str = os.getenv("RATE_LIMIT_STORAGE_URL", "memory://")
+    RATE_LIMIT_ROLE_LIMITS: str = os.getenv("RATE_LIMIT_ROLE_LIMITS", "")
+    RATE_LIMIT_ROUTE_LIMITS: str = os.getenv("RATE_LIMIT_ROUTE_LIMITS", "")
+
+    # Logging: files roll over at midnight and are kept LOG_RETENTION_DAYS days;
+    # per-request access lines are kept with probability LOG_REQUEST_SAMPLE_RATE
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_DIR: str = os.getenv("LOG_DIR", "logs")
+    LOG_RETENTION_DAYS: int = int(os.getenv("LOG_RETENTION_DAYS", "14"))
+    LOG_REQUEST_SAMPLE_RATE: float = float(os.getenv("LOG_REQUEST_SAMPLE_RATE", "1.0"))
+
+    # Seconds before the in-process facility name index is rebuilt from the
+    # database (picks up writes made by other workers)
+    FACILITY_CACHE_MAX_AGE: int = int(os.getenv("FACILITY_CACHE_MAX_AGE", "300"))
+
+    # Read-through cache in front of GET /{id}: memory:// is a per-process LRU,
+    # redis://... is shared by all workers
+    ASSET_CACHE_URL: str = os.getenv("ASSET_CACHE_URL", "memory://")
+    ASSET_CACHE_SIZE: int = int(os.getenv("ASSET_CACHE_SIZE", "10000"))
+    ASSET_CACHE_TTL: int = int(os.getenv("ASSET_CACHE_TTL", "60"))
+
+    # Seconds a /stats result is reused; writes through the API clear it early
+    STATS_CACHE_TTL: int = int(os.getenv("STATS_CACHE_TTL", "30"))
+
+    # /search scores at most this many of the newest matches per index, so
+    # very broad queries stay as cheap as selective ones
+    SEARCH_MAX_CANDIDATES: int = int(os.getenv("SEARCH_MAX_CANDIDATES", "1000"))
+
+    # /changes long-polling: longest wait a client may ask for, and how often
+    # the change log is re-read for writes made by other workers
+    CHANGES_MAX_WAIT: int = int(os.getenv("CHANGES_MAX_WAIT", "30"))
+    CHANGES_POLL_INTERVAL: float = float(os.getenv("CHANGES_POLL_INTERVAL", "1.0"))
+
+    # /stream push: memory:// fans out within this worker, redis://... shares
+    # events between workers; subscribers more than STREAM_QUEUE_SIZE events
+    # behind are dropped; idle streams get a keep-alive every STREAM_HEARTBEAT s
+    CHANGE_BROKER_URL: str = os.getenv("CHANGE_BROKER_URL", "memory://")
+    STREAM_QUEUE_SIZE: int = int(os.getenv("STREAM_QUEUE_SIZE", "100"))
+    STREAM_HEARTBEAT: int = int(os.getenv("STREAM_HEARTBEAT", "15"))
+
+    # Connection pool, per engine: connections kept and extra ones allowed
+    # under load, seconds a request waits for one, and age in seconds after
+    # which a connection is replaced on checkout (instead of pinging it on
+    # every checkout; DATABASE_POOL_PRE_PING=true pings anyway).
+    # DATABASE_STATEMENT_TIMEOUT (ms, PostgreSQL, 0 = none) cancels runaway queries.
+    DATABASE_POOL_SIZE: int = int(os.getenv("DATABASE_POOL_SIZE", "5"))
+    DATABASE_MAX_OVERFLOW: int = int(os.getenv("DATABASE_MAX_OVERFLOW", "10"))
+    DATABASE_POOL_TIMEOUT: float = float(os.getenv("DATABASE_POOL_TIMEOUT", "30"))
+    DATABASE_POOL_RECYCLE: int = int(os.getenv("DATABASE_POOL_RECYCLE", "1800"))
+    DATABASE_POOL_PRE_PING: bool = os.getenv("DATABASE_POOL_PRE_PING", "false").lower() in ("1", "true", "yes")
+    DATABASE_STATEMENT_TIMEOUT: int = int(os.getenv("DATABASE_STATEMENT_TIMEOUT", "0"))
+
+    # Startup: sslmode added to PostgreSQL URLs that don't set one (empty to
+    # leave the URL alone), connections opened before serving, and what to do
+    # when the database is not at the Alembic head: off, warn or error
+    DATABASE_SSLMODE: str = os.getenv("DATABASE_SSLMODE", "require")
+    DATABASE_POOL_PREWARM: int = int(os.getenv("DATABASE_POOL_PREWARM", "2"))
+    SCHEMA_CHECK: str = os.getenv("SCHEMA_CHECK", "warn")
+
+    # SQL instrumentation: statements slower than SLOW_QUERY_MS are logged with
+    # their parameters, and requests issuing more than QUERY_BUDGET statements
+    # are logged as warnings. QUERY_BUDGETS overrides it per route template,
+    # e.g. "/get/all=2,GET /{id}=1,/addAssets=10"
+    SLOW_QUERY_MS: float = float(os.getenv("SLOW_QUERY_MS", "200"))
+    QUERY_BUDGET: int = int(os.getenv("QUERY_BUDGET", "20"))
+    QUERY_BUDGETS: str = os.getenv("QUERY_BUDGETS", "")
+
+    # Largest id list accepted by /batch, and whether concurrent identical
+    # reads (GET /{id}, /get/all) in one worker share a single query
+    BATCH_MAX_IDS: int = int(os.getenv("BATCH_MAX_IDS", "500"))
+    READ_COALESCING: bool = os.getenv("READ_COALESCING", "true").lower() in ("1", "true", "yes")
+
+    # CSV imports (/import): largest upload accepted, rows validated and
+    # staged per chunk, and days finished jobs and their error reports are kept
+    IMPORT_MAX_BYTES: int = int(os.getenv("IMPORT_MAX_BYTES", str(200 * 1024 * 1024)))
+    IMPORT_CHUNK_ROWS: int = int(os.getenv("IMPORT_CHUNK_ROWS", "5000"))
+    IMPORT_RETENTION_DAYS: int = int(os.getenv("IMPORT_RETENTION_DAYS", "7"))
+
     # Security settings
     SECRET_KEY: str = os.getenv("SECRET_KEY", "YOUR_SECRET_KEY_HERE")
 
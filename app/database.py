@@ -1,40 +1,234 @@
 
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from typing import Dict, Optional, Union
+from starlette.concurrency import run_in_threadpool
 from app.config import settings
 from app.models.base import Base
 # Import all models here to ensure they are registered with Base
 from app.models.assets import Asset
+from app.models.id_allocator import AssetIdAllocator
+from app.models.asset_changes import AssetChange
+from app.models.asset_imports import AssetImport, AssetImportRow
+from app.db_pool import AsyncPool, SyncPool, instrument_pool, pool_stats
+from app.utils.request_timing import current_timer
 
-# Add SSL mode for Render if not present
-database_url = settings.DATABASE_URL
-if "sslmode" not in database_url:
-    database_url += "?sslmode=require"
+logger = logging.getLogger("assets-service")
 
-# Create engine with production settings
-engine = create_engine(
-    database_url,
-    pool_size=5,
-    max_overflow=10,
-    pool_timeout=30,
-    pool_pre_ping=True
-)
+# Sync drivers we ship (psycopg2-binary); a bare postgresql:// would pick
+# psycopg 3 on SQLAlchemy 2.1
+SYNC_DRIVERS = {
+    "postgres": "postgresql+psycopg2",
+    "postgresql": "postgresql+psycopg2",
+}
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Async drivers for the sync URLs we are configured with
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+def database_url(url: Optional[str] = None) -> str:
+    """
+    The configured URL with our sync driver, plus sslmode=DATABASE_SSLMODE
+    for PostgreSQL URLs that don't set one. SQLite URLs are left alone.
+    """
+    url = make_url(url or settings.DATABASE_URL)
+    url = url.set(drivername=SYNC_DRIVERS.get(url.drivername, url.drivername))
+    if (url.get_backend_name() == "postgresql" and settings.DATABASE_SSLMODE
+            and "sslmode" not in url.query):
+        url = url.update_query_dict({"sslmode": settings.DATABASE_SSLMODE})
+    return url.render_as_string(hide_password=False)
+
+def make_async_url(url: str):
+    """Translate the sync database URL for the matching asyncio driver."""
+    url = make_url(url)
+    connect_args = {}
+    drivername = ASYNC_DRIVERS.get(url.drivername, url.drivername)
+    if drivername == "postgresql+asyncpg" and "sslmode" in url.query:
+        # asyncpg takes the libpq sslmode values through its ssl argument
+        connect_args["ssl"] = url.query["sslmode"]
+        url = url.difference_update_query(["sslmode"])
+    return url.set(drivername=drivername), connect_args
+
+def pool_options() -> dict:
+    """
+    Pool sizing from settings. Connections are replaced once older than
+    DATABASE_POOL_RECYCLE seconds rather than pinged on every checkout; a
+    connection that still dies mid-request invalidates the pool.
+    """
+    return dict(
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE,
+        pool_pre_ping=settings.DATABASE_POOL_PRE_PING
+    )
+
+def statement_timeout_args(url, is_async: bool) -> dict:
+    """connect_args applying DATABASE_STATEMENT_TIMEOUT to every PostgreSQL session."""
+    timeout = settings.DATABASE_STATEMENT_TIMEOUT
+    if not timeout or make_url(url).get_backend_name() != "postgresql":
+        return {}
+    if is_async:
+        return {"server_settings": {"statement_timeout": str(timeout)}}
+    return {"options": f"-c statement_timeout={timeout}"}
+
+# Engines are built on first use (normally by the app's lifespan), so
+# importing the app opens no connections and needs no database
+_engine: Optional[Engine] = None
+_async_engine: Optional[AsyncEngine] = None
+_engine_lock = threading.Lock()
+
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
+
+# Objects stay loaded after commit so responses can be serialized outside
+# the greenlet that talks to the database
+AsyncSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False)
+
+def _format_parameters(parameters, limit: int = 1000) -> str:
+    text = repr(parameters)
+    return text if len(text) <= limit else text[:limit] + "..."
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._query_started
+    timer = current_timer()
+    if timer is not None:
+        timer.add_statement(elapsed)
+    if elapsed * 1000 >= settings.SLOW_QUERY_MS:
+        logger.warning(
+            "Slow query (%.1f ms): %s - Parameters: %s",
+            elapsed * 1000, statement, _format_parameters(parameters),
+            extra={"request_id": timer.request_id} if timer is not None else None
+        )
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Count statements and their time for the current request (see
+    MonitoringMiddleware) and log those slower than SLOW_QUERY_MS.
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+def get_engine() -> Engine:
+    """The sync engine, created and bound to SessionLocal on first call."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                url = database_url()
+                _engine = create_engine(
+                    url, poolclass=SyncPool, connect_args=statement_timeout_args(url, is_async=False),
+                    **pool_options()
+                )
+                instrument_engine(_engine)
+                instrument_pool(_engine, pool_stats["sync"])
+                SessionLocal.configure(bind=_engine)
+    return _engine
+
+def get_async_engine() -> AsyncEngine:
+    """The asyncio engine, created and bound to AsyncSessionLocal on first call."""
+    global _async_engine
+    if _async_engine is None:
+        with _engine_lock:
+            if _async_engine is None:
+                async_url, connect_args = make_async_url(database_url())
+                connect_args.update(statement_timeout_args(async_url, is_async=True))
+                _async_engine = create_async_engine(
+                    async_url, poolclass=AsyncPool, connect_args=connect_args, **pool_options()
+                )
+                instrument_engine(_async_engine.sync_engine)
+                instrument_pool(_async_engine.sync_engine, pool_stats["async"])
+                AsyncSessionLocal.configure(bind=_async_engine)
+    return _async_engine
+
+def request_engine() -> Union[AsyncEngine, Engine]:
+    """The engine get_db serves requests from, depending on USE_ASYNC_DB."""
+    return get_async_engine() if settings.USE_ASYNC_DB else get_engine()
+
+def pool_status() -> Dict[str, Dict[str, float]]:
+    """Checkout counters and current occupancy per engine kind, for /metrics."""
+    pools = {"sync": _engine.pool if _engine else None,
+             "async": _async_engine.pool if _async_engine else None}
+    return {kind: pool_stats[kind].snapshot(pool) for kind, pool in pools.items()}
+
+async def dispose_engines() -> None:
+    """Close pooled connections, e.g. on shutdown; engines are rebuilt on next use."""
+    global _engine, _async_engine
+    with _engine_lock:
+        engine, async_engine = _engine, _async_engine
+        _engine = _async_engine = None
+    if async_engine is not None:
+        await async_engine.dispose()
+    if engine is not None:
+        await run_in_threadpool(engine.dispose)
+
+def __getattr__(name):
+    # Keep "from app.database import engine" working without building the
+    # engine at import time
+    if name == "engine":
+        return get_engine()
+    if name == "async_engine":
+        return get_async_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# What get_db yields, depending on USE_ASYNC_DB
+DbSession = Union[AsyncSession, Session]
+
+@asynccontextmanager
+async def db_session():
+    """An AsyncSession, or a sync Session when USE_ASYNC_DB is off, closed on exit."""
+    request_engine()  # binds the session factory on first use
+    if settings.USE_ASYNC_DB:
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
 
-def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
+        # Returning the connection to the pool issues a ROLLBACK
+        await run_in_threadpool(db.close)
+
+async def get_db():
+    """Yield an AsyncSession, or a sync Session when USE_ASYNC_DB is off."""
+    async with db_session() as db:
+        yield db
+
+async def run_db(db, fn, *args, **kwargs):
+    """
+    Run a sync AssetCRUD method against either kind of session.
+
+    On an AsyncSession the method runs through run_sync on the asyncio driver,
+    so no thread is tied up; a sync Session is driven from the threadpool.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+async def run_in_session(fn, *args, **kwargs):
+    """run_db in a session of its own, for work not tied to one request."""
+    async with db_session() as db:
+        return await run_db(db, fn, *args, **kwargs)
 
 def init_db():
     try:
         print("Creating database tables...")
         # Import all models before creating tables
-        Base.metadata.create_all(bind=engine)
+        Base.metadata.create_all(bind=get_engine())
         print("Database tables created successfully!")
     except Exception as e:
         print(f"Error creating tables: {e}")
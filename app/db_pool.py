@@ -0,0 +1,92 @@
+import threading
+import time
+from typing import Dict, Optional, Type
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+from app.utils.request_timing import current_timer
+
+
+class PoolStats:
+    """
+    Checkout counters for one engine's pool. They outlive the pool itself
+    (dispose() builds a new one), so the exported counters only ever grow.
+    """
+
+    def __init__(self):
+        self.checkouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    def observe_checkout(self, seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def snapshot(self, pool: Optional[Pool]) -> Dict[str, float]:
+        """Counters plus the live pool's occupancy (zeros before the pool exists)."""
+        with self._lock:
+            stats = {
+                "checkouts": self.checkouts,
+                "wait_seconds": self.wait_seconds,
+                "max_wait_seconds": self.max_wait_seconds,
+                "timeouts": self.timeouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+            }
+        queue_pool = isinstance(pool, QueuePool)
+        stats.update(
+            size=pool.size() if queue_pool else 0,
+            checked_out=pool.checkedout() if queue_pool else 0,
+            idle=pool.checkedin() if queue_pool else 0,
+            overflow=max(pool.overflow(), 0) if queue_pool else 0,
+        )
+        return stats
+
+
+def instrumented_pool_class(base: Type[QueuePool], stats: PoolStats) -> Type[QueuePool]:
+    """
+    A subclass of base that times every checkout, including waiting for a
+    free connection and opening an overflow one. The wait is also added to
+    the current request's "pool" phase in Server-Timing.
+    """
+    class InstrumentedPool(base):
+        def _do_get(self):
+            started = time.perf_counter()
+            try:
+                connection = super()._do_get()
+            except exc.TimeoutError:
+                stats.count("timeouts")
+                raise
+            waited = time.perf_counter() - started
+            stats.observe_checkout(waited)
+            timer = current_timer()
+            if timer is not None:
+                timer.add("pool", waited)
+            return connection
+
+    InstrumentedPool.__name__ = f"Instrumented{base.__name__}"
+    return InstrumentedPool
+
+
+def instrument_pool(engine, stats: PoolStats) -> None:
+    """Count new and invalidated DBAPI connections on the engine's pool."""
+    event.listen(engine, "connect", lambda dbapi_connection, record: stats.count("connects"))
+    event.listen(engine, "invalidate", lambda dbapi_connection, record, error: stats.count("invalidations"))
+
+
+# One set of counters per engine kind, kept across engine rebuilds
+pool_stats = {"sync": PoolStats(), "async": PoolStats()}
+
+SyncPool = instrumented_pool_class(QueuePool, pool_stats["sync"])
+AsyncPool = instrumented_pool_class(AsyncAdaptedQueuePool, pool_stats["async"])
@@ -0,0 +1,84 @@
+import threading
+import time
+from collections import Counter
+from typing import List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.assets import Asset
+
+
+class FacilityIndex:
+    """
+    In-process set of facility names, reference-counted by the number of
+    assets in each facility.
+
+    AssetCRUD applies its writes to the counts after they commit, so reads are
+    served from memory. A cold (or expired) index is rebuilt with one GROUP BY
+    over facility_name, which the (facility_name, status, id) index covers. The
+    max age bounds staleness from writes made by other workers.
+    """
+
+    def __init__(self, max_age: float):
+        self.max_age = max_age
+        self._counts: Optional[Counter] = None
+        self._names: List[str] = []
+        self._loaded_at = 0.0
+        # Bumped by every write so a rebuild racing with one is not kept
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    def names(self, db: Session) -> List[str]:
+        with self._lock:
+            if self._counts is not None and time.monotonic() - self._loaded_at < self.max_age:
+                return list(self._names)
+            epoch = self._epoch
+
+        rows = db.execute(
+            select(Asset.facility_name, func.count()).group_by(Asset.facility_name)
+        ).all()
+        counts = Counter({name: count for name, count in rows})
+
+        with self._lock:
+            if epoch == self._epoch:
+                self._counts = counts
+                self._names = sorted(counts)
+                self._loaded_at = time.monotonic()
+        return sorted(counts)
+
+    def add(self, facility_name: str, count: int = 1) -> None:
+        self._apply({facility_name: count})
+
+    def remove(self, facility_name: str) -> None:
+        self._apply({facility_name: -1})
+
+    def move(self, old_name: str, new_name: str) -> None:
+        if old_name != new_name:
+            self._apply({old_name: -1, new_name: 1})
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._epoch += 1
+            self._counts = None
+
+    def _apply(self, deltas: dict) -> None:
+        with self._lock:
+            self._epoch += 1
+            if self._counts is None:
+                return
+            changed = False
+            for name, delta in deltas.items():
+                before = self._counts[name]
+                after = before + delta
+                if after > 0:
+                    self._counts[name] = after
+                else:
+                    self._counts.pop(name, None)
+                changed = changed or (before > 0) != (after > 0)
+            if changed:
+                self._names = sorted(self._counts)
+
+
+facility_index = FacilityIndex(max_age=settings.FACILITY_CACHE_MAX_AGE)
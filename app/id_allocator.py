@@ -0,0 +1,141 @@
+import threading
+from collections import deque
+from typing import List
+
+from sqlalchemy import Integer, String, cast, event, func, literal, select, text, update, insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.assets import Asset
+from app.models.id_allocator import AssetIdAllocator, asset_id_seq
+
+ASSET_ID_PREFIX = "AST"
+ALLOCATOR_NAME = "asset"
+
+
+def format_asset_id(number: int) -> str:
+    return f"{ASSET_ID_PREFIX}{str(number).zfill(4)}"  # Format: AST0001, AST0002, etc.
+
+
+def asset_id_sql(number, dialect_name: str):
+    """SQL expression for format_asset_id(number)."""
+    if dialect_name == "sqlite":
+        return func.printf(f"{ASSET_ID_PREFIX}%04d", number)
+    digits = cast(number, String)
+    return literal(ASSET_ID_PREFIX) + func.lpad(digits, func.greatest(func.length(digits), 4), "0")
+
+
+def highest_asset_number(conn: Connection) -> int:
+    """Largest numeric suffix among existing AST ids, 0 for an empty table."""
+    suffix = func.substr(Asset.asset_id, len(ASSET_ID_PREFIX) + 1)
+    highest = conn.execute(
+        select(func.max(cast(suffix, Integer)))
+        .where(Asset.asset_id.like(f"{ASSET_ID_PREFIX}%"))
+    ).scalar()
+    return highest or 0
+
+
+def seed_allocator(conn: Connection) -> None:
+    """Start numbering after the ids already in the assets table."""
+    next_value = highest_asset_number(conn) + 1
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("SELECT setval('asset_id_seq', :value, false)"), {"value": next_value})
+    conn.execute(insert(AssetIdAllocator).values(name=ALLOCATOR_NAME, next_value=next_value))
+
+
+@event.listens_for(AssetIdAllocator.__table__, "after_create")
+def _seed_on_create(target, connection, **kw):
+    # create_all on a database that already holds assets must not restart at 1
+    seed_allocator(connection)
+
+
+class AssetIdBlockAllocator:
+    """
+    Hands out asset_ids from blocks reserved in the database.
+
+    Each process reserves block_size numbers in one round trip (a Postgres
+    sequence, or an UPDATE on the asset_id_allocator table elsewhere) and then
+    assigns them from memory. Reservations run in their own transaction, so a
+    number is never handed out twice across workers; numbers from a failed
+    insert (unless released) or an unused block are simply skipped.
+
+    A reservation takes a pooled connection of its own, so reserve before the
+    session runs its first statement: a session already holding a connection
+    would need two at once and, under load, wait on a drained pool.
+    """
+
+    def __init__(self, block_size: int):
+        self.block_size = block_size
+        self._pending = deque()
+        # Never held across database I/O: under the async engine CRUD code runs
+        # in greenlets on the event loop thread, where that would deadlock
+        self._lock = threading.Lock()
+
+    def next_id(self, db: Session) -> str:
+        return self.reserve(db, 1)[0]
+
+    def reserve(self, db: Session, count: int) -> List[str]:
+        """Return count fresh asset_ids."""
+        while True:
+            with self._lock:
+                if len(self._pending) >= count:
+                    return [format_asset_id(self._pending.popleft()) for _ in range(count)]
+                missing = count - len(self._pending)
+            block = self._fetch_block(db, max(self.block_size, missing))
+            with self._lock:
+                self._pending.extend(block)
+
+    def release(self, *asset_ids: str) -> None:
+        """Hand back ids whose insert did not happen, to be assigned next in the same order."""
+        with self._lock:
+            self._pending.extendleft(int(asset_id[len(ASSET_ID_PREFIX):]) for asset_id in reversed(asset_ids))
+
+    def reserve_range(self, db: Session, count: int) -> range:
+        """
+        count consecutive numbers from the asset_id_allocator table, past this
+        worker's block, for ids assigned in SQL. On PostgreSQL, which hands out
+        numbers from a sequence with no consecutive ranges, use
+        asset_id_seq.next_value() in the statement instead.
+        """
+        if count <= 0:
+            return range(0)
+        with db.get_bind().begin() as conn:
+            numbers = self._fetch_table_block(conn, count)
+        return range(numbers[0], numbers[-1] + 1)
+
+    def reset(self) -> None:
+        """Forget reserved numbers, e.g. after the database was recreated."""
+        with self._lock:
+            self._pending.clear()
+
+    def _fetch_block(self, db: Session, size: int) -> List[int]:
+        engine = db.get_bind()
+        with engine.begin() as conn:
+            if conn.dialect.name == "postgresql":
+                return list(conn.execute(
+                    select(asset_id_seq.next_value()).select_from(func.generate_series(1, size))
+                ).scalars())
+            return self._fetch_table_block(conn, size)
+
+    def _fetch_table_block(self, conn: Connection, size: int) -> List[int]:
+        stmt = (
+            update(AssetIdAllocator)
+            .where(AssetIdAllocator.name == ALLOCATOR_NAME)
+            .values(next_value=AssetIdAllocator.next_value + size)
+            .returning(AssetIdAllocator.next_value)
+        )
+        end = conn.execute(stmt).scalar()
+        if end is None:
+            # Allocator row missing (table created outside create_all/alembic)
+            try:
+                with conn.begin_nested():
+                    seed_allocator(conn)
+            except IntegrityError:
+                pass  # another worker seeded it first
+            end = conn.execute(stmt).scalar()
+        return list(range(end - size, end))
+
+
+asset_id_allocator = AssetIdBlockAllocator(settings.ASSET_ID_BLOCK_SIZE)
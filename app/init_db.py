@@ -1,10 +1,10 @@
-from app.database import engine
+from app.database import get_engine
 from app.models.base import Base
 from app.models.assets import Asset
 
 def init_db():
     print("Creating database tables...")
-    Base.metadata.create_all(bind=engine)
+    Base.metadata.create_all(bind=get_engine())
     print("Database tables created successfully!")
 
 if __name__ == "__main__":
@@ -1,16 +1,58 @@
+import time
+
+IMPORT_STARTED = time.perf_counter()
+
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.utils.logging_config import setup_logging
+from app.utils.logging_config import setup_logging, stop_logging
 from app.middleware.monitoring import MonitoringMiddleware
-from app.middleware.rate_limit import RateLimitMiddleware
+from app.middleware.rate_limit import RateLimitMiddleware, create_rate_limit_backend, parse_limits
 from app.routers import AssetsRouter
-from app.database import engine, Base
+from app.database import dispose_engines, pool_status, request_engine
+from app.config import settings
+from app.auth_utils import token_cache
+from app.asset_cache import asset_cache
+from app.asset_stats import asset_stats
+from app.AssetsCrud import asset_reads
+from app.asset_import import import_runner
+from app.change_broker import change_broker
+from app.startup import StartupTimings, check_schema, prewarm_pool
+from app.utils.metrics import metrics, cache_collector, broker_collector, flight_collector, pool_collector
 
-# Setup logging
-logger = setup_logging("assets-service")
+logger = logging.getLogger("assets-service")
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+startup_timings = StartupTimings()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Per-worker startup and shutdown. Importing this module has no side
+    effects; logging, the schema check and the connection pool start here.
+    """
+    started = time.perf_counter()
+    setup_logging("assets-service")
+    engine = request_engine()
+    with startup_timings.phase("schema_check"):
+        await check_schema(engine, settings.SCHEMA_CHECK)
+    with startup_timings.phase("pool_prewarm"):
+        warmed = await prewarm_pool(engine, min(settings.DATABASE_POOL_PREWARM, settings.DATABASE_POOL_SIZE))
+    startup_timings.record("lifespan", time.perf_counter() - started)
+    logger.info(
+        "Startup complete in %.1f ms (import %.1f ms, schema check %.1f ms, pool pre-warm %.1f ms, %d connections)",
+        (startup_timings.phases["import"] + startup_timings.phases["lifespan"]) * 1000,
+        startup_timings.phases["import"] * 1000,
+        startup_timings.phases["schema_check"] * 1000,
+        startup_timings.phases["pool_prewarm"] * 1000,
+        warmed
+    )
+    yield
+    # Running imports stop after their current chunk and are marked failed
+    await import_runner.shutdown()
+    await dispose_engines()
+    stop_logging()
 
 app = FastAPI(
     title="Assets Microservice",
@@ -19,12 +61,23 @@ app = FastAPI(
     # Use standard paths for docs or specify custom paths
     docs_url="/docs",  # Changed from /api/assets/docs
     redoc_url="/redoc",  # Changed from /api/assets/redoc
-    openapi_url="/openapi.json"  # Changed from /api/assets/openapi.json
+    openapi_url="/openapi.json",  # Changed from /api/assets/openapi.json
+    lifespan=lifespan
 )
 
 # Add middlewares
-app.add_middleware(MonitoringMiddleware)
-app.add_middleware(RateLimitMiddleware, requests_per_minute=100)  # Adjust the limit as needed
+app.add_middleware(
+    MonitoringMiddleware,
+    query_budget=settings.QUERY_BUDGET,
+    query_budgets=parse_limits(settings.QUERY_BUDGETS)
+)
+app.add_middleware(
+    RateLimitMiddleware,
+    requests_per_minute=settings.RATE_LIMIT_PER_MINUTE,
+    backend=create_rate_limit_backend(settings.RATE_LIMIT_STORAGE_URL),
+    role_limits=parse_limits(settings.RATE_LIMIT_ROLE_LIMITS),
+    route_limits=parse_limits(settings.RATE_LIMIT_ROUTE_LIMITS)
+)
 
 # CORS middleware
 app.add_middleware(
@@ -36,12 +89,30 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
-# Include routers - Note: Don't include the prefix here since it's already in the router
-app.include_router(AssetsRouter.router)
-
+# Service endpoints are registered before the assets router, whose
+# catch-all GET /{id} would otherwise shadow them
 @app.get("/health")
 async def health_check():
     """Health check endpoint for monitoring"""
     return {"status": "healthy", "service": "assets-service"}
+
+metrics.register_collector(cache_collector("token_cache", token_cache))
+metrics.register_collector(cache_collector("asset_cache", asset_cache))
+metrics.register_collector(cache_collector("stats_cache", asset_stats))
+metrics.register_collector(broker_collector(change_broker))
+metrics.register_collector(startup_timings.collect)
+metrics.register_collector(pool_collector(pool_status))
+metrics.register_collector(flight_collector("asset_reads", asset_reads))
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def prometheus_metrics():
+    """Request latency histograms, status counters, cache and stream stats in Prometheus text format"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+# Include routers - Note: Don't include the prefix here since it's already in the router
+app.include_router(AssetsRouter.router)
+
+startup_timings.record("import", time.perf_counter() - IMPORT_STARTED)
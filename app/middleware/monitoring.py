@@ -1,51 +1,98 @@
 import time
 import uuid
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from typing import Dict, Optional
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import logging
+from app.utils.metrics import MetricsRegistry, metrics
+from app.utils.request_timing import RequestTimer, request_timer
 
 logger = logging.getLogger("assets-service")
 
-class MonitoringMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
+def route_template(scope: Scope) -> str:
+    """The matched route's path template, e.g. "/{id}", to keep metric labels bounded."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+class MonitoringMiddleware:
+    """
+    Pure ASGI middleware that tags every request with an id, adds
+    X-Request-ID / X-Process-Time / Server-Timing headers and records
+    per-route metrics.
+
+    Server-Timing breaks the request down into db (with the statement count),
+    auth and serialize time. Requests issuing more statements than their
+    route's budget are logged as warnings.
+    """
+
+    def __init__(self, app: ASGIApp, registry: MetricsRegistry = metrics,
+                 query_budget: int = 20, query_budgets: Optional[Dict[str, int]] = None):
+        self.app = app
+        self.registry = registry
+        self.query_budget = query_budget
+        self.query_budgets = query_budgets or {}
+
+    def budget_for(self, method: str, route: str) -> int:
+        budget = self.query_budgets.get(f"{method} {route}")
+        return budget if budget is not None else self.query_budgets.get(route, self.query_budget)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         request_id = str(uuid.uuid4())
-        request.state.request_id = request_id
-        
-        # Add request ID to logger context
-        logger_adapter = logging.LoggerAdapter(
-            logger, 
-            {"request_id": request_id}
-        )
-        
-        start_time = time.time()
-        
-        # Log request details
-        logger_adapter.info(
-            f"Request started: {request.method} {request.url.path}"
-        )
-        
+        # Starlette exposes scope["state"] as request.state
+        scope.setdefault("state", {})["request_id"] = request_id
+        method = scope["method"]
+        start_time = time.perf_counter()
+        status_code = 500
+        timer = RequestTimer(request_id)
+        timer_token = request_timer.set(timer)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Request started: %s %s", method, scope["path"],
+                         extra={"request_id": request_id})
+
+        async def send_with_headers(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Process-Time", str(time.perf_counter() - start_time))
+                headers.append("X-Request-ID", request_id)
+                headers.append("Server-Timing", timer.server_timing(time.perf_counter() - start_time))
+            await send(message)
+
+        self.registry.in_flight += 1
         try:
-            response = await call_next(request)
-            
-            # Calculate processing time
-            process_time = time.time() - start_time
-            response.headers["X-Process-Time"] = str(process_time)
-            response.headers["X-Request-ID"] = request_id
-            
-            # Log response details
-            logger_adapter.info(
-                f"Request completed: {request.method} {request.url.path} "
-                f"- Status: {response.status_code} - Time: {process_time:.4f}s"
-            )
-            
-            return response
-            
+            await self.app(scope, receive, send_with_headers)
         except Exception as e:
-            # Log exception
-            process_time = time.time() - start_time
-            logger_adapter.error(
-                f"Request failed: {request.method} {request.url.path} "
-                f"- Error: {str(e)} - Time: {process_time:.4f}s",
-                exc_info=True
+            status_code = 500
+            logger.error(
+                "Request failed: %s %s - Error: %s - Time: %.4fs",
+                method, scope["path"], e, time.perf_counter() - start_time,
+                exc_info=True, extra={"request_id": request_id}
+            )
+            raise
+        finally:
+            request_timer.reset(timer_token)
+            self.registry.in_flight -= 1
+            process_time = time.perf_counter() - start_time
+            route = route_template(scope)
+            self.registry.observe_request(method, route, status_code, process_time)
+
+        budget = self.budget_for(method, route)
+        if timer.statements > budget:
+            logger.warning(
+                "Query budget exceeded: %s %s issued %d statements (budget %d for %s)",
+                method, scope["path"], timer.statements, budget, route,
+                extra={"request_id": request_id}
+            )
+
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Request completed: %s %s - Status: %s - Time: %.4fs - DB: %d statements, %.4fs",
+                method, scope["path"], status_code, process_time, timer.statements, timer.phases["db"],
+                extra={"request_id": request_id, "log_sample": True}
             )
-            raise
\ No newline at end of file
@@ -1,47 +1,200 @@
 import time
-from fastapi import Request, Response, HTTPException, status
-from starlette.middleware.base import BaseHTTPMiddleware
+from abc import ABC, abstractmethod
+from fastapi import Response, status
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import logging
-from collections import defaultdict
+from typing import Dict, Optional, Tuple
+from jose import JWTError
+from pydantic import ValidationError
+from app.auth_utils import verify_token
 
 logger = logging.getLogger("assets-service")
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app, requests_per_minute=60):
-        super().__init__(app)
+class RateLimitBackend(ABC):
+    """
+    Storage for sliding-window request counters.
+
+    hit() returns how many requests key has made in the last window, this one
+    included: the count for the window starting at window_start plus the
+    previous window's count weighted by overlap, the share of it still inside
+    the last window. The request is only counted if that stays within limit,
+    so rejected requests don't keep a client locked out.
+    """
+
+    @abstractmethod
+    async def hit(self, key: str, window_start: int, window: int, overlap: float, limit: int) -> int:
+        ...
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """Per-process counters; idle clients are swept out periodically."""
+
+    def __init__(self, cleanup_interval: int = 60):
+        self.cleanup_interval = cleanup_interval
+        self.counters: Dict[str, list] = {}  # key -> [window_start, current, previous]
+        self._next_cleanup = time.time() + cleanup_interval
+
+    async def hit(self, key: str, window_start: int, window: int, overlap: float, limit: int) -> int:
+        now = time.time()
+        if now >= self._next_cleanup:
+            self._evict_idle(now, window)
+
+        counter = self.counters.get(key)
+        if counter is None:
+            counter = self.counters[key] = [window_start, 0, 0]
+        elif counter[0] != window_start:
+            # Roll over; anything older than the previous window no longer counts
+            counter[2] = counter[1] if counter[0] == window_start - window else 0
+            counter[0] = window_start
+            counter[1] = 0
+        used = int(counter[2] * overlap) + counter[1] + 1
+        if used <= limit:
+            counter[1] += 1
+        return used
+
+    def _evict_idle(self, now: float, window: int) -> None:
+        cutoff = now - 2 * window
+        idle = [key for key, counter in self.counters.items() if counter[0] < cutoff]
+        for key in idle:
+            del self.counters[key]
+        self._next_cleanup = now + self.cleanup_interval
+
+# Check and count in one atomic step, so concurrent requests from several
+# workers can't all pass a check made before any of them was counted
+HIT_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+local used = math.floor(previous * tonumber(ARGV[1])) + current + 1
+if used <= tonumber(ARGV[2]) then
+    redis.call('INCR', KEYS[1])
+    redis.call('EXPIRE', KEYS[1], ARGV[3])
+end
+return used
+"""
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """
+    Counters shared by every worker, kept in Redis (or anything exposing the
+    same asyncio client API with register_script() and Lua scripting).
+    """
+
+    def __init__(self, client, prefix: str = "ratelimit"):
+        self.client = client
+        self.prefix = prefix
+        self._hit = client.register_script(HIT_SCRIPT)
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs):
+        # Optional dependency, only needed when a shared store is configured
+        import redis.asyncio as redis
+        return cls(redis.from_url(url), **kwargs)
+
+    async def hit(self, key: str, window_start: int, window: int, overlap: float, limit: int) -> int:
+        current_key = f"{self.prefix}:{key}:{window_start}"
+        previous_key = f"{self.prefix}:{key}:{window_start - window}"
+        used = await self._hit(keys=[current_key, previous_key], args=[repr(overlap), limit, 2 * window])
+        return int(used)
+
+def create_rate_limit_backend(url: str) -> RateLimitBackend:
+    """Build a backend from RATE_LIMIT_STORAGE_URL (memory:// or redis://...)."""
+    if not url or url.startswith("memory://"):
+        return InMemoryRateLimitBackend()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisRateLimitBackend.from_url(url)
+    raise ValueError(f"Unsupported rate limit storage: {url}")
+
+def parse_limits(value: str) -> Dict[str, int]:
+    """Parse "ADMIN=300,STAFF=200" style settings."""
+    limits = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        name, _, limit = item.rpartition("=")
+        limits[name.strip()] = int(limit)
+    return limits
+
+class RateLimitMiddleware:
+    """
+    Pure ASGI sliding-window-counter rate limiting with O(1) work per request.
+
+    Authenticated callers are counted per user and may get a per-role limit;
+    anonymous callers are counted per client IP. Path prefixes in route_limits
+    get their own counter and limit, which takes precedence over the role.
+    """
+
+    window = 60
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        requests_per_minute=60,
+        backend: Optional[RateLimitBackend] = None,
+        role_limits: Optional[Dict[str, int]] = None,
+        route_limits: Optional[Dict[str, int]] = None
+    ):
+        self.app = app
         self.requests_per_minute = requests_per_minute
-        self.request_counts = defaultdict(list)
-        
-    async def dispatch(self, request: Request, call_next):
-        # Get client IP
-        client_ip = request.client.host
-        
-        # Clean up old requests
+        self.backend = backend or InMemoryRateLimitBackend()
+        self.role_limits = {role.upper(): limit for role, limit in (role_limits or {}).items()}
+        # Longest prefix wins
+        self.route_limits = sorted((route_limits or {}).items(), key=lambda item: -len(item[0]))
+
+    def _identify(self, scope: Scope) -> Tuple[str, Optional[str]]:
+        authorization = Headers(scope=scope).get("authorization", "")
+        if authorization[:7].lower() == "bearer ":
+            try:
+                # Verified tokens are cached, so this is usually a dict lookup
+                token_data = verify_token(authorization[7:])
+                return f"user:{token_data.username}", token_data.role
+            except (JWTError, ValidationError):
+                pass
+        client = scope.get("client")
+        client_ip = client[0] if client else "unknown"
+        return f"ip:{client_ip}", None
+
+    def _limit_for(self, path: str, role: Optional[str]) -> Tuple[str, int]:
+        for prefix, limit in self.route_limits:
+            if path.startswith(prefix):
+                return prefix, limit
+        if role and role.upper() in self.role_limits:
+            return "*", self.role_limits[role.upper()]
+        return "*", self.requests_per_minute
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        identity, role = self._identify(scope)
+        prefix, limit = self._limit_for(scope["path"], role)
+
         current_time = time.time()
-        self.request_counts[client_ip] = [
-            timestamp for timestamp in self.request_counts[client_ip] 
-            if current_time - timestamp < 60
-        ]
-        
+        window_start = int(current_time // self.window) * self.window
+        # Weight the previous window by how much of it still overlaps the last minute
+        overlap = 1 - (current_time - window_start) / self.window
+        used = await self.backend.hit(f"{identity}:{prefix}", window_start, self.window, overlap, limit)
+
         # Check if rate limit exceeded
-        if len(self.request_counts[client_ip]) >= self.requests_per_minute:
-            logger.warning(f"Rate limit exceeded for IP: {client_ip}")
-            return Response(
+        if used > limit:
+            logger.warning("Rate limit exceeded for %s", identity)
+            response = Response(
                 content='{"detail":"Rate limit exceeded. Please try again later."}',
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                media_type="application/json"
+                media_type="application/json",
+                headers={"Retry-After": str(int(window_start + self.window - current_time) + 1)}
             )
-        
-        # Add current request timestamp
-        self.request_counts[client_ip].append(current_time)
-        
-        # Process the request
-        response = await call_next(request)
-        
-        # Add rate limit headers
-        remaining = self.requests_per_minute - len(self.request_counts[client_ip])
-        response.headers["X-RateLimit-Limit"] = str(self.requests_per_minute)
-        response.headers["X-RateLimit-Remaining"] = str(remaining)
-        response.headers["X-RateLimit-Reset"] = str(int(current_time + 60))
-        
-        return response
\ No newline at end of file
+            await response(scope, receive, send)
+            return
+
+        rate_limit_headers = {
+            "X-RateLimit-Limit": str(limit),
+            "X-RateLimit-Remaining": str(max(limit - used, 0)),
+            "X-RateLimit-Reset": str(window_start + self.window),
+        }
+
+        async def send_with_headers(message: Message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                for name, value in rate_limit_headers.items():
+                    headers.append(name, value)
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
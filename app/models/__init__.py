@@ -1,5 +1,9 @@
 from app.models.base import Base
 from app.models.assets import Asset
+from app.models.id_allocator import AssetIdAllocator
+from app.models.asset_changes import AssetChange
+from app.models.asset_imports import AssetImport, AssetImportRow
+# Full-text search objects, created along with the assets table
+import app.models.asset_search  # noqa: F401
 
-__all__ = ['Base', 'Asset']
-
+__all__ = ['Base', 'Asset', 'AssetIdAllocator', 'AssetChange', 'AssetImport', 'AssetImportRow']
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, BigInteger, Integer, String, DateTime, JSON, func
+from app.models.base import Base
+
+class AssetChange(Base):
+    """One committed create/update/delete of an asset, in commit order."""
+    __tablename__ = "asset_changes"
+
+    # SQLite only auto-increments INTEGER PRIMARY KEY columns
+    seq = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    asset_id = Column(String, nullable=False)
+    operation = Column(String, nullable=False)  # create, update or delete
+    version = Column(Integer, nullable=False)
+    payload = Column(JSON, nullable=True)  # AssetResponse fields; NULL for delete tombstones
+    changed_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    def __repr__(self):
+        return f"AssetChange(seq={self.seq}, asset_id={self.asset_id}, operation={self.operation})"
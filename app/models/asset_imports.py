@@ -0,0 +1,54 @@
+from sqlalchemy import Column, BigInteger, Integer, String, Date, DateTime, Numeric, Index, func, Enum as SQLAlchemyEnum
+from app.models.base import Base
+from app.models.assets import Status
+
+class AssetImport(Base):
+    """One CSV import job and its progress."""
+    __tablename__ = "asset_imports"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    status = Column(String, nullable=False)  # queued, validating, merging, completed or failed
+    created_by = Column(String, nullable=False)
+    rows_read = Column(Integer, nullable=False, default=0, server_default="0")
+    rows_invalid = Column(Integer, nullable=False, default=0, server_default="0")
+    rows_duplicate = Column(Integer, nullable=False, default=0, server_default="0")
+    rows_imported = Column(Integer, nullable=False, default=0, server_default="0")
+    error = Column(String, nullable=True)  # why the job failed as a whole
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"AssetImport(id={self.id}, status={self.status})"
+
+class AssetImportRow(Base):
+    """
+    Staging for an import: validated rows wait here for the merge into
+    assets; rejected rows stay behind with their error as the job's report.
+    """
+    __tablename__ = "asset_import_rows"
+    __table_args__ = (
+        Index("ix_asset_import_rows_import_row", "import_id", "row_number"),
+        # Serial-number dedupe against assets and within the file
+        Index("ix_asset_import_rows_import_serial", "import_id", "serial_number", "row_number"),
+    )
+
+    # SQLite only auto-increments INTEGER PRIMARY KEY columns
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    import_id = Column(Integer, nullable=False)
+    row_number = Column(Integer, nullable=False)  # in the file, the header being row 1
+    # The AssetCreate fields; NULL on rows that failed validation
+    asset_name = Column(String)
+    value = Column(Numeric)
+    purchase_date = Column(Date)
+    manufacturer = Column(String)
+    model = Column(String)
+    serial_number = Column(String)
+    supplier = Column(String)
+    warranty = Column(Integer)
+    warranty_expiry = Column(Date)
+    status = Column(SQLAlchemyEnum(Status))
+    facility_name = Column(String)
+    error = Column(String, nullable=True)
+
+    def __repr__(self):
+        return f"AssetImportRow(import_id={self.import_id}, row_number={self.row_number})"
@@ -0,0 +1,90 @@
+from sqlalchemy import event
+
+from app.models.assets import Asset
+
+# Word-searchable columns; serial numbers are matched by substring instead
+SEARCH_COLUMNS = ["asset_name", "manufacturer", "model", "supplier"]
+
+# The searchable columns as one string; the same expression on both sides of
+# the PostgreSQL trigram index and its queries
+SEARCH_TEXT = " || ' ' || ".join(f"coalesce({column}, '')" for column in SEARCH_COLUMNS)
+_fts_columns = ", ".join(SEARCH_COLUMNS)
+_new_values = ", ".join(f"new.{column}" for column in SEARCH_COLUMNS)
+_old_values = ", ".join(f"old.{column}" for column in SEARCH_COLUMNS)
+
+# Made by the DDL below rather than declared on the model; autogenerate in
+# alembic/env.py skips them. FTS5 adds _config, _data, _docsize and _idx
+# shadow tables to each virtual table.
+SEARCH_TABLES = ("assets_fts", "assets_serial_fts", "assets_text_fts")
+SEARCH_VECTOR_COLUMN = "search_vector"
+SEARCH_INDEXES = ("ix_assets_search_vector", "ix_assets_serial_number_trgm", "ix_assets_search_text_trgm")
+
+# PostgreSQL: a stored tsvector kept up to date by the database itself, with
+# a GIN index, plus trigram indexes for partial serial numbers and misspelt words
+POSTGRESQL_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"ALTER TABLE assets ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    f"GENERATED ALWAYS AS (to_tsvector('simple', {SEARCH_TEXT})) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_assets_search_vector ON assets USING gin (search_vector)",
+    "CREATE INDEX IF NOT EXISTS ix_assets_serial_number_trgm ON assets USING gin (serial_number gin_trgm_ops)",
+    f"CREATE INDEX IF NOT EXISTS ix_assets_search_text_trgm ON assets USING gin (({SEARCH_TEXT}) gin_trgm_ops)",
+]
+
+# SQLite: FTS5 shadow tables over the assets rows (word prefixes, and
+# trigrams for partial serial numbers and misspelt words), kept in sync by triggers
+SQLITE_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS assets_fts USING fts5("
+    f"{_fts_columns}, content='assets', content_rowid='id', prefix='2 3')",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS assets_serial_fts USING fts5("
+    "serial_number, content='assets', content_rowid='id', tokenize='trigram')",
+    f"""CREATE TRIGGER IF NOT EXISTS assets_fts_insert AFTER INSERT ON assets BEGIN
+        INSERT INTO assets_fts(rowid, {_fts_columns}) VALUES (new.id, {_new_values});
+        INSERT INTO assets_serial_fts(rowid, serial_number) VALUES (new.id, new.serial_number);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS assets_fts_delete AFTER DELETE ON assets BEGIN
+        INSERT INTO assets_fts(assets_fts, rowid, {_fts_columns}) VALUES ('delete', old.id, {_old_values});
+        INSERT INTO assets_serial_fts(assets_serial_fts, rowid, serial_number) VALUES ('delete', old.id, old.serial_number);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS assets_fts_update AFTER UPDATE OF {_fts_columns}, serial_number ON assets BEGIN
+        INSERT INTO assets_fts(assets_fts, rowid, {_fts_columns}) VALUES ('delete', old.id, {_old_values});
+        INSERT INTO assets_serial_fts(assets_serial_fts, rowid, serial_number) VALUES ('delete', old.id, old.serial_number);
+        INSERT INTO assets_fts(rowid, {_fts_columns}) VALUES (new.id, {_new_values});
+        INSERT INTO assets_serial_fts(rowid, serial_number) VALUES (new.id, new.serial_number);
+    END""",
+    "INSERT INTO assets_fts(assets_fts) VALUES ('rebuild')",
+    "INSERT INTO assets_serial_fts(assets_serial_fts) VALUES ('rebuild')",
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS assets_text_fts USING fts5("
+    f"{_fts_columns}, content='assets', content_rowid='id', tokenize='trigram')",
+    f"""CREATE TRIGGER IF NOT EXISTS assets_text_fts_insert AFTER INSERT ON assets BEGIN
+        INSERT INTO assets_text_fts(rowid, {_fts_columns}) VALUES (new.id, {_new_values});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS assets_text_fts_delete AFTER DELETE ON assets BEGIN
+        INSERT INTO assets_text_fts(assets_text_fts, rowid, {_fts_columns}) VALUES ('delete', old.id, {_old_values});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS assets_text_fts_update AFTER UPDATE OF {_fts_columns} ON assets BEGIN
+        INSERT INTO assets_text_fts(assets_text_fts, rowid, {_fts_columns}) VALUES ('delete', old.id, {_old_values});
+        INSERT INTO assets_text_fts(rowid, {_fts_columns}) VALUES (new.id, {_new_values});
+    END""",
+    "INSERT INTO assets_text_fts(assets_text_fts) VALUES ('rebuild')",
+]
+
+SEARCH_DDL = {"postgresql": POSTGRESQL_DDL, "sqlite": SQLITE_DDL}
+
+
+@event.listens_for(Asset.__table__, "after_create")
+def _create_search_index(target, connection, **kw):
+    # The same objects the migration creates, for databases built by create_all;
+    # registered here so any create_all over the models gets them
+    for statement in SEARCH_DDL.get(connection.dialect.name, []):
+        connection.exec_driver_sql(statement)
+
+
+def is_search_object(name: str, type_: str) -> bool:
+    """Whether a reflected table, column or index belongs to the search DDL."""
+    if type_ == "table":
+        return any(name == table or name.startswith(f"{table}_") for table in SEARCH_TABLES)
+    if type_ == "column":
+        return name == SEARCH_VECTOR_COLUMN
+    if type_ == "index":
+        return name in SEARCH_INDEXES
+    return False
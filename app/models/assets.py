@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, Numeric, Enum as SQLAlchemyEnum
+from sqlalchemy import Column, Integer, String, Date, DateTime, Numeric, Index, func, text, Enum as SQLAlchemyEnum
 from app.models.base import Base
 from enum import Enum
 
@@ -8,6 +8,22 @@ class Status(str, Enum):
 
 class Asset(Base):
     __tablename__ = "assets"
+    __table_args__ = (
+        # Keyset pagination of /get/all, with and without a facility filter
+        Index("ix_assets_facility_status_id", "facility_name", "status", "id"),
+        Index("ix_assets_status_id", "status", "id"),
+        # /stats grouped by manufacturer or purchase month; on PostgreSQL the
+        # included columns let the aggregate run as an index-only scan
+        Index("ix_assets_manufacturer", "manufacturer", postgresql_include=["value", "warranty_expiry"]),
+        Index("ix_assets_purchase_date", "purchase_date", postgresql_include=["value", "warranty_expiry"]),
+        # Warranties expiring soon, per facility, in expiry order; PostgreSQL
+        # also gets a smaller partial index for the default ACTIVE-only query
+        Index("ix_assets_facility_warranty_expiry", "facility_name", "warranty_expiry", "id"),
+        Index(
+            "ix_assets_active_facility_warranty_expiry", "facility_name", "warranty_expiry", "id",
+            postgresql_where=text("status = 'ACTIVE'")
+        ).ddl_if(dialect="postgresql"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     asset_id = Column(String, nullable=False, unique=True)
@@ -22,6 +38,10 @@ class Asset(Base):
     warranty_expiry = Column(Date, nullable=False)
     status = Column(SQLAlchemyEnum(Status), default=Status.ACTIVE)
     facility_name = Column(String, nullable=False)
+    # Bumped by AssetCRUD.update_asset's UPDATE ... RETURNING when a value
+    # changes; drives ETags, and If-Match is checked in the write's WHERE clause
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
 
     def __repr__(self):
         return f"Asset(asset_id={self.asset_id}, name={self.asset_name})"
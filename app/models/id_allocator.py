@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, BigInteger, Sequence
+from app.models.base import Base
+
+# Postgres hands out asset_id numbers from this sequence; other databases
+# fall back to the asset_id_allocator table below
+asset_id_seq = Sequence("asset_id_seq", start=1, increment=1, metadata=Base.metadata)
+
+class AssetIdAllocator(Base):
+    __tablename__ = "asset_id_allocator"
+
+    name = Column(String, primary_key=True)
+    next_value = Column(BigInteger, nullable=False)
+
+    def __repr__(self):
+        return f"AssetIdAllocator(name={self.name}, next_value={self.next_value})"
@@ -1,20 +1,35 @@
-from fastapi import APIRouter, Depends, Security, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Security, HTTPException, status, Query, Header, Request, Response
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
-from app.schemas.assets import AssetCreate, AssetResponse, FacilityNamesResponse
-from app.database import get_db
-from app.AssetsCrud import AssetCRUD
+from app.schemas.assets import (
+    AssetBatchRequest, AssetBatchResponse, AssetCreate, AssetImportError, AssetImportResponse, AssetResponse,
+    AssetStatsResponse, BulkCreateResponse, ChangeFeedResponse, ExportFormat, FacilityNamesResponse, StatsGroupBy
+)
+from app.database import DbSession, get_db, get_engine, run_db, run_in_session, SessionLocal
+from app.config import settings
+from app.AssetsCrud import AssetCRUD, RESPONSE_COLUMNS, RESPONSE_FIELDS, asset_reads
+from app.utils.export import accepts_gzip, ndjson_chunks, csv_chunks, gzip_chunks, json_array
+from app.utils.etag import asset_etag, etag_matches, make_etag
+from app.utils.request_timing import TimedRoute, timed
+from app.change_feed import change_notifier
+from app.change_broker import change_broker
+from app.asset_import import create_import, get_import, get_import_errors, import_runner, spool_upload
+import asyncio
+import json
+import time
 from app.auth_utils import get_current_user, get_admin_user, get_staff_user, User
 
 # Restore the original router configuration
 router = APIRouter(
-    tags=["assets"]
+    tags=["assets"],
+    route_class=TimedRoute
 )
 
 @router.post("/addAsset", response_model=AssetResponse)
-def create_asset(
+async def create_asset(
     asset: AssetCreate, 
-    db: Session = Depends(get_db),
+    response: Response,
+    db: DbSession = Depends(get_db),
     current_user: User = Security(get_current_user, scopes=["ADMIN", "STAFF"])
 ):
     """
@@ -36,48 +51,401 @@ def create_asset(
     
     Requires ADMIN or STAFF role.
     """
-    return AssetCRUD.create_asset(db, asset)
+    db_asset = await run_db(db, AssetCRUD.create_asset, asset)
+    response.headers["ETag"] = asset_etag(db_asset.asset_id, db_asset.version)
+    return db_asset
+
+@router.post("/addAssets", response_model=BulkCreateResponse)
+async def create_assets(
+    assets: List[AssetCreate],
+    db: DbSession = Depends(get_db),
+    current_user: User = Security(get_current_user, scopes=["ADMIN", "STAFF"])
+):
+    """
+    Create many assets in a single request, e.g. when onboarding a facility.
+    
+    - Request body: a list of assets, each with the same fields as /addAsset
+    
+    All rows are inserted in one transaction. Items whose serial number already
+    exists (in the database or earlier in the list) are skipped and reported
+    with an error; the rest are created. Returns one result per item, in order.
+    
+    Requires ADMIN or STAFF role.
+    """
+    if len(assets) > settings.BULK_CREATE_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.BULK_CREATE_MAX_ITEMS} assets per request"
+        )
+    results = await run_db(db, AssetCRUD.create_assets, assets)
+    created = sum(1 for result in results if result["success"])
+    return {"created": created, "failed": len(results) - created, "results": results}
 
 @router.patch("/{id}", response_model=AssetResponse)
-def update_asset(
+async def update_asset(
     id: str, 
     asset: AssetCreate, 
-    db: Session = Depends(get_db),
-    current_user: User = Security(get_current_user, scopes=["ADMIN", "STAFF"])
+    response: Response,
+    db: DbSession = Depends(get_db),
+    current_user: User = Security(get_current_user, scopes=["ADMIN", "STAFF"]),
+    if_match: Optional[str] = Header(None, description="ETag the update is based on")
 ):
     """
     Update an existing asset by its asset_id.
     
     - **id**: The asset_id of the asset to update (e.g., "AST0001")
     - Request body: Same as for creating an asset, but fields are optional
+    - **If-Match**: Optional ETag from a previous read; the update is rejected
+      with 412 if the asset has changed since
     
-    Returns the updated asset if found, otherwise returns a 404 error.
+    Returns the updated asset and its new ETag if found, otherwise returns a 404 error.
     
     Requires ADMIN or STAFF role.
     """
-    return AssetCRUD.update_asset(db, id, asset)
+    db_asset = await run_db(db, AssetCRUD.update_asset, id, asset, if_match)
+    response.headers["ETag"] = asset_etag(db_asset.asset_id, db_asset.version)
+    return db_asset
 
 @router.delete("/{id}", response_model=None)
-def delete_asset(
+async def delete_asset(
     id: str, 
-    db: Session = Depends(get_db),
-    current_user: User = Security(get_current_user, scopes=["ADMIN"])
+    db: DbSession = Depends(get_db),
+    current_user: User = Security(get_current_user, scopes=["ADMIN"]),
+    if_match: Optional[str] = Header(None, description="ETag the delete is based on")
 ):
     """
     Delete an asset by its asset_id.
     
     - **id**: The asset_id of the asset to delete (e.g., "AST0001")
+    - **If-Match**: Optional ETag from a previous read; the delete is rejected
+      with 412 if the asset has changed since
     
     Returns a success message if the asset was deleted, otherwise returns a 404 error.
     
     Requires ADMIN role.
     """
-    return AssetCRUD.delete_asset(db, id)
+    return await run_db(db, AssetCRUD.delete_asset, id, if_match)
+
+@router.get("/export", response_class=StreamingResponse)
+def export_assets(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    format: ExportFormat = Query(ExportFormat.NDJSON, description="ndjson or csv"),
+    status: Optional[str] = Query(None, description="Filter by asset status"),
+    facility: Optional[str] = Query(None, description="Filter by facility name")
+):
+    """
+    Stream the whole asset inventory in a single response.
+    
+    - **format**: "ndjson" (one AssetResponse object per line) or "csv"
+    - **status**: Filter assets by status
+    - **facility**: Filter assets by facility name
+    
+    Rows are read with a server-side cursor in fixed-size batches, so one export
+    uses one connection and constant memory. The body is gzip-compressed when
+    the client sends Accept-Encoding: gzip.
+    
+    Accessible to all authenticated users.
+    """
+    columns = [column.name for column in RESPONSE_COLUMNS]
+    serialize = csv_chunks if format == ExportFormat.CSV else ndjson_chunks
+    compress = accepts_gzip(request.headers.get("accept-encoding", ""))
+
+    def generate():
+        # The session lives as long as the stream, not the request handler
+        db = SessionLocal(bind=get_engine())
+        try:
+            batches = AssetCRUD.stream_assets(
+                db, status_filter=status, facility=facility,
+                batch_size=settings.EXPORT_BATCH_SIZE
+            )
+            chunks = serialize(batches, columns)
+            yield from gzip_chunks(chunks) if compress else chunks
+        finally:
+            db.close()
+
+    media_type = "text/csv" if format == ExportFormat.CSV else "application/x-ndjson"
+    headers = {
+        "Content-Disposition": f'attachment; filename="assets.{format.value}"',
+        "Vary": "Accept-Encoding",
+    }
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(generate(), media_type=media_type, headers=headers)
+
+@router.get("/search", response_model=List[AssetResponse])
+async def search_assets(
+    db: DbSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    q: str = Query(..., min_length=1, max_length=200, description="Words or part of a serial number"),
+    status: Optional[str] = Query(None, description="Filter by asset status"),
+    facility: Optional[str] = Query(None, description="Filter by facility name"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of records to return")
+):
+    """
+    Search assets by name, manufacturer, model, supplier and serial number.
+    
+    - **q**: Search text, e.g. "philips mon" or "SN-4471"
+    - **status**: Filter assets by status (e.g., "ACTIVE", "INACTIVE")
+    - **facility**: Filter assets by facility name
+    - **limit**: Maximum number of records to return
+    
+    Every word must match the beginning of a word in the name, manufacturer,
+    model or supplier; a single token of three or more characters also matches
+    anywhere in the serial number. Misspelt words ("phillips moniter") still
+    find close matches, listed after exact ones. Results are ordered by relevance.
+    
+    Accessible to all authenticated users.
+    """
+    assets = await run_db(db, AssetCRUD.search_assets, q, status_filter=status, facility=facility, limit=limit)
+    with timed("serialize"):
+        content = json_array(assets, RESPONSE_FIELDS)
+    return Response(content=content, media_type="application/json")
+
+@router.get("/stats", response_model=AssetStatsResponse)
+async def get_stats(
+    db: DbSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    group_by: StatsGroupBy = Query(StatsGroupBy.FACILITY_NAME, description="Dimension to group by"),
+    status: Optional[str] = Query(None, description="Filter by status (ACTIVE, INACTIVE)"),
+    facility: Optional[str] = Query(None, description="Filter by facility name")
+):
+    """
+    Inventory counts and value per facility, status, manufacturer or purchase
+    month (YYYY-MM).
+    
+    - **group_by**: facility_name, status, manufacturer or purchase_month
+    - **status**: Only count assets with this status
+    - **facility**: Only count assets in this facility
+    
+    Each group has the asset count, total and average value, and how many
+    assets (and what share) are still under warranty; totals covers all
+    groups. Computed in the database and cached for a few seconds.
+    
+    Accessible to all authenticated users.
+    """
+    return await run_db(db, AssetCRUD.get_stats, group_by.value, status, facility)
+
+@router.get("/changes", response_model=ChangeFeedResponse)
+async def get_changes(
+    current_user: User = Depends(get_current_user),
+    since: Optional[str] = Query(None, description="next_cursor from the previous call; omit to start from the beginning"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of changes to return"),
+    wait: int = Query(0, ge=0, description="Seconds to wait for a change when there is none yet")
+):
+    """
+    Incremental feed of asset creates, updates and deletes, for services that
+    mirror the inventory.
+    
+    - **since**: Cursor returned by the previous call
+    - **limit**: Maximum number of changes per page
+    - **wait**: Long-poll up to this many seconds (capped by the server) when
+      nothing has changed yet
+    
+    Changes are returned in commit order. Creates and updates carry the full
+    asset; deletes are tombstones with asset set to null. Keep calling with
+    next_cursor; a sync only reads the rows that actually changed.
+    
+    Accessible to all authenticated users.
+    """
+    deadline = time.monotonic() + min(wait, settings.CHANGES_MAX_WAIT)
+    while True:
+        # Registered before reading, so a commit in between still wakes us.
+        # Each read gets its own session so no connection is held while waiting.
+        waiter = change_notifier.waiter()
+        try:
+            changes, next_cursor = await run_in_session(AssetCRUD.get_changes, since, limit)
+            remaining = deadline - time.monotonic()
+            if changes or remaining <= 0:
+                break
+            await waiter.wait(min(remaining, settings.CHANGES_POLL_INTERVAL))
+        finally:
+            # Also on errors (e.g. an invalid cursor), or the waiter would leak
+            waiter.close()
+
+    return {
+        "changes": [
+            {
+                "seq": change.seq,
+                "asset_id": change.asset_id,
+                "operation": change.operation,
+                "version": change.version,
+                "changed_at": change.changed_at,
+                "asset": change.payload,
+            }
+            for change in changes
+        ],
+        "next_cursor": next_cursor,
+    }
+
+@router.get("/stream")
+async def stream_changes(
+    current_user: User = Depends(get_current_user),
+    facility: Optional[str] = Query(None, description="Only push changes for this facility"),
+    status: Optional[str] = Query(None, description="Only push changes for assets with this status")
+):
+    """
+    Push asset creates, updates and deletes as Server-Sent Events as they
+    commit, so clients can stop polling /get/all.
+    
+    - **facility**: Only push changes for this facility
+    - **status**: Only push changes for assets with this status (ACTIVE, INACTIVE)
+    
+    Each event is named after the operation and its data is the same JSON as
+    a /changes entry, plus facility_name and status; updates also carry
+    previous_facility_name and previous_status, and are pushed to streams
+    filtered on either the old or the new values. A CSV import sends a single
+    "resync" event with the number of assets created; catch up on those from
+    /changes. Idle streams receive a comment line every few seconds as a
+    keep-alive. A client that falls too far behind gets a final "dropped"
+    event and should reconnect and catch up from /changes.
+    
+    Accessible to all authenticated users.
+    """
+    # Subscribe before the response starts so no commit slips through
+    subscription = change_broker.subscribe(facility=facility, status=status)
+
+    async def events():
+        try:
+            yield f"retry: {settings.STREAM_HEARTBEAT * 1000}\n\n"
+            while True:
+                try:
+                    event = await subscription.get(settings.STREAM_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event is None:
+                    yield "event: dropped\ndata: {}\n\n"
+                    break
+                yield f"event: {event['operation']}\ndata: {json.dumps(event, separators=(',', ':'))}\n\n"
+        finally:
+            subscription.close()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/batch", response_model=AssetBatchResponse)
+async def get_assets_batch(
+    batch: AssetBatchRequest,
+    db: DbSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get many assets by asset_id in one request.
+    
+    - Request body: {"ids": ["AST0001", "AST0002", ...]}
+    
+    Cached assets are served from the cache and the rest are read with a single
+    query. Returns the assets found in the requested order (each id once) and,
+    in missing, the ids that don't exist.
+    
+    Accessible to all authenticated users.
+    """
+    if len(batch.ids) > settings.BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.BATCH_MAX_IDS} ids per request"
+        )
+    assets, missing = await run_db(db, AssetCRUD.get_assets_by_ids, batch.ids)
+    # Encoded like /get/all: AssetResponse validation would reject stored
+    # assets whose warranty has since expired
+    with timed("serialize"):
+        rows = json_array(([asset[name] for name in RESPONSE_FIELDS] for asset in assets), RESPONSE_FIELDS)
+        content = b'{"assets":' + rows + b',"missing":' + json.dumps(missing).encode() + b"}"
+    return Response(content=content, media_type="application/json")
+
+@router.post("/import", response_model=AssetImportResponse, status_code=status.HTTP_202_ACCEPTED)
+async def import_assets(
+    request: Request,
+    response: Response,
+    db: DbSession = Depends(get_db),
+    current_user: User = Security(get_current_user, scopes=["ADMIN", "STAFF"])
+):
+    """
+    Import assets from a CSV file, e.g. a facility's asset register.
+    
+    - Request body: the CSV file itself (Content-Type: text/csv), not a form
+      upload. The header names the columns, which are the /addAsset fields;
+      status may be left out and other columns (such as asset_id) are ignored.
+    
+    The file is streamed to disk and processed in the background: rows are
+    validated in chunks, staged, and merged into the assets in one statement,
+    with new asset_ids. Invalid rows and rows whose serial number is already
+    taken (by an asset or an earlier row) are skipped and listed in the error
+    report. Returns 202 with the job; its URL is in the Location header.
+    
+    Requires ADMIN or STAFF role.
+    """
+    if request.headers.get("content-type", "").startswith("multipart/"):
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send the CSV file as the request body (Content-Type: text/csv)"
+        )
+    source = await spool_upload(request.stream(), settings.IMPORT_MAX_BYTES)
+    try:
+        job = await run_db(db, create_import, current_user.username)
+    except BaseException:
+        source.close()
+        raise
+    import_runner.start(job.id, source)
+    response.headers["Location"] = f"/import/{job.id}"
+    return job
+
+@router.get("/import/{import_id}", response_model=AssetImportResponse)
+async def get_import_status(
+    import_id: int,
+    db: DbSession = Depends(get_db),
+    current_user: User = Security(get_current_user, scopes=["ADMIN", "STAFF"])
+):
+    """
+    Progress of a CSV import.
+    
+    - **import_id**: The id returned by /import
+    
+    status goes from queued through validating and merging to completed or
+    failed (error says why; nothing is imported then). The row counters grow
+    while the file is processed.
+    
+    Requires ADMIN or STAFF role.
+    """
+    return await run_db(db, get_import, import_id)
+
+@router.get("/import/{import_id}/errors", response_model=List[AssetImportError])
+async def get_import_error_report(
+    import_id: int,
+    response: Response,
+    db: DbSession = Depends(get_db),
+    current_user: User = Security(get_current_user, scopes=["ADMIN", "STAFF"]),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor")
+):
+    """
+    Rows of a CSV import that were not imported, with the reason.
+    
+    - **import_id**: The id returned by /import
+    - **limit**: Maximum number of records to return
+    - **cursor**: Continue after the last page
+    
+    Returns rows in file order; row_number counts the header as row 1, as a
+    spreadsheet does. When more records may follow, the cursor for the next
+    page is sent in the X-Next-Cursor header. Reports are kept for
+    IMPORT_RETENTION_DAYS after the import finishes.
+    
+    Requires ADMIN or STAFF role.
+    """
+    errors, next_cursor = await run_db(db, get_import_errors, import_id, limit=limit, cursor=cursor)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return errors
 
 @router.get("/{id}", response_model=AssetResponse)
-def get_asset_by_id(
+async def get_asset_by_id(
     id: str,
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -85,55 +453,122 @@ def get_asset_by_id(
     
     - **id**: The asset_id of the asset to retrieve (e.g., "AST0001")
     
-    Returns the asset if found, otherwise returns a 404 error.
+    Returns the asset if found, otherwise returns a 404 error. The response
+    carries an ETag; send it back in If-None-Match to get a 304 Not Modified
+    while the asset is unchanged.
     
     Accessible to all authenticated users.
     """
-    return AssetCRUD.get_asset_by_id(db, id)
+    # Concurrent requests for the same asset share one lookup, in its own session
+    db_asset = await asset_reads.do(("asset", id), lambda: run_in_session(AssetCRUD.get_asset_by_id, id))
+    etag = asset_etag(db_asset["asset_id"], db_asset["version"])
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return db_asset
 
 @router.get("/facility/names", response_model=FacilityNamesResponse)
-def get_all_facility_names(
-    db: Session = Depends(get_db),
+async def get_all_facility_names(
+    request: Request,
+    response: Response,
+    db: DbSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get a list of all unique facility names used in assets.
     
     Returns a list of facility names wrapped in a FacilityNamesResponse object.
+    The response carries an ETag; send it back in If-None-Match to get a
+    304 Not Modified while the list is unchanged.
     
     Accessible to all authenticated users.
     """
-    facility_names = AssetCRUD.get_all_facility_names(db)
+    facility_names = await run_db(db, AssetCRUD.get_all_facility_names)
+    etag = make_etag(*facility_names)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
     return FacilityNamesResponse(facility_names=facility_names)
 
+@router.get("/warranty/expiring", response_model=List[AssetResponse])
+async def get_expiring_assets(
+    request: Request,
+    db: DbSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    facility: str = Query(..., description="Facility whose assets to check"),
+    days: int = Query(30, ge=0, le=3650, description="Look this many days ahead"),
+    include_inactive: bool = Query(False, description="Include INACTIVE assets"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor")
+):
+    """
+    Get a facility's assets whose warranty expires within the next days.
+    
+    - **facility**: Facility name
+    - **days**: Look-ahead window in days (today included)
+    - **include_inactive**: Also list INACTIVE assets (ACTIVE only by default)
+    - **limit**: Maximum number of records to return
+    - **cursor**: Continue after the last page
+    
+    Returns assets sorted by warranty expiry, soonest first. When more records
+    may follow, the cursor for the next page is sent in the X-Next-Cursor header.
+    Supports If-None-Match like /get/all.
+    
+    Accessible to all authenticated users.
+    """
+    assets, next_cursor = await run_db(
+        db, AssetCRUD.get_expiring_assets, facility=facility, days=days,
+        include_inactive=include_inactive, limit=limit, cursor=cursor
+    )
+    headers = {"ETag": make_etag(*(asset_etag(a.asset_id, a.version) for a in assets))}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    # Rows go straight to JSON bytes, skipping model validation and jsonable_encoder
+    with timed("serialize"):
+        content = json_array(assets, RESPONSE_FIELDS)
+    return Response(content=content, media_type="application/json", headers=headers)
+
 @router.get("/get/all", response_model=List[AssetResponse])
-def get_all_assets(
-    db: Session = Depends(get_db),
+async def get_all_assets(
+    request: Request,
     current_user: User = Depends(get_current_user),
-    skip: int = Query(0, description="Number of records to skip"),
-    limit: int = Query(100, description="Maximum number of records to return"),
+    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    limit: int = Query(100, ge=0, description="Maximum number of records to return"),
     status: Optional[str] = Query(None, description="Filter by asset status"),
-    facility: Optional[str] = Query(None, description="Filter by facility name")
+    facility: Optional[str] = Query(None, description="Filter by facility name"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor; takes precedence over skip")
 ):
     """
     Get all assets with optional filtering and pagination.
     
     - **skip**: Number of records to skip (for pagination)
     - **limit**: Maximum number of records to return
-    - **status**: Filter assets by status (e.g., "Active", "Maintenance")
+    - **status**: Filter assets by status (e.g., "ACTIVE", "INACTIVE")
     - **facility**: Filter assets by facility name
+    - **cursor**: Continue after the last page instead of skipping records
     
-    Returns a list of assets matching the criteria.
+    Returns a list of assets matching the criteria, ordered by creation. When more
+    records may follow, the cursor for the next page is sent in the X-Next-Cursor header.
+    The page carries an ETag over its assets' revisions; send it back in
+    If-None-Match to get a 304 Not Modified while the page is unchanged.
     
     Accessible to all authenticated users.
     """
-    assets = AssetCRUD.get_all_assets(db)
-    
-    # Apply filters if provided
-    if status:
-        assets = [a for a in assets if a.status == status]
-    if facility:
-        assets = [a for a in assets if a.facility_name == facility]
-    
-    # Apply pagination
-    return assets[skip:skip+limit]
+    # Identical concurrent page requests share one query
+    assets, next_cursor = await asset_reads.do(
+        ("get_all", skip, limit, status, facility, cursor),
+        lambda: run_in_session(
+            AssetCRUD.get_all_assets, skip=skip, limit=limit, status_filter=status, facility=facility, cursor=cursor
+        )
+    )
+    headers = {"ETag": make_etag(*(asset_etag(a.asset_id, a.version) for a in assets))}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    # Rows go straight to JSON bytes, skipping model validation and jsonable_encoder
+    with timed("serialize"):
+        content = json_array(assets, RESPONSE_FIELDS)
+    return Response(content=content, media_type="application/json", headers=headers)
@@ -1,6 +1,6 @@
-from pydantic import BaseModel, field_validator
-from datetime import date
-from typing import List
+from pydantic import BaseModel, Field, field_validator
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
 from enum import Enum
 from decimal import Decimal
 
@@ -10,6 +10,18 @@ class Status(str, Enum):
     INACTIVE = "INACTIVE"
 
 
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+class StatsGroupBy(str, Enum):
+    FACILITY_NAME = "facility_name"
+    STATUS = "status"
+    MANUFACTURER = "manufacturer"
+    PURCHASE_MONTH = "purchase_month"
+
+
 class AssetBase(BaseModel):
     asset_name: str
     value: Decimal
@@ -69,3 +81,72 @@ class AssetResponse(AssetBase):
 
 class FacilityNamesResponse(BaseModel):
     facility_names: List[str]
+
+
+class BulkAssetResult(BaseModel):
+    index: int
+    success: bool
+    asset: Optional[AssetResponse] = None
+    error: Optional[str] = None
+
+class BulkCreateResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[BulkAssetResult]
+
+class AssetBatchRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1)
+
+class AssetBatchResponse(BaseModel):
+    assets: List[AssetResponse]  # in the requested order
+    missing: List[str]
+
+class AssetImportResponse(BaseModel):
+    id: int
+    status: str  # queued, validating, merging, completed or failed
+    created_by: str
+    rows_read: int
+    rows_invalid: int
+    rows_duplicate: int
+    rows_imported: int
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class AssetImportError(BaseModel):
+    row_number: int  # in the file, the header being row 1
+    error: str
+
+    class Config:
+        from_attributes = True
+
+class AssetChangeResponse(BaseModel):
+    seq: int
+    asset_id: str
+    operation: str
+    version: int
+    changed_at: datetime
+    asset: Optional[Dict[str, Any]] = None  # AssetResponse fields; null for deletes
+
+    class Config:
+        from_attributes = True
+
+class ChangeFeedResponse(BaseModel):
+    changes: List[AssetChangeResponse]
+    next_cursor: str
+
+class AssetStatsGroup(BaseModel):
+    key: Optional[str] = None  # null for the overall totals
+    count: int
+    total_value: Decimal
+    avg_value: Decimal
+    under_warranty: int
+    warranty_coverage: float
+
+class AssetStatsResponse(BaseModel):
+    group_by: StatsGroupBy
+    groups: List[AssetStatsGroup]
+    totals: AssetStatsGroup
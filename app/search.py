@@ -0,0 +1,140 @@
+import re
+from typing import List, Optional
+
+from sqlalchemy import Float, Select, case, column, func, literal, literal_column, select, table, union_all
+
+from app.models.asset_search import SEARCH_COLUMNS, SEARCH_TEXT
+from app.models.assets import Asset
+
+# Serial-number substring matching needs at least one trigram
+MIN_PARTIAL_LENGTH = 3
+
+# Share of a word's trigrams the text must contain for a fuzzy match;
+# pg_trgm's default word_similarity_threshold, which <% applies there
+FUZZY_THRESHOLD = 0.6
+
+
+def search_terms(q: str) -> List[str]:
+    """Lowercased words of the query, as both tokenizers split them."""
+    return re.findall(r"\w+", q.lower())
+
+
+def trigrams(term: str) -> List[str]:
+    """Distinct three-character windows of a word, as the FTS5 trigram tokenizer splits it."""
+    return sorted({term[start:start + 3] for start in range(len(term) - 2)})
+
+
+def escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_hits(q: str, dialect: str, candidate_ids: Optional[Select] = None, max_candidates: int = 1000):
+    """
+    Subquery of (id, score) for assets matching q, lower scores first, or
+    None when q cannot match anything.
+
+    Every word must match the start of a word in one of SEARCH_COLUMNS
+    ("phil mon" finds "Philips Monitor"); independently, q matches anywhere
+    inside serial_number when it is a single token of MIN_PARTIAL_LENGTH or
+    more characters, exact serial numbers first. Word matches are scored by
+    ts_rank / bm25.
+
+    Misspelt words ("phillips moniter") are matched by trigrams: a row
+    matches when its SEARCH_COLUMNS contain FUZZY_THRESHOLD of the trigrams of
+    every word of MIN_PARTIAL_LENGTH or more characters (pg_trgm
+    word_similarity on PostgreSQL). It is scored by the average share
+    missing, so fuzzy matches rank after every word and serial match.
+
+    Only the newest max_candidates matches of each kind (restricted to
+    candidate_ids, e.g. a facility filter) are scored, so a query matching a
+    large part of the table costs the same as a selective one.
+    """
+    terms = search_terms(q)
+    partial = q.strip()
+    if len(partial) < MIN_PARTIAL_LENGTH or any(char.isspace() for char in partial):
+        # Too short for a trigram, or several words: not a serial number
+        partial = None
+    if not terms and not partial:
+        return None
+    fuzzy_terms = [term for term in terms if len(term) >= MIN_PARTIAL_LENGTH]
+    search_text = literal_column(f"({SEARCH_TEXT})")
+
+    if dialect == "postgresql":
+        vector = literal_column("assets.search_vector")
+        tsquery = func.to_tsquery("simple", " & ".join(f"{term}:*" for term in terms))
+        word_id = filter_id = Asset.id
+        word_hits = select(Asset.id, (-func.ts_rank(vector, tsquery)).label("score")).where(vector.op("@@")(tsquery))
+        serial_hits = select(
+            Asset.id,
+            case(
+                (Asset.serial_number == partial, -1000.0),
+                else_=-func.similarity(Asset.serial_number, partial)
+            ).label("score")
+        ).where(Asset.serial_number.ilike(f"%{escape_like(partial or '')}%", escape="\\"))
+        serial_id = serial_filter_id = Asset.id
+        similarity = (
+            sum(func.word_similarity(term, search_text, type_=Float) for term in fuzzy_terms)
+            / float(max(len(fuzzy_terms), 1))
+        )
+        fuzzy_hits = select(Asset.id, (1 - similarity).label("score")).where(
+            *(literal(term).op("<%")(search_text) for term in fuzzy_terms)
+        )
+        fuzzy_id = fuzzy_filter_id = Asset.id
+    else:
+        words = table("assets_fts", column("rowid"))
+        word_id = words.c.rowid
+        # "rowid + 0" keeps FTS5 from running the MATCH once per candidate id
+        filter_id = words.c.rowid + 0
+        word_hits = select(
+            words.c.rowid.label("id"), func.bm25(literal_column("assets_fts")).label("score")
+        ).where(literal_column("assets_fts").op("MATCH")(" ".join('"%s"*' % term for term in terms)))
+        # A quoted phrase matches as a substring on the trigram table
+        serials = table("assets_serial_fts", column("rowid"), column("serial_number"))
+        serial_id = serials.c.rowid
+        serial_filter_id = serials.c.rowid + 0
+        serial_hits = select(
+            serials.c.rowid.label("id"),
+            case((serials.c.serial_number == partial, -1000.0), else_=-1.0).label("score")
+        ).where(literal_column("assets_serial_fts").op("MATCH")('"%s"' % (partial or "").replace('"', '""')))
+        # Rows sharing any trigram with the query, then the share of each
+        # word's trigrams they contain; the columns are read from the FTS
+        # table, so SEARCH_TEXT resolves there
+        texts = table("assets_text_fts", column("rowid"), *(column(name) for name in SEARCH_COLUMNS))
+        fuzzy_id = texts.c.rowid
+        fuzzy_filter_id = texts.c.rowid + 0
+        lowered = func.lower(search_text)
+        shares = [
+            sum((case((func.instr(lowered, gram) > 0, 1), else_=0) for gram in trigrams(term)), literal(0))
+            / float(len(trigrams(term)))
+            for term in fuzzy_terms
+        ]
+        any_gram = " OR ".join('"%s"' % gram for term in fuzzy_terms for gram in trigrams(term))
+        fuzzy_hits = select(
+            texts.c.rowid.label("id"), (1 - sum(shares, literal(0)) / max(len(shares), 1)).label("score")
+        ).where(
+            literal_column("assets_text_fts").op("MATCH")(any_gram),
+            *(share >= FUZZY_THRESHOLD for share in shares)
+        )
+
+    selects = []
+    sources = (
+        (word_hits, word_id, filter_id, terms),
+        (serial_hits, serial_id, serial_filter_id, partial),
+        (fuzzy_hits, fuzzy_id, fuzzy_filter_id, fuzzy_terms),
+    )
+    for hits, hit_id, hit_filter_id, wanted in sources:
+        if not wanted:
+            continue
+        if candidate_ids is not None:
+            hits = hits.where(hit_filter_id.in_(candidate_ids))
+        selects.append(select(hits.order_by(hit_id.desc()).limit(max_candidates).subquery()))
+
+    if len(selects) == 1:
+        return selects[0].subquery("hits")
+    # A row can match several ways; keep its best score
+    matches = union_all(*selects).subquery("matches")
+    return (
+        select(matches.c.id, func.min(matches.c.score).label("score"))
+        .group_by(matches.c.id)
+        .subquery("hits")
+    )
@@ -0,0 +1,141 @@
+import ast
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.concurrency import run_in_threadpool
+
+from app.utils.metrics import MetricFamily
+
+logger = logging.getLogger("assets-service")
+
+ALEMBIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic")
+
+SCHEMA_CHECK_MODES = ("off", "warn", "error")
+
+
+class SchemaOutOfDate(RuntimeError):
+    """The database is not at the Alembic head this code expects."""
+
+
+class StartupTimings:
+    """Wall time of each startup phase, reported in the log and on /metrics."""
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+
+    def record(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = seconds
+
+    def phase(self, name: str) -> "_Phase":
+        return _Phase(self, name)
+
+    def collect(self) -> List[MetricFamily]:
+        samples = [({"phase": phase}, round(seconds, 6)) for phase, seconds in self.phases.items()]
+        return [("startup_seconds", "gauge", "Seconds spent in each startup phase", samples)]
+
+
+class _Phase:
+    def __init__(self, timings: StartupTimings, name: str):
+        self.timings = timings
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timings.record(self.name, time.perf_counter() - self.started)
+
+
+def expected_heads(versions_dir: str = os.path.join(ALEMBIC_DIR, "versions")) -> Tuple[str, ...]:
+    """
+    Head revision(s) of the migrations shipped with this code. The revision
+    ids are read with ast rather than through Alembic, which takes longer to
+    import than the check itself.
+    """
+    revisions, parents = set(), set()
+    for name in os.listdir(versions_dir):
+        if not name.endswith(".py"):
+            continue
+        with open(os.path.join(versions_dir, name), encoding="utf-8") as f:
+            tree = ast.parse(f.read(), name)
+        values = {}
+        for node in tree.body:
+            if isinstance(node, (ast.Assign, ast.AnnAssign)) and node.value is not None:
+                targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                for target in targets:
+                    if isinstance(target, ast.Name) and target.id in ("revision", "down_revision"):
+                        values[target.id] = ast.literal_eval(node.value)
+        if "revision" not in values:
+            continue
+        revisions.add(values["revision"])
+        down = values.get("down_revision")
+        parents.update(down if isinstance(down, (tuple, list)) else [down] if down else [])
+    return tuple(sorted(revisions - parents))
+
+
+def _current_heads(connection) -> Tuple[str, ...]:
+    if not inspect(connection).has_table("alembic_version"):
+        return ()
+    return tuple(sorted(connection.execute(text("SELECT version_num FROM alembic_version")).scalars()))
+
+
+async def database_heads(engine) -> Tuple[str, ...]:
+    """Revision(s) recorded in the database's alembic_version table."""
+    if isinstance(engine, AsyncEngine):
+        async with engine.connect() as conn:
+            return await conn.run_sync(_current_heads)
+
+    def read():
+        with engine.connect() as conn:
+            return _current_heads(conn)
+    return await run_in_threadpool(read)
+
+
+async def check_schema(engine, mode: str) -> Optional[Tuple[str, ...]]:
+    """
+    Compare the database's Alembic revision with the migrations' head
+    instead of creating tables. In "warn" mode a mismatch is logged, in
+    "error" mode it aborts startup.
+    """
+    if mode not in SCHEMA_CHECK_MODES:
+        raise ValueError(f"SCHEMA_CHECK must be one of {', '.join(SCHEMA_CHECK_MODES)}, not {mode!r}")
+    if mode == "off":
+        return None
+    expected, current = await asyncio.gather(run_in_threadpool(expected_heads), database_heads(engine))
+    if current != expected:
+        message = (f"Database schema is at revision {', '.join(current) or '(none)'} but the code expects "
+                   f"{', '.join(expected)}; run 'alembic upgrade head'")
+        if mode == "error":
+            raise SchemaOutOfDate(message)
+        logger.warning(message)
+    return current
+
+
+async def prewarm_pool(engine, size: int) -> int:
+    """
+    Open size connections at once and hand them back to the pool, so the
+    first requests after boot don't pay for connecting. Returns how many
+    connections were opened.
+    """
+    if size <= 0:
+        return 0
+    if isinstance(engine, AsyncEngine):
+        results = await asyncio.gather(*(engine.connect().start() for _ in range(size)), return_exceptions=True)
+        connections = [conn for conn in results if not isinstance(conn, BaseException)]
+        await asyncio.gather(*(conn.close() for conn in connections))
+    else:
+        results = await asyncio.gather(*(run_in_threadpool(engine.connect) for _ in range(size)),
+                                       return_exceptions=True)
+        connections = [conn for conn in results if not isinstance(conn, BaseException)]
+        for conn in connections:
+            conn.close()
+    failures = [error for error in results if isinstance(error, BaseException)]
+    if failures:
+        logger.warning("Pool pre-warm opened %d of %d connections: %s", len(connections), size, failures[0])
+    return len(connections)
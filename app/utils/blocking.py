@@ -0,0 +1,16 @@
+from sqlalchemy.util import await_only
+from sqlalchemy.util.concurrency import in_greenlet
+from starlette.concurrency import run_in_threadpool
+
+
+def call_blocking(fn, *args, **kwargs):
+    """
+    Call fn, which blocks on network I/O (a Redis round trip), from AssetCRUD
+    code. Under USE_ASYNC_DB that code runs on the event loop through
+    AsyncSession.run_sync, so there the call is handed to the threadpool and
+    awaited through SQLAlchemy's greenlet instead of stalling the loop. In a
+    worker thread fn is simply called.
+    """
+    if in_greenlet():
+        return await_only(run_in_threadpool(fn, *args, **kwargs))
+    return fn(*args, **kwargs)
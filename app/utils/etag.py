@@ -0,0 +1,48 @@
+import hashlib
+from typing import List, Optional
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag over the given values."""
+    digest = hashlib.sha1("\x1f".join(map(str, parts)).encode("utf-8")).hexdigest()
+    return f'"{digest[:20]}"'
+
+
+def asset_etag(asset_id: str, version: int) -> str:
+    """Strong ETag of one asset revision."""
+    return f'"{asset_id}.{version}"'
+
+
+def etag_matches(header: Optional[str], etag: str, weak: bool = True) -> bool:
+    """
+    Whether an If-None-Match (weak comparison) or If-Match (weak=False,
+    strong comparison) header value matches etag.
+    """
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = (candidate.strip() for candidate in header.split(","))
+    if weak:
+        return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+    return any(candidate == etag for candidate in candidates)
+
+
+def if_match_versions(header: Optional[str], asset_id: str) -> Optional[List[int]]:
+    """
+    Revisions of asset_id an If-Match header accepts, for checking it in the
+    write's WHERE clause: None when any revision will do (no header or "*"),
+    otherwise the versions of the asset's ETags it lists (possibly none).
+    Same strong comparison as etag_matches.
+    """
+    if not header or header.strip() == "*":
+        return None
+    versions = []
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if len(candidate) < 2 or candidate[0] != '"' or candidate[-1] != '"':
+            continue
+        name, _, version = candidate[1:-1].rpartition(".")
+        if name == asset_id and version.isdigit() and asset_etag(asset_id, int(version)) == candidate:
+            versions.append(int(version))
+    return versions
@@ -0,0 +1,103 @@
+import csv
+import io
+import json
+import zlib
+from datetime import date
+from decimal import Decimal
+from enum import Enum
+from typing import Iterable, Iterator, List, Sequence
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements
+    orjson = None
+
+
+def to_json_value(value):
+    # Same representation the AssetResponse schema produces
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def _orjson_default(value):
+    # orjson handles dates and str enums itself but not Decimal
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError
+
+
+def json_array(rows: Iterable[Sequence], columns: List[str]) -> bytes:
+    """
+    Serialize rows as a JSON array of objects, byte for byte what FastAPI's
+    JSONResponse produces for the same list of AssetResponse models. Values
+    after the first len(columns) in a row are ignored.
+    """
+    objects = [dict(zip(columns, row)) for row in rows]
+    if orjson is not None:
+        return orjson.dumps(objects, default=_orjson_default)
+    return json.dumps(
+        [{name: to_json_value(value) for name, value in obj.items()} for obj in objects],
+        ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def ndjson_chunks(batches: Iterable[List], columns: List[str]) -> Iterator[bytes]:
+    """Serialize row batches as newline-delimited JSON, one chunk per batch."""
+    for batch in batches:
+        lines = [
+            json.dumps(dict(zip(columns, map(to_json_value, row))), separators=(",", ":"))
+            for row in batch
+        ]
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def csv_chunks(batches: Iterable[List], columns: List[str]) -> Iterator[bytes]:
+    """Serialize row batches as CSV with a header line, one chunk per batch."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for batch in batches:
+        writer.writerows([map(to_json_value, row) for row in batch])
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """
+    Whether an Accept-Encoding header allows gzip: listed, or covered by "*",
+    with a non-zero q-value ("gzip;q=0" refuses it).
+    """
+    qualities = {}
+    for item in accept_encoding.lower().split(","):
+        coding, *params = [part.strip() for part in item.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    for coding in ("gzip", "x-gzip", "*"):
+        if coding in qualities:
+            return qualities[coding] > 0
+    return False
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Gzip a stream of chunks incrementally."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
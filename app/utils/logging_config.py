@@ -1,11 +1,22 @@
+import atexit
+import copy
 import logging
 import json
-import time
+import queue
+import random
 import os
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
+from app.config import settings
 
-# Create logs directory if it doesn't exist
-os.makedirs("logs", exist_ok=True)
+try:
+    import orjson
+
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj, default=str).decode()
+except ImportError:  # pragma: no cover - orjson is in requirements
+    def _dumps(obj) -> str:
+        return json.dumps(obj, default=str)
 
 class CustomFormatter(logging.Formatter):
     def format(self, record):
@@ -17,36 +28,117 @@ class CustomFormatter(logging.Formatter):
             "function": record.funcName,
             "line": record.lineno
         }
-        
+
         if hasattr(record, 'request_id'):
             log_record["request_id"] = record.request_id
-            
+
         if hasattr(record, 'user_id'):
             log_record["user_id"] = record.user_id
-            
+
         if record.exc_info:
             log_record["exception"] = self.formatException(record.exc_info)
-            
-        return json.dumps(log_record)
+
+        return _dumps(log_record)
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep only a fraction of high-volume records (those logged with
+    extra={"log_sample": True}); warnings and errors always pass.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        if self.rate >= 1 or record.levelno >= logging.WARNING:
+            return True
+        if not getattr(record, "log_sample", False):
+            return True
+        return random.random() < self.rate
+
+class RequestQueueHandler(QueueHandler):
+    """Only enqueue on the request path; formatting happens on the listener thread."""
+
+    def prepare(self, record):
+        # Freeze the message so later changes to args cannot leak in, but keep
+        # exc_info for the JSON formatter (the listener is in this process)
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+class _DeferredFlushMixin:
+    """Let the listener flush once the queue drains instead of after every record."""
+
+    def flush(self):
+        pass
+
+    def flush_buffer(self):
+        super().flush()
+
+class BufferedStreamHandler(_DeferredFlushMixin, logging.StreamHandler):
+    pass
+
+class BufferedTimedRotatingFileHandler(_DeferredFlushMixin, TimedRotatingFileHandler):
+    pass
+
+class LogQueueListener(QueueListener):
+    def dequeue(self, block):
+        if self.queue.empty():
+            for handler in self.handlers:
+                getattr(handler, "flush_buffer", handler.flush)()
+        return super().dequeue(block)
+
+_listener = None
+
+def stop_logging():
+    """Drain the queue and flush handlers, e.g. on shutdown."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            getattr(handler, "flush_buffer", handler.flush)()
+            handler.close()
+        _listener = None
 
 def setup_logging(service_name):
     """Configure logging for the application"""
+    global _listener
     logger = logging.getLogger(service_name)
-    logger.setLevel(logging.INFO)
-    
+    logger.setLevel(settings.LOG_LEVEL)
+
     # Clear existing handlers
     if logger.handlers:
         logger.handlers.clear()
-    
+    stop_logging()
+
+    formatter = CustomFormatter()
+
     # Console handler
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(CustomFormatter())
-    logger.addHandler(console_handler)
-    
-    # File handler - daily rotating log file
-    today = datetime.now().strftime('%Y-%m-%d')
-    file_handler = logging.FileHandler(f"logs/{service_name}_{today}.log")
-    file_handler.setFormatter(CustomFormatter())
-    logger.addHandler(file_handler)
-    
-    return logger
\ No newline at end of file
+    console_handler = BufferedStreamHandler()
+    console_handler.setFormatter(formatter)
+
+    # File handler - rolls over at midnight, keeping LOG_RETENTION_DAYS old files
+    os.makedirs(settings.LOG_DIR, exist_ok=True)
+    file_handler = BufferedTimedRotatingFileHandler(
+        os.path.join(settings.LOG_DIR, f"{service_name}.log"),
+        when="midnight",
+        backupCount=settings.LOG_RETENTION_DAYS,
+        encoding="utf-8",
+        delay=True
+    )
+    file_handler.setFormatter(formatter)
+
+    # Request threads only enqueue; a background thread formats and writes
+    log_queue = queue.SimpleQueue()
+    queue_handler = RequestQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(settings.LOG_REQUEST_SAMPLE_RATE))
+    logger.addHandler(queue_handler)
+
+    _listener = LogQueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+    _listener.start()
+
+    return logger
+
+atexit.register(stop_logging)
@@ -0,0 +1,166 @@
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# Latency buckets in seconds (Prometheus "le" upper bounds)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# A collector returns (name, type, help, [(labels, value), ...]) families
+MetricFamily = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class MetricsRegistry:
+    """
+    In-memory HTTP metrics rendered in the Prometheus text format.
+
+    Requests are recorded per (method, route template), so label cardinality
+    is bounded by the number of routes, not by the URLs clients send.
+    """
+
+    def __init__(self, prefix: str = "assets", buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.prefix = prefix
+        self.buckets = tuple(buckets)
+        self.in_flight = 0
+        self._latency: Dict[Tuple[str, str], list] = {}  # -> [bucket counts..., sum, count]
+        self._responses: Dict[Tuple[str, str, int], int] = {}
+        self._collectors: List[Callable[[], Iterable[MetricFamily]]] = []
+        self._lock = threading.Lock()
+
+    def observe_request(self, method: str, route: str, status_code: int, duration: float) -> None:
+        index = bisect_left(self.buckets, duration)
+        with self._lock:
+            series = self._latency.get((method, route))
+            if series is None:
+                series = self._latency[(method, route)] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += duration
+            series[-1] += 1
+            key = (method, route, status_code)
+            self._responses[key] = self._responses.get(key, 0) + 1
+
+    def register_collector(self, collector: Callable[[], Iterable[MetricFamily]]) -> None:
+        """Add a callback whose metric families are rendered on every scrape."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        name = f"{self.prefix}_http_requests_in_flight"
+        lines += [f"# HELP {name} Requests currently being served",
+                  f"# TYPE {name} gauge",
+                  f"{name} {self.in_flight}"]
+
+        with self._lock:
+            responses = sorted(self._responses.items())
+            latency = sorted((key, list(series)) for key, series in self._latency.items())
+
+        name = f"{self.prefix}_http_requests_total"
+        lines += [f"# HELP {name} Responses by route and status code",
+                  f"# TYPE {name} counter"]
+        for (method, route, status_code), count in responses:
+            labels = _format_labels({"method": method, "route": route, "status": status_code})
+            lines.append(f"{name}{labels} {count}")
+
+        name = f"{self.prefix}_http_request_duration_seconds"
+        lines += [f"# HELP {name} Request latency by route",
+                  f"# TYPE {name} histogram"]
+        for (method, route), series in latency:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                labels = _format_labels({"method": method, "route": route, "le": _format_value(bound)})
+                lines.append(f"{name}_bucket{labels} {cumulative}")
+            labels = _format_labels({"method": method, "route": route, "le": "+Inf"})
+            lines.append(f"{name}_bucket{labels} {series[-1]}")
+            labels = _format_labels({"method": method, "route": route})
+            lines.append(f"{name}_sum{labels} {_format_value(series[-2])}")
+            lines.append(f"{name}_count{labels} {series[-1]}")
+
+        for collector in self._collectors:
+            for family, kind, help_text, samples in collector():
+                name = f"{self.prefix}_{family}"
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+
+def cache_collector(name: str, cache) -> Callable[[], List[MetricFamily]]:
+    """Expose a cache's size, hit/miss/eviction counters and hit ratio."""
+    def collect():
+        stats = cache.stats()
+        return [
+            (f"{name}_size", "gauge", f"Entries in the {name}", [({}, stats["size"])]),
+            (f"{name}_hits_total", "counter", f"Lookups served by the {name}", [({}, stats["hits"])]),
+            (f"{name}_misses_total", "counter", f"Lookups missing the {name}", [({}, stats["misses"])]),
+            (f"{name}_evictions_total", "counter", f"Entries evicted from the {name}", [({}, stats["evictions"])]),
+            (f"{name}_hit_ratio", "gauge", f"Share of lookups served by the {name}", [({}, stats["hit_ratio"])]),
+        ]
+    return collect
+
+
+def broker_collector(broker) -> Callable[[], List[MetricFamily]]:
+    """Expose the number of /stream subscribers and how many were dropped."""
+    def collect():
+        stats = broker.stats()
+        return [
+            ("stream_subscribers", "gauge", "Open /stream connections", [({}, stats["subscribers"])]),
+            ("stream_dropped_total", "counter", "Slow /stream subscribers disconnected", [({}, stats["dropped"])]),
+        ]
+    return collect
+
+
+def flight_collector(name: str, flights) -> Callable[[], List[MetricFamily]]:
+    """Expose how many reads ran and how many joined one already in flight."""
+    def collect():
+        stats = flights.stats()
+        return [
+            (f"{name}_started_total", "counter", f"Reads started by {name}", [({}, stats["started"])]),
+            (f"{name}_joined_total", "counter", "Reads that shared one already in flight", [({}, stats["joined"])]),
+            (f"{name}_in_flight", "gauge", f"Reads currently running in {name}", [({}, stats["in_flight"])]),
+        ]
+    return collect
+
+
+def pool_collector(status: Callable[[], Dict[str, Dict[str, float]]]) -> Callable[[], List[MetricFamily]]:
+    """Expose connection-pool occupancy and checkout waits, labelled by engine."""
+    families = [
+        ("db_pool_size", "gauge", "Connections the pool keeps open", "size"),
+        ("db_pool_checked_out", "gauge", "Connections currently in use", "checked_out"),
+        ("db_pool_idle", "gauge", "Open connections waiting in the pool", "idle"),
+        ("db_pool_overflow", "gauge", "Connections open beyond the pool size", "overflow"),
+        ("db_pool_checkouts_total", "counter", "Connections handed out", "checkouts"),
+        ("db_pool_checkout_wait_seconds_total", "counter", "Time spent getting a connection", "wait_seconds"),
+        ("db_pool_checkout_wait_seconds_max", "gauge", "Longest wait for a connection", "max_wait_seconds"),
+        ("db_pool_timeouts_total", "counter", "Checkouts that gave up after DATABASE_POOL_TIMEOUT", "timeouts"),
+        ("db_pool_connects_total", "counter", "Database connections opened", "connects"),
+        ("db_pool_invalidations_total", "counter", "Connections discarded after an error", "invalidations"),
+    ]
+
+    def collect():
+        engines = status()
+        return [
+            (family, kind, help_text, [({"engine": engine}, stats[key]) for engine, stats in engines.items()])
+            for family, kind, help_text, key in families
+        ]
+    return collect
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,102 @@
+import functools
+import inspect
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from fastapi.routing import APIRoute
+
+# Phases reported in Server-Timing, in this order; "pool" is time spent
+# waiting for a database connection
+PHASES = ("db", "pool", "auth", "serialize")
+
+
+class RequestTimer:
+    """
+    Where one request spent its time: statements issued and time per phase.
+
+    One timer is shared by everything that runs for the request, including
+    worker threads and SQLAlchemy greenlets, through the context variable.
+    """
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.statements = 0
+        self.phases: Dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        self.endpoint_returned: Optional[float] = None
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def add_statement(self, seconds: float) -> None:
+        self.statements += 1
+        self.add("db", seconds)
+
+    def server_timing(self, total: float) -> str:
+        """Server-Timing header value, durations in milliseconds."""
+        entries = [f'db;dur={self.phases["db"] * 1000:.2f};desc="{self.statements} queries"']
+        entries += [f"{phase};dur={self.phases[phase] * 1000:.2f}" for phase in PHASES[1:]]
+        entries.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(entries)
+
+
+# Set by MonitoringMiddleware for the duration of each request
+request_timer: ContextVar[Optional[RequestTimer]] = ContextVar("request_timer", default=None)
+
+
+def current_timer() -> Optional[RequestTimer]:
+    return request_timer.get()
+
+
+@contextmanager
+def timed(phase: str):
+    """Add the time spent in the block to the current request's phase."""
+    timer = request_timer.get()
+    if timer is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.add(phase, time.perf_counter() - started)
+
+
+def mark_endpoint_return(endpoint):
+    """Wrap an async endpoint to note when it returns (see TimedRoute)."""
+    @functools.wraps(endpoint)
+    async def timed_endpoint(*args, **kwargs):
+        try:
+            return await endpoint(*args, **kwargs)
+        finally:
+            timer = request_timer.get()
+            if timer is not None:
+                timer.endpoint_returned = time.perf_counter()
+    return timed_endpoint
+
+
+class TimedRoute(APIRoute):
+    """
+    APIRoute that counts the time from the endpoint returning until the
+    Response is built (response_model validation and JSON encoding) as
+    "serialize". Endpoints that encode their own body wrap it in
+    timed("serialize") instead.
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        if inspect.iscoroutinefunction(endpoint):
+            endpoint = mark_endpoint_return(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            response = await handler(request)
+            timer = request_timer.get()
+            if timer is not None and timer.endpoint_returned is not None:
+                timer.add("serialize", time.perf_counter() - timer.endpoint_returned)
+                timer.endpoint_returned = None
+            return response
+        return timed_handler
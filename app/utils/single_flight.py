@@ -0,0 +1,56 @@
+import asyncio
+import threading
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key: the first caller starts the
+    work as a task and later callers await that task instead of repeating it.
+    Every caller gets the same result object, so it must not be mutated.
+
+    The task is shielded from its callers, so a client going away does not
+    cancel it for the others; the work must therefore not use anything the
+    first caller owns, such as its request's session. forget() makes later
+    calls start afresh, e.g. after a write that the running ones may miss.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.started = 0
+        self.joined = 0
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        # forget() is called from worker threads after sync commits
+        self._lock = threading.Lock()
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        if not self.enabled:
+            return await fn()
+        with self._lock:
+            task = self._calls.get(key)
+            if task is None:
+                task = asyncio.ensure_future(fn())
+                calls = self._calls
+                calls[key] = task
+                task.add_done_callback(lambda done: self._finished(calls, key, done))
+                self.started += 1
+            else:
+                self.joined += 1
+        return await asyncio.shield(task)
+
+    def forget(self) -> None:
+        """Let calls already in flight finish, but don't join them any more."""
+        with self._lock:
+            self._calls = {}
+
+    def _finished(self, calls: Dict[Hashable, asyncio.Task], key: Hashable, task: asyncio.Task) -> None:
+        with self._lock:
+            if calls.get(key) is task:
+                del calls[key]
+        if not task.cancelled():
+            task.exception()  # retrieved, even if every caller went away
+
+    def stats(self) -> dict:
+        return {"started": self.started, "joined": self.joined, "in_flight": len(self._calls)}
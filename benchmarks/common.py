@@ -0,0 +1,79 @@
+"""Helpers shared by the benchmarks: seeding assets and timing calls."""
+import random
+import statistics
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict, List
+
+from sqlalchemy import delete, insert
+
+from app.id_allocator import format_asset_id, seed_allocator
+from app.models.assets import Asset, Status
+from app.models.id_allocator import AssetIdAllocator
+
+MANUFACTURERS = ["Philips", "GE Healthcare", "Siemens", "Baxter", "Medtronic", "Zoll", "Mindray", "Dell"]
+ASSET_NAMES = ["Patient Monitor", "Infusion Pump", "Ventilator", "Defibrillator", "Ultrasound", "ECG Machine"]
+
+
+def facility_names(count: int) -> List[str]:
+    return [f"Facility {n:03d}" for n in range(count)]
+
+
+def asset_row(n: int, rng: random.Random, facilities: List[str], today: date) -> dict:
+    """Column values for the n-th seeded asset (asset_id AST000n+1)."""
+    return {
+        "asset_id": format_asset_id(n + 1),
+        "asset_name": f"{rng.choice(ASSET_NAMES)} {n}",
+        "value": rng.randrange(100, 50_000),
+        "purchase_date": today - timedelta(days=rng.randrange(1500)),
+        "manufacturer": rng.choice(MANUFACTURERS),
+        "model": f"M{rng.randrange(500)}",
+        "serial_number": f"SN{n:08d}",
+        "supplier": f"Supplier {n % 40}",
+        "warranty": 60,
+        "warranty_expiry": today + timedelta(days=rng.randrange(5 * 365)),
+        "status": Status.ACTIVE if rng.random() < 0.8 else Status.INACTIVE,
+        "facility_name": rng.choice(facilities),
+    }
+
+
+def seed(engine, count: int, start: int = 0, facilities: int = 50, batch_size: int = 10_000) -> None:
+    """
+    Insert assets start..start+count-1 in batches, spread over the given
+    number of facilities, then move the id allocator past them.
+    """
+    rng = random.Random(start)
+    names = facility_names(facilities)
+    today = date.today()
+    with engine.begin() as conn:
+        for offset in range(start, start + count, batch_size):
+            stop = min(offset + batch_size, start + count)
+            conn.execute(insert(Asset.__table__), [asset_row(n, rng, names, today) for n in range(offset, stop)])
+        conn.execute(delete(AssetIdAllocator))
+        seed_allocator(conn)
+
+
+def timed(fn: Callable, repeat: int) -> float:
+    """Median wall time of fn() in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def latency_summary(latencies_ms: List[float]) -> Dict[str, float]:
+    """Mean and p50/p95/p99 of a list of latencies in milliseconds."""
+    if not latencies_ms:
+        return {"mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0}
+    if len(latencies_ms) == 1:
+        cuts = latencies_ms * 99
+    else:
+        cuts = statistics.quantiles(latencies_ms, n=100, method="inclusive")
+    return {
+        "mean_ms": round(statistics.fmean(latencies_ms), 3),
+        "p50_ms": round(cuts[49], 3),
+        "p95_ms": round(cuts[94], 3),
+        "p99_ms": round(cuts[98], 3),
+    }
@@ -0,0 +1,58 @@
+"""
+Compare two benchmarks.load result files.
+
+    python -m benchmarks.compare results/before.json results/after.json --threshold 10
+
+Prints RPS and p95/p99 changes per mode and endpoint, and exits with status 1
+if any p95 latency got worse by more than --threshold percent.
+"""
+import argparse
+import json
+import sys
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def change(old: float, new: float) -> float:
+    return (new - old) / old * 100 if old else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed p95 regression in percent")
+    args = parser.parse_args()
+
+    baseline, candidate = load(args.baseline), load(args.candidate)
+    print(f"baseline  {baseline.get('commit')} ({baseline.get('timestamp')})")
+    print(f"candidate {candidate.get('commit')} ({candidate.get('timestamp')})")
+    if baseline.get("parameters") != candidate.get("parameters"):
+        print("warning: the runs used different parameters")
+
+    before = {(r["mode"], r["endpoint"]): r for r in baseline["results"]}
+    regressions = []
+    print(f"{'mode':<10} {'endpoint':<18} {'rps':>16} {'p95 ms':>20} {'p99 ms':>20}")
+    for result in candidate["results"]:
+        key = (result["mode"], result["endpoint"])
+        old = before.get(key)
+        if old is None:
+            continue
+        p95_change = change(old["p95_ms"], result["p95_ms"])
+        print(f"{key[0]:<10} {key[1]:<18} "
+              f"{result['rps']:>8.1f} {change(old['rps'], result['rps']):>+6.1f}% "
+              f"{result['p95_ms']:>12.2f} {p95_change:>+6.1f}% "
+              f"{result['p99_ms']:>12.2f} {change(old['p99_ms'], result['p99_ms']):>+6.1f}%")
+        if p95_change > args.threshold:
+            regressions.append(key)
+
+    if regressions:
+        print("p95 regressions over threshold: " + ", ".join("/".join(key) for key in regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Cost of serializing a /get/all page: the ORM + response model path against
+the Core rows + json_array fast path.
+
+The ORM path is what FastAPI did before: load Asset objects into the session,
+validate them into List[AssetResponse] and render the JSONResponse. The fast
+path selects LIST_COLUMNS rows and encodes them directly. Both run against
+the same throwaway SQLite database and must produce identical bytes.
+
+    python -m benchmarks.list_serialization --limits 100 1000
+"""
+import argparse
+import os
+import tempfile
+from typing import List
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.AssetsCrud import LIST_COLUMNS, RESPONSE_FIELDS
+from app.models import Base
+from app.models.assets import Asset
+from app.schemas.assets import AssetResponse
+from app.utils.export import json_array
+from benchmarks.common import seed, timed
+
+page_adapter = TypeAdapter(List[AssetResponse])
+
+
+def orm_page(db, limit: int) -> bytes:
+    assets = db.query(Asset).order_by(Asset.id).limit(limit).all()
+    models = page_adapter.validate_python(assets, from_attributes=True)
+    return JSONResponse(page_adapter.dump_python(models, mode="json")).body
+
+
+def core_page(db, limit: int) -> bytes:
+    rows = db.execute(select(*LIST_COLUMNS).order_by(Asset.id).limit(limit)).all()
+    return json_array(rows, RESPONSE_FIELDS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--limits", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    url = os.getenv("BENCH_DATABASE_URL") or f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+    engine = create_engine(url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    seed(engine, max(args.limits))
+    Session = sessionmaker(bind=engine)
+
+    def run(page, limit):
+        # A fresh session each time, as a request would have
+        with Session() as db:
+            return page(db, limit)
+
+    print(f"{'rows':>6} {'orm ms':>8} {'core ms':>8} {'speedup':>8}")
+    for limit in args.limits:
+        assert run(orm_page, limit) == run(core_page, limit), "paths disagree"
+        orm = timed(lambda: run(orm_page, limit), args.repeat)
+        core = timed(lambda: run(core_page, limit), args.repeat)
+        print(f"{limit:>6} {orm:>8.2f} {core:>8.2f} {orm / core:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
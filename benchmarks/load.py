@@ -0,0 +1,333 @@
+"""
+Load test for the assets API.
+
+Seeds a fresh database, mints an ADMIN token with the auth_utils settings and
+drives each endpoint with concurrent closed-loop clients, either in-process
+(httpx over ASGI, no network) or against a uvicorn server started for the run:
+
+    python -m benchmarks.load --assets 100000 --facilities 200 --concurrency 32
+    python -m benchmarks.load --mode uvicorn --workers 4 --output results/main.json
+    python -m benchmarks.compare results/main.json results/branch.json
+
+Every mode gets its own freshly seeded database, so runs are repeatable and
+writes (POST, PATCH, DELETE) never touch ids another scenario reads. Set
+BENCH_DATABASE_URL to run against PostgreSQL instead of a temporary SQLite
+file; that database is dropped and re-created.
+
+Results (requests, errors, RPS, mean/p50/p95/p99 latency per endpoint) are
+printed as a table and written as JSON together with the git commit and the
+run parameters.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+# The app reads its settings at import time, so they are set before any
+# app module is imported
+os.environ["RATE_LIMIT_PER_MINUTE"] = str(10 ** 9)
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("LOG_DIR", os.path.join(tempfile.gettempdir(), "assets-bench-logs"))
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+ENDPOINTS = ["addAsset", "get_by_id", "batch", "get_all", "get_all_filtered", "facility_names", "patch", "delete"]
+BATCH_SIZE = 50
+
+# (method, path, json body) for the i-th request of a scenario
+RequestFactory = Callable[[int], Tuple[str, str, Optional[dict]]]
+
+
+def mint_token(role: str = "ADMIN", username: str = "bench") -> str:
+    from jose import jwt
+    from app.auth_utils import ALGORITHM, SECRET_KEY
+
+    expires = datetime.now(timezone.utc) + timedelta(hours=2)
+    return jwt.encode({"sub": username, "role": role, "exp": expires}, SECRET_KEY, algorithm=ALGORITHM)
+
+
+def asset_body(serial_number: str, facility: str) -> dict:
+    today = date.today()
+    return {
+        "asset_name": "Benchmark Monitor",
+        "value": "1250.00",
+        "purchase_date": (today - timedelta(days=30)).isoformat(),
+        "manufacturer": "Philips",
+        "model": "MX450",
+        "serial_number": serial_number,
+        "supplier": "Bench Supplies",
+        "warranty": 24,
+        "warranty_expiry": (today + timedelta(days=700)).isoformat(),
+        "status": "ACTIVE",
+        "facility_name": facility,
+    }
+
+
+def scenarios(assets: int, facilities: List[str], requests: int, seed: int) -> Dict[str, RequestFactory]:
+    """
+    Request factories per endpoint. Seeded asset n has asset_id
+    format_asset_id(n + 1) and serial SN{n:08d}; reads (batch: BATCH_SIZE ids
+    each) use the first half of the ids, PATCH the third quarter and DELETE
+    the last quarter.
+    """
+    from app.id_allocator import format_asset_id
+
+    rng = random.Random(seed)
+    read_ids = [rng.randrange(assets // 2) for _ in range(requests)]
+    quarter = assets // 4
+    run_tag = f"{seed:x}{int(time.time()):x}"
+
+    def add_asset(i):
+        return "POST", "/addAsset", asset_body(f"BENCH-{run_tag}-{i}", facilities[i % len(facilities)])
+
+    def get_by_id(i):
+        return "GET", f"/{format_asset_id(read_ids[i % len(read_ids)] + 1)}", None
+
+    def batch(i):
+        ids = [format_asset_id(read_ids[(i * BATCH_SIZE + k) % len(read_ids)] + 1) for k in range(BATCH_SIZE)]
+        return "POST", "/batch", {"ids": ids}
+
+    def get_all(i):
+        return "GET", "/get/all?limit=100", None
+
+    def get_all_filtered(i):
+        return "GET", f"/get/all?status=ACTIVE&facility={facilities[i % len(facilities)]}&limit=100", None
+
+    def facility_names(i):
+        return "GET", "/facility/names", None
+
+    def patch(i):
+        n = assets // 2 + i % quarter
+        return "PATCH", f"/{format_asset_id(n + 1)}", asset_body(f"SN{n:08d}", facilities[(n + 1) % len(facilities)])
+
+    def delete(i):
+        n = assets - quarter + i % quarter
+        return "DELETE", f"/{format_asset_id(n + 1)}", None
+
+    return {
+        "addAsset": add_asset,
+        "get_by_id": get_by_id,
+        "batch": batch,
+        "get_all": get_all,
+        "get_all_filtered": get_all_filtered,
+        "facility_names": facility_names,
+        "patch": patch,
+        "delete": delete,
+    }
+
+
+async def drive(client: httpx.AsyncClient, make_request: RequestFactory, total: int, concurrency: int) -> dict:
+    """Send total requests from concurrency closed-loop clients and summarize them."""
+    from benchmarks.common import latency_summary
+
+    counter = itertools.count()
+    latencies: List[float] = []
+    errors = 0
+    statuses: Dict[str, int] = {}
+
+    async def client_loop():
+        nonlocal errors
+        while True:
+            i = next(counter)
+            if i >= total:
+                return
+            method, path, body = make_request(i)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                status = str(response.status_code)
+            except httpx.HTTPError:
+                status = "error"
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[status] = statuses.get(status, 0) + 1
+            if not status.startswith("2"):
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": total,
+        "errors": errors,
+        "statuses": statuses,
+        "seconds": round(elapsed, 3),
+        "rps": round(total / elapsed, 1) if elapsed else 0.0,
+        **latency_summary(latencies),
+    }
+
+
+async def run_scenarios(client: httpx.AsyncClient, args, facilities: List[str]) -> List[dict]:
+    factories = scenarios(args.assets, facilities, args.requests, args.seed)
+    results = []
+    for name in args.endpoints:
+        total = args.requests
+        if name in ("patch", "delete"):
+            # Each PATCH / DELETE targets a distinct seeded asset
+            total = min(total, args.assets // 4)
+        if args.warmup and name not in ("addAsset", "patch", "delete"):
+            await drive(client, factories[name], args.warmup, args.concurrency)
+        result = await drive(client, factories[name], total, args.concurrency)
+        results.append({"endpoint": name, **result})
+        print(f"  {name:<18} {result['rps']:>9.1f} rps  p50 {result['p50_ms']:>8.2f}  "
+              f"p95 {result['p95_ms']:>8.2f}  p99 {result['p99_ms']:>8.2f} ms  errors {result['errors']}",
+              flush=True)
+    return results
+
+
+def prepare_database(url: str, args) -> None:
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+    from sqlalchemy import create_engine
+    from app.database import database_url
+    from app.models import Base
+    from app.startup import ALEMBIC_DIR
+    from benchmarks.common import seed
+
+    engine = create_engine(database_url(url))
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        # The tables match the models, so mark them as migrated for the
+        # startup schema check
+        MigrationContext.configure(conn).stamp(ScriptDirectory(ALEMBIC_DIR), "head")
+    started = time.perf_counter()
+    seed(engine, args.assets, facilities=args.facilities)
+    engine.dispose()
+    print(f"  seeded {args.assets} assets across {args.facilities} facilities "
+          f"in {time.perf_counter() - started:.1f}s", flush=True)
+
+
+def bench_database_url(mode: str) -> str:
+    url = os.getenv("BENCH_DATABASE_URL")
+    if url:
+        return url
+    return f"sqlite:///{tempfile.mkdtemp(prefix='assets-bench-')}/{mode}.db"
+
+
+def client_limits(args) -> httpx.Limits:
+    return httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+
+async def run_in_process(url: str, args, facilities: List[str]) -> List[dict]:
+    # main() exported url as DATABASE_URL before the first app import
+    from app.main import app
+
+    headers = {"Authorization": f"Bearer {mint_token()}"}
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers,
+                                     limits=client_limits(args), timeout=60) as client:
+            return await run_scenarios(client, args, facilities)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_until_healthy(client: httpx.AsyncClient, server: subprocess.Popen, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with status {server.returncode}")
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("uvicorn did not become healthy in time")
+
+
+async def run_uvicorn(url: str, args, facilities: List[str]) -> List[dict]:
+    port = free_port()
+    env = {**os.environ, "DATABASE_URL": url}
+    command = [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+               "--workers", str(args.workers), "--log-level", "warning", "--no-access-log"]
+    server = subprocess.Popen(command, env=env, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    try:
+        headers = {"Authorization": f"Bearer {mint_token()}"}
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", headers=headers,
+                                     limits=client_limits(args), timeout=60) as client:
+            await wait_until_healthy(client, server)
+            return await run_scenarios(client, args, facilities)
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+def git_revision() -> Dict[str, object]:
+    def git(*command):
+        return subprocess.run(["git", *command], capture_output=True, text=True).stdout.strip()
+
+    return {"commit": git("rev-parse", "HEAD") or None, "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mode", choices=["inprocess", "uvicorn", "both"], default="inprocess")
+    parser.add_argument("--assets", type=int, default=10_000, help="Assets to seed (1k - 1M)")
+    parser.add_argument("--facilities", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=1_000, help="Requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients")
+    parser.add_argument("--warmup", type=int, default=50, help="Untimed requests before each read scenario")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=ENDPOINTS)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="JSON results file (default: benchmarks/results/<commit>-<time>.json)")
+    args = parser.parse_args()
+    if args.assets < 4:
+        parser.error("--assets must be at least 4")
+
+    modes = ["inprocess", "uvicorn"] if args.mode == "both" else [args.mode]
+    urls = {mode: bench_database_url(mode) for mode in modes}
+    os.environ["DATABASE_URL"] = urls[modes[0]]
+
+    from benchmarks.common import facility_names
+
+    facilities = facility_names(args.facilities)
+    run = {
+        **git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "use_async_db": os.getenv("USE_ASYNC_DB", "true"),
+        "parameters": {key: value for key, value in vars(args).items() if key != "output"},
+        "results": [],
+    }
+
+    for mode in modes:
+        url = urls[mode]
+        print(f"{mode}:", flush=True)
+        prepare_database(url, args)
+        runner = run_in_process if mode == "inprocess" else run_uvicorn
+        for result in asyncio.run(runner(url, args, facilities)):
+            run["results"].append({"mode": mode, **result})
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        name = f"{(run['commit'] or 'unknown')[:12]}-{datetime.now():%Y%m%d-%H%M%S}.json"
+        output = os.path.join(RESULTS_DIR, name)
+    with open(output, "w") as f:
+        json.dump(run, f, indent=2)
+    print(f"results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
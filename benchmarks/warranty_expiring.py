@@ -0,0 +1,76 @@
+"""
+Latency of AssetCRUD.get_expiring_assets as the assets table grows.
+
+Seeds a throwaway SQLite database (or BENCH_DATABASE_URL) with N assets spread
+over 50 facilities and expiry dates over the next five years, then times the
+first page and a page reached through the cursor. With the
+(facility_name, warranty_expiry, id) index the timings should stay flat from
+1k to 1M rows; the query plan is printed for the largest size.
+
+    python -m benchmarks.warranty_expiring --sizes 1000 10000 100000 1000000
+"""
+import argparse
+import os
+import tempfile
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.AssetsCrud import AssetCRUD
+from app.models import Base
+from app.models.assets import Asset, Status
+from benchmarks.common import facility_names, seed, timed
+
+FACILITIES = facility_names(50)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    url = os.getenv("BENCH_DATABASE_URL") or f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+    engine = create_engine(url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+
+    print(f"{'rows':>10} {'first page ms':>14} {'next page ms':>13} {'rows/page':>10}")
+    seeded = 0
+    for size in sorted(args.sizes):
+        seed(engine, size - seeded, start=seeded, facilities=len(FACILITIES))
+        seeded = size
+        if engine.dialect.name == "postgresql":
+            with engine.begin() as conn:
+                conn.execute(text("ANALYZE assets"))
+
+        def page(cursor=None):
+            # A fresh session each time, as a request would have
+            with Session() as db:
+                return AssetCRUD.get_expiring_assets(
+                    db, FACILITIES[0], days=args.days, limit=args.limit, cursor=cursor
+                )
+
+        assets, cursor = page()
+        first = timed(page, args.repeat)
+        following = timed(lambda: page(cursor), args.repeat) if cursor else float("nan")
+        print(f"{size:>10} {first:>14.2f} {following:>13.2f} {len(assets):>10}")
+
+    explain = "EXPLAIN QUERY PLAN" if engine.dialect.name == "sqlite" else "EXPLAIN"
+    with Session() as db:
+        query = db.query(Asset).filter(
+            Asset.facility_name == FACILITIES[0],
+            Asset.warranty_expiry.between(date.today(), date.today() + timedelta(days=args.days)),
+            Asset.status == Status.ACTIVE
+        ).order_by(Asset.warranty_expiry, Asset.id).limit(args.limit)
+        compiled = query.statement.compile(engine, compile_kwargs={"literal_binds": True})
+        for row in db.execute(text(f"{explain} {compiled}")):
+            print(" ".join(str(part) for part in row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import os
+import tempfile
+
+# Settings are read when app.config is imported, so point the app at a
+# scratch SQLite database and log directory before any test imports it
+_scratch = tempfile.mkdtemp(prefix="assets-tests-")
+DATABASE_FILE = os.path.join(_scratch, "assets.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DATABASE_FILE}"
+os.environ["LOG_DIR"] = os.path.join(_scratch, "logs")
+os.environ["SCHEMA_CHECK"] = "off"
+os.environ["RATE_LIMIT_PER_MINUTE"] = "100000"
+os.environ["ASSET_CACHE_URL"] = "memory://"
+os.environ["CHANGE_BROKER_URL"] = "memory://"
+
+import pytest
+from fastapi.testclient import TestClient
+from jose import jwt
+
+from app.asset_cache import asset_cache
+from app.asset_stats import asset_stats
+from app.auth_utils import ALGORITHM, SECRET_KEY
+from app.AssetsCrud import asset_reads
+from app.database import get_engine
+from app.facility_index import facility_index
+from app.id_allocator import asset_id_allocator
+from app.main import app
+from app.models.base import Base
+
+
+def auth_headers(role: str = "ADMIN", username: str = "alice") -> dict:
+    token = jwt.encode({"sub": username, "role": role}, SECRET_KEY, algorithm=ALGORITHM)
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def anyio_backend():
+    # The app runs on asyncio only
+    return "asyncio"
+
+
+@pytest.fixture
+def headers():
+    return auth_headers()
+
+
+@pytest.fixture
+def make_asset():
+    """Request body for a valid asset; serial numbers follow the number given."""
+    def make_asset(number: int, **values) -> dict:
+        asset = {
+            "asset_name": f"Monitor {number}",
+            "value": "1200.50",
+            "purchase_date": "2025-01-01",
+            "manufacturer": "Philips",
+            "model": "X1",
+            "serial_number": f"SN-{number}",
+            "supplier": "Supplier",
+            "warranty": 12,
+            "warranty_expiry": "2030-01-01",
+            "status": "ACTIVE",
+            "facility_name": "Facility A",
+        }
+        asset.update(values)
+        return asset
+    return make_asset
+
+
+@pytest.fixture
+def client():
+    """The app over a freshly created database, with every in-process cache empty."""
+    if os.path.exists(DATABASE_FILE):
+        os.remove(DATABASE_FILE)
+    Base.metadata.create_all(get_engine())
+    asset_cache.clear()
+    asset_stats.invalidate()
+    facility_index.invalidate()
+    asset_id_allocator.reset()
+    asset_reads.forget()
+    # The lifespan disposes of the engines again on exit
+    with TestClient(app) as client:
+        yield client
@@ -0,0 +1,79 @@
+import pytest
+
+from app import AssetsCrud
+from app.asset_cache import AssetCacheBackend, InMemoryAssetCache, RedisAssetCache
+
+ASSET = {"asset_id": "AST0001", "asset_name": "Monitor", "version": 1}
+
+
+def redis_cache():
+    fakeredis = pytest.importorskip("fakeredis")
+    return RedisAssetCache(fakeredis.FakeRedis(), ttl=60)
+
+
+@pytest.fixture(params=["memory", "redis"])
+def cache(request):
+    if request.param == "memory":
+        return InMemoryAssetCache(maxsize=100, ttl=60)
+    return redis_cache()
+
+
+def test_backend_must_implement_the_interface():
+    with pytest.raises(TypeError):
+        AssetCacheBackend()
+
+
+def test_set_and_get(cache):
+    epoch = cache.epochs(["AST0001"])["AST0001"]
+    cache.set("AST0001", ASSET, epoch)
+
+    assert cache.get("AST0001") == ASSET
+    assert cache.get_many(["AST0001", "AST0002"]) == {"AST0001": ASSET}
+    assert cache.epochs([]) == {}
+
+
+def test_fill_racing_a_delete_is_dropped(cache):
+    # A read took the epoch, then a write invalidated the asset before the
+    # read's row was cached
+    epoch = cache.epochs(["AST0001"])["AST0001"]
+    cache.delete("AST0001")
+    cache.set("AST0001", ASSET, epoch)
+    assert cache.get("AST0001") is None
+
+    # A read starting after the write may fill it
+    cache.set("AST0001", ASSET, cache.epochs(["AST0001"])["AST0001"])
+    assert cache.get("AST0001") == ASSET
+
+
+def test_delete_removes_the_cached_asset(cache):
+    cache.set("AST0001", ASSET, cache.epochs(["AST0001"])["AST0001"])
+    cache.delete("AST0001")
+    assert cache.get("AST0001") is None
+
+
+def test_redis_epochs_are_per_asset():
+    cache = redis_cache()
+    epochs = cache.epochs(["AST0001", "AST0002"])
+    cache.delete("AST0001")
+
+    cache.set("AST0002", {**ASSET, "asset_id": "AST0002"}, epochs["AST0002"])
+    assert cache.get("AST0002") is not None
+
+
+def test_writes_invalidate_the_redis_cache(client, headers, make_asset, monkeypatch):
+    cache = redis_cache()
+    monkeypatch.setattr(AssetsCrud, "asset_cache", cache)
+    asset_id = client.post("/addAsset", json=make_asset(1), headers=headers).json()["asset_id"]
+
+    assert client.get(f"/{asset_id}", headers=headers).json()["asset_name"] == "Monitor 1"
+    assert cache.get(asset_id)["asset_name"] == "Monitor 1"
+
+    updated = client.patch(f"/{asset_id}", json=make_asset(1, asset_name="Renamed"), headers=headers)
+    assert updated.status_code == 200
+    assert cache.get(asset_id) is None
+    assert client.get(f"/{asset_id}", headers=headers).json()["asset_name"] == "Renamed"
+    assert cache.get(asset_id)["asset_name"] == "Renamed"
+
+    assert client.delete(f"/{asset_id}", headers=headers).status_code == 200
+    assert cache.get(asset_id) is None
+    assert client.get(f"/{asset_id}", headers=headers).status_code == 404
@@ -0,0 +1,115 @@
+import csv
+import io
+import time
+
+import pytest
+
+from app import asset_import
+from app.config import settings
+
+
+class RecordingBroker:
+    def __init__(self):
+        self.published = []
+
+    def publish(self, events):
+        self.published.append(events)
+
+
+@pytest.fixture
+def broker(monkeypatch):
+    broker = RecordingBroker()
+    monkeypatch.setattr(asset_import, "change_broker", broker)
+    return broker
+
+
+def to_csv(assets):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(assets[0]))
+    writer.writeheader()
+    writer.writerows(assets)
+    return buffer.getvalue().encode()
+
+
+def run_import(client, headers, assets):
+    response = client.post("/import", content=to_csv(assets), headers={**headers, "Content-Type": "text/csv"})
+    assert response.status_code == 202
+    location = response.headers["Location"]
+    for _ in range(200):
+        # SQLite may report the database locked while the merge commits
+        response = client.get(location, headers=headers)
+        if response.status_code == 200 and response.json()["status"] in ("completed", "failed"):
+            return response.json()
+        time.sleep(0.05)
+    pytest.fail("The import did not finish")
+
+
+def test_import_skips_invalid_and_duplicate_rows(client, headers, make_asset, broker, monkeypatch):
+    # Several chunks, so duplicates and errors span chunk boundaries
+    monkeypatch.setattr(settings, "IMPORT_CHUNK_ROWS", 2)
+    client.post("/addAsset", json=make_asset(1), headers=headers)
+
+    rows = [
+        make_asset(2),                      # row 2
+        make_asset(1),                      # row 3: already an asset
+        make_asset(3, value="lots"),        # row 4: invalid
+        make_asset(4),                      # row 5
+        make_asset(2),                      # row 6: repeats row 2
+        make_asset(5, asset_name=""),       # row 7: required field left empty
+        make_asset(6, status=""),           # row 8: status defaults
+    ]
+    job = run_import(client, headers, rows)
+
+    assert job["status"] == "completed"
+    assert (job["rows_read"], job["rows_imported"], job["rows_invalid"], job["rows_duplicate"]) == (7, 3, 2, 2)
+    listed = client.get("/get/all", headers=headers).json()
+    assert [asset["serial_number"] for asset in listed] == ["SN-1", "SN-2", "SN-4", "SN-6"]
+    # Imported assets are numbered in file order, after the ids this worker holds
+    imported = [int(asset["asset_id"].removeprefix("AST")) for asset in listed[1:]]
+    assert imported == list(range(imported[0], imported[0] + 3)) and imported[0] > 1
+    assert listed[-1]["status"] == "ACTIVE"
+
+    errors = client.get(f"/import/{job['id']}/errors", headers=headers).json()
+    assert [error["row_number"] for error in errors] == [3, 4, 6, 7]
+    assert errors[0]["error"] == errors[2]["error"] == "Asset with this Serial Number already exists"
+    assert errors[1]["error"].startswith("value:")
+    assert errors[3]["error"].startswith("asset_name:")
+
+    # Subscribers get one resync event for the whole file, not one per row
+    assert len(broker.published) == 1
+    (event,) = broker.published[0]
+    assert (event["operation"], event["count"]) == ("resync", 3)
+
+
+def test_error_report_is_paged(client, headers, make_asset, broker):
+    job = run_import(client, headers, [make_asset(number, value="lots") for number in range(5)])
+    assert (job["rows_imported"], job["rows_invalid"]) == (0, 5)
+    # Nothing was created, so nothing is announced
+    assert broker.published == []
+
+    url = f"/import/{job['id']}/errors"
+    first = client.get(url, params={"limit": 3}, headers=headers)
+    assert [error["row_number"] for error in first.json()] == [2, 3, 4]
+    cursor = first.headers["X-Next-Cursor"]
+    rest = client.get(url, params={"limit": 3, "cursor": cursor}, headers=headers)
+    assert [error["row_number"] for error in rest.json()] == [5, 6]
+    assert "X-Next-Cursor" not in rest.headers
+
+
+def test_file_without_required_columns_fails(client, headers):
+    response = client.post(
+        "/import", content=b"asset_name,value\nMonitor,10\n", headers={**headers, "Content-Type": "text/csv"}
+    )
+    location = response.headers["Location"]
+    for _ in range(200):
+        job = client.get(location, headers=headers).json()
+        if job["status"] == "failed":
+            break
+        time.sleep(0.05)
+    assert job["error"].startswith("Missing columns:")
+    assert client.get("/get/all", headers=headers).json() == []
+
+
+def test_unknown_import_is_not_found(client, headers):
+    assert client.get("/import/999", headers=headers).status_code == 404
+    assert client.get("/import/999/errors", headers=headers).status_code == 404
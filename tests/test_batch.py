@@ -0,0 +1,123 @@
+import asyncio
+from datetime import date
+
+import pytest
+from sqlalchemy import update
+
+from app.config import settings
+from app.database import get_engine
+from app.models.assets import Asset
+from app.utils.single_flight import SingleFlight
+
+
+def batch(client, headers, ids):
+    response = client.post("/batch", json={"ids": ids}, headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_batch_keeps_request_order_and_reports_missing(client, headers, make_asset):
+    client.post("/addAssets", json=[make_asset(1), make_asset(2), make_asset(3)], headers=headers)
+
+    body = batch(client, headers, ["AST0003", "AST9999", "AST0001", "AST0003", "AST9999"])
+    # Repeated ids come back once, found or not
+    assert [asset["asset_id"] for asset in body["assets"]] == ["AST0003", "AST0001"]
+    assert body["missing"] == ["AST9999"]
+
+    # The second read is served from the cache and must look the same
+    assert batch(client, headers, ["AST0003", "AST9999", "AST0001"]) == body
+
+
+def test_batch_size_limit(client, headers, monkeypatch):
+    monkeypatch.setattr(settings, "BATCH_MAX_IDS", 2)
+
+    assert client.post("/batch", json={"ids": ["AST0001", "AST0002"]}, headers=headers).status_code == 200
+    response = client.post("/batch", json={"ids": ["AST0001", "AST0002", "AST0003"]}, headers=headers)
+    assert response.status_code == 413
+    assert client.post("/batch", json={"ids": []}, headers=headers).status_code == 422
+
+
+def test_batch_returns_assets_with_an_expired_warranty(client, headers, make_asset):
+    client.post("/addAsset", json=make_asset(1), headers=headers)
+    # AssetCreate rejects past dates, so age the stored row directly
+    with get_engine().begin() as conn:
+        conn.execute(update(Asset.__table__).values(warranty_expiry=date(2020, 1, 1)))
+
+    body = batch(client, headers, ["AST0001"])
+    assert body["assets"][0]["warranty_expiry"] == "2020-01-01"
+    assert body["missing"] == []
+
+
+@pytest.mark.anyio
+async def test_concurrent_identical_calls_run_once():
+    flight = SingleFlight()
+    release = asyncio.Event()
+    calls = []
+
+    async def read(key):
+        calls.append(key)
+        await release.wait()
+        return {"key": key}
+
+    waiting = [asyncio.ensure_future(flight.do(key, lambda key=key: read(key))) for key in ("a", "a", "a", "b")]
+    await asyncio.sleep(0)
+    assert flight.stats() == {"started": 2, "joined": 2, "in_flight": 2}
+    release.set()
+    results = await asyncio.gather(*waiting)
+
+    assert calls == ["a", "b"]
+    # Joined callers get the very same object
+    assert results[0] is results[1] is results[2]
+    assert flight.stats()["in_flight"] == 0
+    # Once finished, the next call starts afresh
+    await flight.do("a", lambda: read("a"))
+    assert calls == ["a", "b", "a"]
+
+
+@pytest.mark.anyio
+async def test_forget_and_disabled_flights_start_afresh():
+    release = asyncio.Event()
+    calls = []
+
+    async def read():
+        calls.append(1)
+        await release.wait()
+        return len(calls)
+
+    flight = SingleFlight()
+    first = asyncio.ensure_future(flight.do("a", read))
+    await asyncio.sleep(0)
+    # A write happened: later callers must not join the read already running
+    flight.forget()
+    second = asyncio.ensure_future(flight.do("a", read))
+    await asyncio.sleep(0)
+
+    disabled = SingleFlight(enabled=False)
+    third = asyncio.ensure_future(disabled.do("a", read))
+    fourth = asyncio.ensure_future(disabled.do("a", read))
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(first, second, third, fourth)
+
+    assert len(calls) == 4
+    assert disabled.stats() == {"started": 0, "joined": 0, "in_flight": 0}
+
+
+@pytest.mark.anyio
+async def test_cancelled_caller_does_not_cancel_the_others():
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def read():
+        await release.wait()
+        return "row"
+
+    leaving = asyncio.ensure_future(flight.do("a", read))
+    staying = asyncio.ensure_future(flight.do("a", read))
+    await asyncio.sleep(0)
+    leaving.cancel()
+    release.set()
+
+    assert await staying == "row"
+    with pytest.raises(asyncio.CancelledError):
+        await leaving
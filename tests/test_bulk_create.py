@@ -0,0 +1,69 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app import AssetsCrud
+from app.AssetsCrud import AssetCRUD
+from app.id_allocator import AssetIdBlockAllocator
+from app.models.base import Base
+from app.schemas.assets import AssetCreate
+
+
+def test_bulk_create_reports_duplicates_in_input_order(client, headers, make_asset):
+    existing = client.post("/addAsset", json=make_asset(1), headers=headers).json()
+    assert existing["asset_id"] == "AST0001"
+
+    batch = [make_asset(2), make_asset(1), make_asset(3), make_asset(2), make_asset(4)]
+    response = client.post("/addAssets", json=batch, headers=headers)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["created"], body["failed"]) == (3, 2)
+    results = body["results"]
+    assert [result["index"] for result in results] == [0, 1, 2, 3, 4]
+    assert [result["success"] for result in results] == [True, False, True, False, True]
+    # Rejected items: the serial already in the table, and a repeat of item 0
+    assert results[1]["error"] == results[3]["error"] == "Asset with this Serial Number already exists"
+    created = [result["asset"] for result in results if result["success"]]
+    assert [asset["serial_number"] for asset in created] == ["SN-2", "SN-3", "SN-4"]
+    assert [asset["asset_id"] for asset in created] == ["AST0002", "AST0003", "AST0004"]
+
+    # Ids reserved for the rejected items go to the next assets
+    assert client.post("/addAsset", json=make_asset(5), headers=headers).json()["asset_id"] == "AST0005"
+    listed = client.get("/get/all", headers=headers).json()
+    assert [asset["serial_number"] for asset in listed] == ["SN-1", "SN-2", "SN-3", "SN-4", "SN-5"]
+
+
+def test_bulk_create_with_every_item_rejected(client, headers, make_asset):
+    client.post("/addAsset", json=make_asset(1), headers=headers)
+
+    body = client.post("/addAssets", json=[make_asset(1), make_asset(1)], headers=headers).json()
+    assert (body["created"], body["failed"]) == (0, 2)
+    assert client.post("/addAsset", json=make_asset(2), headers=headers).json()["asset_id"] == "AST0002"
+
+
+def test_writes_need_one_pooled_connection(tmp_path, monkeypatch):
+    # A single-connection pool: reserving a block while the session held its
+    # connection would time out waiting for a second one
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'assets.db'}", pool_size=1, max_overflow=0, pool_timeout=1
+    )
+    Base.metadata.create_all(engine)
+    monkeypatch.setattr(AssetsCrud, "asset_id_allocator", AssetIdBlockAllocator(block_size=2))
+
+    def new_asset(number: int) -> AssetCreate:
+        return AssetCreate(
+            asset_name=f"Monitor {number}", value=Decimal("10"), purchase_date=date(2025, 1, 1),
+            manufacturer="Philips", model="X1", serial_number=f"SN-{number}", supplier="Supplier",
+            warranty=12, warranty_expiry=date.today() + timedelta(days=365), facility_name="Facility A",
+        )
+
+    with Session(engine) as db:
+        results = AssetCRUD.create_assets(db, [new_asset(number) for number in range(5)])
+    assert all(result["success"] for result in results)
+    for number in range(5, 8):
+        with Session(engine) as db:
+            AssetCRUD.create_asset(db, new_asset(number))
+    engine.dispose()
@@ -0,0 +1,142 @@
+import asyncio
+import json
+
+import pytest
+
+from app.auth_utils import User
+from app.change_broker import (
+    RESYNC, ChangeBroker, InMemoryChangeBroker, RedisChangeBroker, change_event, resync_event,
+)
+from app.change_feed import CREATE, DELETE, UPDATE
+from app.config import settings
+from app.routers import AssetsRouter
+
+
+def event(operation=UPDATE, asset_id="AST0001", facility="Facility A", status="ACTIVE", **previous):
+    payload = None if operation == DELETE else {"asset_id": asset_id, "facility_name": facility, "status": status}
+    change = {"asset_id": asset_id, "operation": operation, "version": 1, "payload": payload}
+    return change_event(change, facility, status, **previous)
+
+
+async def settle():
+    # deliver() hands events over with call_soon_threadsafe
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+def test_broker_must_implement_publish():
+    with pytest.raises(TypeError):
+        ChangeBroker(queue_size=10)
+
+
+@pytest.mark.anyio
+async def test_resync_event_reaches_every_subscriber():
+    resync = resync_event(250)
+    assert resync["operation"] == RESYNC
+    assert resync["count"] == 250
+    assert resync["asset_id"] is None and resync["asset"] is None
+
+    broker = InMemoryChangeBroker(queue_size=10)
+    subscriptions = [broker.subscribe(), broker.subscribe(facility="Facility B", status="INACTIVE")]
+    broker.publish([resync])
+    await settle()
+    assert [await subscription.get(1) for subscription in subscriptions] == [resync, resync]
+
+
+@pytest.mark.anyio
+async def test_filters_match_old_and_new_values():
+    broker = InMemoryChangeBroker(queue_size=10)
+    subscription = broker.subscribe(facility="Facility A", status="ACTIVE")
+
+    moved_out = event(facility="Facility B", previous_facility_name="Facility A", previous_status="ACTIVE")
+    retired = event(status="INACTIVE", previous_facility_name="Facility A", previous_status="ACTIVE")
+    moved_in = event(previous_facility_name="Facility C", previous_status="ACTIVE")
+    elsewhere = event(facility="Facility B", previous_facility_name="Facility C", previous_status="ACTIVE")
+    deleted = event(DELETE)
+    assert [subscription.matches(e) for e in (moved_out, retired, moved_in, elsewhere, deleted)] == [
+        True, True, True, False, True,
+    ]
+
+    broker.publish([moved_out, elsewhere, event(CREATE, facility="Facility C")])
+    await settle()
+    assert await subscription.get(1) == moved_out
+    assert subscription.queue.empty()
+
+
+@pytest.mark.anyio
+async def test_slow_subscriber_is_dropped():
+    broker = InMemoryChangeBroker(queue_size=2)
+    slow = broker.subscribe()
+    other = broker.subscribe(facility="Facility B")
+
+    broker.publish([event(asset_id=f"AST000{number}") for number in range(3)])
+    await settle()
+
+    assert slow.dropped
+    assert await slow.get(1) is None
+    assert broker.stats() == {"subscribers": 1, "dropped": 1}
+    # Later events don't reach it any more
+    broker.publish([event()])
+    await settle()
+    assert slow.queue.empty()
+    assert not other.dropped
+
+
+@pytest.mark.anyio
+async def test_redis_broker_relays_between_workers(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    import redis
+    import redis.asyncio
+
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(redis, "from_url", lambda url: fakeredis.FakeRedis(server=server))
+    monkeypatch.setattr(redis.asyncio, "from_url", lambda url: fakeredis.FakeAsyncRedis(server=server))
+
+    # Two workers sharing one channel
+    publisher = RedisChangeBroker("redis://localhost", queue_size=10)
+    worker = RedisChangeBroker("redis://localhost", queue_size=10)
+    subscription = worker.subscribe(facility="Facility A")
+    for _ in range(100):
+        if publisher.client.pubsub_numsub(publisher.channel)[0][1]:
+            break
+        await asyncio.sleep(0.01)
+
+    created, other = event(CREATE), event(CREATE, facility="Facility B")
+    publisher.publish([created, other])
+    assert await subscription.get(5) == created
+
+    subscription.close()
+    worker._relay.cancel()
+    assert worker.stats()["subscribers"] == 0
+
+
+@pytest.mark.anyio
+async def test_stream_sends_events_as_sse(monkeypatch):
+    broker = InMemoryChangeBroker(queue_size=2)
+    monkeypatch.setattr(AssetsRouter, "change_broker", broker)
+    monkeypatch.setattr(settings, "STREAM_HEARTBEAT", 1)
+
+    user = User(username="alice", role="ADMIN")
+    response = await AssetsRouter.stream_changes(current_user=user, facility="Facility A", status=None)
+    assert response.media_type == "text/event-stream"
+    stream = response.body_iterator
+    assert await stream.__anext__() == "retry: 1000\n\n"
+
+    created = event(CREATE)
+    broker.publish([event(CREATE, facility="Facility B"), created])
+    await settle()
+    chunk = await stream.__anext__()
+    name, data = chunk.rstrip("\n").split("\n")
+    assert name == "event: create"
+    assert json.loads(data.removeprefix("data: ")) == created
+
+    # Idle streams get keep-alives
+    assert await stream.__anext__() == ": keep-alive\n\n"
+
+    # Falling behind ends the stream with a "dropped" event
+    broker.publish([event(), event(), event()])
+    await settle()
+    assert await stream.__anext__() == "event: dropped\ndata: {}\n\n"
+    with pytest.raises(StopAsyncIteration):
+        await stream.__anext__()
+    assert broker.stats()["subscribers"] == 0
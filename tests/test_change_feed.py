@@ -0,0 +1,76 @@
+import threading
+import time
+
+from app.config import settings
+
+
+def feed(client, headers, **params):
+    response = client.get("/changes", params=params, headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_changes_are_paged_in_commit_order(client, headers, make_asset):
+    first = client.post("/addAsset", json=make_asset(1), headers=headers).json()
+    client.post("/addAssets", json=[make_asset(2), make_asset(3)], headers=headers)
+    client.patch(f"/{first['asset_id']}", json=make_asset(1, asset_name="Renamed"), headers=headers)
+    client.delete(f"/{first['asset_id']}", headers=headers)
+
+    page = feed(client, headers, limit=3)
+    assert [(change["operation"], change["asset_id"]) for change in page["changes"]] == [
+        ("create", "AST0001"), ("create", "AST0002"), ("create", "AST0003"),
+    ]
+    rest = feed(client, headers, since=page["next_cursor"], limit=3)
+    assert [(change["operation"], change["version"]) for change in rest["changes"]] == [("update", 2), ("delete", 2)]
+    assert rest["changes"][0]["asset"]["asset_name"] == "Renamed"
+    assert rest["changes"][1]["asset"] is None
+
+    # Nothing new: the cursor stays put
+    empty = feed(client, headers, since=rest["next_cursor"])
+    assert empty == {"changes": [], "next_cursor": rest["next_cursor"]}
+
+
+def test_create_payload_matches_the_stored_row(client, headers, make_asset):
+    client.post("/addAsset", json=make_asset(1), headers=headers)
+    client.post("/addAssets", json=[make_asset(2)], headers=headers)
+
+    single, bulk = (change["asset"] for change in feed(client, headers)["changes"])
+    assert single.keys() == bulk.keys()
+    assert single["asset_id"] == "AST0001"
+    # Both come from the inserted rows, so they are encoded the same way
+    assert single["value"] == bulk["value"]
+
+
+def test_invalid_since_is_a_bad_request(client, headers):
+    assert client.get("/changes", params={"since": "nope!"}, headers=headers).status_code == 400
+
+
+def test_long_poll_wakes_up_on_commit(client, headers, make_asset, monkeypatch):
+    # Only the commit notification can end the wait early
+    monkeypatch.setattr(settings, "CHANGES_POLL_INTERVAL", 30)
+    cursor = feed(client, headers)["next_cursor"]
+    result = {}
+
+    def poll():
+        started = time.monotonic()
+        result["page"] = feed(client, headers, since=cursor, wait=20)
+        result["elapsed"] = time.monotonic() - started
+
+    poller = threading.Thread(target=poll)
+    poller.start()
+    time.sleep(0.5)
+    client.post("/addAsset", json=make_asset(1), headers=headers)
+    poller.join(timeout=20)
+
+    assert [change["asset_id"] for change in result["page"]["changes"]] == ["AST0001"]
+    assert result["elapsed"] < 10
+
+
+def test_long_poll_returns_empty_after_the_wait(client, headers, monkeypatch):
+    monkeypatch.setattr(settings, "CHANGES_POLL_INTERVAL", 0.2)
+    cursor = feed(client, headers)["next_cursor"]
+
+    started = time.monotonic()
+    page = feed(client, headers, since=cursor, wait=1)
+    assert page == {"changes": [], "next_cursor": cursor}
+    assert time.monotonic() - started >= 1
@@ -0,0 +1,45 @@
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+from app import AssetsCrud
+from app.database import get_engine
+from app.models.assets import Asset
+from app.schemas.assets import AssetCreate
+
+
+def insert_stray_asset(make_asset, asset_id):
+    # Written behind the allocator's back, so it will hand asset_id out again
+    with get_engine().begin() as conn:
+        conn.execute(insert(Asset.__table__).values(
+            asset_id=asset_id, **AssetCreate(**make_asset(99)).model_dump()
+        ))
+
+
+def test_duplicate_serial_is_a_bad_request(client, headers, make_asset):
+    client.post("/addAsset", json=make_asset(1), headers=headers)
+
+    response = client.post("/addAsset", json=make_asset(1), headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Asset with this Serial Number already exists"
+    # The id reserved for the rejected asset goes to the next one
+    assert client.post("/addAsset", json=make_asset(2), headers=headers).json()["asset_id"] == "AST0002"
+
+
+@pytest.mark.parametrize("conflict_inserts", [AssetsCrud.CONFLICT_INSERTS, {}], ids=["on-conflict", "fallback"])
+def test_other_integrity_errors_propagate(client, headers, make_asset, monkeypatch, conflict_inserts):
+    monkeypatch.setattr(AssetsCrud, "CONFLICT_INSERTS", conflict_inserts)
+    insert_stray_asset(make_asset, "AST0001")
+
+    with pytest.raises(IntegrityError):
+        client.post("/addAsset", json=make_asset(1), headers=headers)
+    # The colliding id is not handed out again
+    assert client.post("/addAsset", json=make_asset(1), headers=headers).json()["asset_id"] == "AST0002"
+
+
+def test_fallback_insert_reports_duplicate_serial(client, headers, make_asset, monkeypatch):
+    monkeypatch.setattr(AssetsCrud, "CONFLICT_INSERTS", {})
+    client.post("/addAsset", json=make_asset(1), headers=headers)
+
+    assert client.post("/addAsset", json=make_asset(1), headers=headers).status_code == 400
+    assert client.post("/addAsset", json=make_asset(2), headers=headers).json()["asset_id"] == "AST0002"
@@ -0,0 +1,56 @@
+def create(client, headers, make_asset, number=1):
+    response = client.post("/addAsset", json=make_asset(number), headers=headers)
+    return response.json()["asset_id"], response.headers["ETag"]
+
+
+def test_get_returns_304_while_unchanged(client, headers, make_asset):
+    asset_id, etag = create(client, headers, make_asset)
+    assert etag == f'"{asset_id}.1"'
+
+    response = client.get(f"/{asset_id}", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert client.get(f"/{asset_id}", headers={**headers, "If-None-Match": 'W/"other.1"'}).status_code == 200
+
+
+def test_update_bumps_version_only_on_change(client, headers, make_asset):
+    asset_id, etag = create(client, headers, make_asset)
+
+    same = client.patch(f"/{asset_id}", json=make_asset(1), headers={**headers, "If-Match": etag})
+    assert same.status_code == 200
+    assert same.headers["ETag"] == etag
+
+    changed = client.patch(f"/{asset_id}", json=make_asset(1, asset_name="Renamed"), headers=headers)
+    assert changed.headers["ETag"] == f'"{asset_id}.2"'
+    # The old ETag no longer gets a 304
+    assert client.get(f"/{asset_id}", headers={**headers, "If-None-Match": etag}).status_code == 200
+
+
+def test_update_with_stale_if_match_is_rejected(client, headers, make_asset):
+    asset_id, stale = create(client, headers, make_asset)
+    current = client.patch(f"/{asset_id}", json=make_asset(1, asset_name="Renamed"), headers=headers).headers["ETag"]
+
+    response = client.patch(f"/{asset_id}", json=make_asset(1, asset_name="Lost"), headers={**headers, "If-Match": stale})
+    assert response.status_code == 412
+    assert client.get(f"/{asset_id}", headers=headers).json()["asset_name"] == "Renamed"
+
+    response = client.patch(f"/{asset_id}", json=make_asset(1, asset_name="Kept"), headers={**headers, "If-Match": current})
+    assert response.status_code == 200
+    assert response.headers["ETag"] == f'"{asset_id}.3"'
+
+
+def test_delete_with_stale_if_match_is_rejected(client, headers, make_asset):
+    asset_id, stale = create(client, headers, make_asset)
+    current = client.patch(f"/{asset_id}", json=make_asset(1, asset_name="Renamed"), headers=headers).headers["ETag"]
+
+    assert client.delete(f"/{asset_id}", headers={**headers, "If-Match": stale}).status_code == 412
+    assert client.get(f"/{asset_id}", headers=headers).status_code == 200
+
+    assert client.delete(f"/{asset_id}", headers={**headers, "If-Match": current}).status_code == 200
+    assert client.get(f"/{asset_id}", headers=headers).status_code == 404
+
+
+def test_if_match_on_missing_asset_is_not_found(client, headers, make_asset):
+    response = client.patch("/AST9999", json=make_asset(1), headers={**headers, "If-Match": '"AST9999.1"'})
+    assert response.status_code == 404
+    assert client.delete("/AST9999", headers={**headers, "If-Match": '"AST9999.1"'}).status_code == 404
@@ -0,0 +1,142 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, delete, event, func, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, sessionmaker
+
+from app import AssetsCrud
+from app.AssetsCrud import AssetCRUD
+from app.id_allocator import AssetIdBlockAllocator
+from app.models.assets import Asset
+from app.models.base import Base
+from app.models.id_allocator import AssetIdAllocator
+from app.schemas.assets import AssetCreate
+
+CREATES = 2000
+WORKERS = 16
+
+
+@pytest.fixture
+def engine(tmp_path):
+    # A file database, so every thread gets its own connection, as workers would
+    engine = create_engine(f"sqlite:///{tmp_path / 'assets.db'}", connect_args={"timeout": 60})
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def allocator(monkeypatch):
+    # Small blocks, so the threads also race on reserving new ones
+    allocator = AssetIdBlockAllocator(block_size=10)
+    monkeypatch.setattr(AssetsCrud, "asset_id_allocator", allocator)
+    return allocator
+
+
+def new_asset(number: int) -> AssetCreate:
+    return AssetCreate(
+        asset_name=f"Monitor {number}",
+        value=Decimal("1200.50"),
+        purchase_date=date(2025, 1, 1),
+        manufacturer="Philips",
+        model="X1",
+        serial_number=f"SN-{number}",
+        supplier="Supplier",
+        warranty=12,
+        warranty_expiry=date.today() + timedelta(days=365),
+        facility_name=f"Facility {number % 5}",
+    )
+
+
+def test_parallel_creates_get_unique_ids(engine, allocator):
+    Session = sessionmaker(bind=engine)
+    integrity_errors = []
+
+    @event.listens_for(engine, "handle_error")
+    def count_integrity_errors(context):
+        if isinstance(context.sqlalchemy_exception, IntegrityError):
+            integrity_errors.append(context.sqlalchemy_exception)
+
+    def create(number: int) -> str:
+        with Session() as db:
+            return AssetCRUD.create_asset(db, new_asset(number)).asset_id
+
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        asset_ids = list(pool.map(create, range(CREATES)))
+
+    assert len(set(asset_ids)) == CREATES
+    assert all(asset_id.startswith("AST") and len(asset_id) >= 7 for asset_id in asset_ids)
+    assert not integrity_errors
+    with engine.connect() as conn:
+        assert conn.scalar(select(func.count()).select_from(Asset)) == CREATES
+
+
+def test_workers_reserve_disjoint_blocks(engine):
+    # Separate allocators stand in for separate worker processes
+    workers = [AssetIdBlockAllocator(block_size=25) for _ in range(4)]
+    Session = sessionmaker(bind=engine)
+
+    def reserve(worker: AssetIdBlockAllocator):
+        with Session() as db:
+            return [worker.next_id(db) for _ in range(250)]
+
+    with ThreadPoolExecutor(max_workers=len(workers)) as pool:
+        reserved = [asset_id for ids in pool.map(reserve, workers) for asset_id in ids]
+
+    assert len(reserved) == len(set(reserved)) == 1000
+
+
+def insert_assets(conn, asset_ids):
+    conn.execute(insert(Asset.__table__), [
+        dict(asset_id=asset_id, **new_asset(number).model_dump())
+        for number, asset_id in enumerate(asset_ids)
+    ])
+
+
+def test_released_id_is_assigned_next(engine):
+    allocator = AssetIdBlockAllocator(block_size=10)
+    with Session(engine) as db:
+        assert allocator.reserve(db, 3) == ["AST0001", "AST0002", "AST0003"]
+        allocator.release("AST0003")
+        allocator.release("AST0002")
+        assert allocator.reserve(db, 3) == ["AST0002", "AST0003", "AST0004"]
+
+
+def test_reserve_range_comes_after_reserved_blocks(engine):
+    allocator = AssetIdBlockAllocator(block_size=10)
+    with Session(engine) as db:
+        assert allocator.next_id(db) == "AST0001"
+        assert allocator.reserve_range(db, 5) == range(11, 16)
+        assert allocator.reserve_range(db, 0) == range(0)
+        # The range is not taken from this worker's block, nor handed to another
+        assert allocator.next_id(db) == "AST0002"
+        assert AssetIdBlockAllocator(block_size=10).next_id(db) == "AST0016"
+
+
+def test_create_all_seeds_after_existing_ids(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'existing.db'}")
+    Asset.__table__.create(engine)
+    with engine.begin() as conn:
+        insert_assets(conn, ["AST0041", "AST0007", "LEGACY-900"])
+
+    # Creating the allocator table next to existing assets seeds it past them
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        assert AssetIdBlockAllocator(block_size=10).next_id(db) == "AST0042"
+    engine.dispose()
+
+
+def test_missing_allocator_row_is_seeded(engine):
+    with engine.begin() as conn:
+        insert_assets(conn, ["AST0007"])
+        conn.execute(delete(AssetIdAllocator))
+
+    allocator = AssetIdBlockAllocator(block_size=10)
+    with Session(engine) as db:
+        assert allocator.next_id(db) == "AST0008"
+        assert allocator.reserve_range(db, 2) == range(18, 20)
+    with engine.connect() as conn:
+        assert conn.scalar(select(func.count()).select_from(AssetIdAllocator)) == 1
@@ -0,0 +1,51 @@
+import pytest
+from fastapi import HTTPException
+
+from app.AssetsCrud import AssetCRUD
+
+
+def test_cursor_round_trip():
+    cursor = AssetCRUD.encode_cursor(12345)
+    assert "=" not in cursor
+    assert AssetCRUD.decode_cursor(cursor) == 12345
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor!", "YWJj", "%%%"])
+def test_decode_rejects_invalid_cursor(cursor):
+    with pytest.raises(HTTPException) as error:
+        AssetCRUD.decode_cursor(cursor)
+    assert error.value.status_code == 400
+
+
+def test_pages_follow_next_cursor(client, headers, make_asset):
+    for number in range(5):
+        assert client.post("/addAsset", json=make_asset(number), headers=headers).status_code == 200
+
+    pages = []
+    response = client.get("/get/all", params={"limit": 2}, headers=headers)
+    while True:
+        assert response.status_code == 200
+        pages.append([asset["serial_number"] for asset in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        response = client.get("/get/all", params={"limit": 2, "cursor": cursor}, headers=headers)
+
+    assert pages == [["SN-0", "SN-1"], ["SN-2", "SN-3"], ["SN-4"]]
+
+
+def test_cursor_takes_precedence_over_skip(client, headers, make_asset):
+    for number in range(4):
+        client.post("/addAsset", json=make_asset(number), headers=headers)
+    first = client.get("/get/all", params={"limit": 2}, headers=headers)
+
+    response = client.get(
+        "/get/all", params={"limit": 2, "skip": 3, "cursor": first.headers["X-Next-Cursor"]}, headers=headers
+    )
+    assert [asset["serial_number"] for asset in response.json()] == ["SN-2", "SN-3"]
+
+
+def test_invalid_cursor_is_a_bad_request(client, headers):
+    response = client.get("/get/all", params={"cursor": "not a cursor!"}, headers=headers)
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid cursor"}
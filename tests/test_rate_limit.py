@@ -0,0 +1,73 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.middleware import rate_limit
+from app.middleware.rate_limit import InMemoryRateLimitBackend, RateLimitMiddleware, RedisRateLimitBackend
+
+WINDOW = 60
+
+
+@pytest.fixture(params=["memory", "redis"])
+def backend(request):
+    if request.param == "memory":
+        return InMemoryRateLimitBackend()
+    fakeredis = pytest.importorskip("fakeredis")
+    return RedisRateLimitBackend(fakeredis.FakeAsyncRedis())
+
+
+async def hits(backend, count, window_start, overlap, limit=10, key="user:alice:*"):
+    return [await backend.hit(key, window_start, WINDOW, overlap, limit) for _ in range(count)]
+
+
+@pytest.mark.anyio
+async def test_rejected_requests_are_not_counted(backend):
+    # Only the ten accepted requests count toward the window
+    assert await hits(backend, 13, 0, 1.0) == list(range(1, 11)) + [11, 11, 11]
+
+
+@pytest.mark.anyio
+async def test_previous_window_is_weighted_by_its_overlap(backend):
+    await hits(backend, 10, 0, 1.0)
+
+    # Half of the previous window still overlaps: 5 of its 10 requests count
+    assert await hits(backend, 6, WINDOW, 0.5) == [6, 7, 8, 9, 10, 11]
+    # Later in the window less of it counts, leaving room for more
+    assert await hits(backend, 3, WINDOW, 0.2) == [8, 9, 10]
+
+
+@pytest.mark.anyio
+async def test_older_windows_no_longer_count(backend):
+    await hits(backend, 10, 0, 1.0)
+    assert await hits(backend, 1, 2 * WINDOW, 1.0) == [1]
+
+
+@pytest.mark.anyio
+async def test_keys_are_counted_separately(backend):
+    await hits(backend, 10, 0, 1.0, key="user:alice:*")
+    assert await hits(backend, 1, 0, 1.0, key="user:bob:*") == [1]
+
+
+def test_middleware_lets_clients_back_in_after_rejections(monkeypatch):
+    app = FastAPI()
+    app.add_middleware(RateLimitMiddleware, requests_per_minute=2)
+
+    @app.get("/ping")
+    def ping():
+        return {"ok": True}
+
+    client = TestClient(app)
+    now = [10.0]
+    monkeypatch.setattr(rate_limit.time, "time", lambda: now[0])
+
+    statuses = [client.get("/ping").status_code for _ in range(10)]
+    assert statuses == [200, 200] + [429] * 8
+    assert client.get("/ping").headers["Retry-After"] == "51"
+
+    # Halfway into the next window one of the two accepted requests still
+    # counts; the eight rejected ones don't
+    now[0] = 90.0
+    first, second = client.get("/ping"), client.get("/ping")
+    assert first.status_code == 200
+    assert first.headers["X-RateLimit-Remaining"] == "0"
+    assert second.status_code == 429
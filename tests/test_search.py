@@ -0,0 +1,64 @@
+import pytest
+
+from app.search import trigrams
+
+
+@pytest.fixture
+def inventory(client, headers, make_asset):
+    assets = [
+        make_asset(1, asset_name="Patient Monitor", manufacturer="Philips", serial_number="PM-4471-A"),
+        make_asset(2, asset_name="Infusion Pump", manufacturer="Baxter", serial_number="IP-0098"),
+        make_asset(3, asset_name="Ultrasound Scanner", manufacturer="GE Healthcare", serial_number="US-4471-B",
+                   facility_name="Facility B"),
+        make_asset(4, asset_name="Defibrillator", manufacturer="Philips", serial_number="DF-1200", status="INACTIVE"),
+    ]
+    assert client.post("/addAssets", json=assets, headers=headers).json()["created"] == 4
+
+
+def search(client, headers, q, **params):
+    response = client.get("/search", params={"q": q, **params}, headers=headers)
+    assert response.status_code == 200
+    return [asset["serial_number"] for asset in response.json()]
+
+
+def test_trigrams():
+    assert trigrams("monitor") == ["ito", "mon", "nit", "oni", "tor"]
+    assert trigrams("ab") == []
+
+
+def test_word_prefixes(client, headers, inventory):
+    assert search(client, headers, "phil mon") == ["PM-4471-A"]
+    assert sorted(search(client, headers, "philips")) == ["DF-1200", "PM-4471-A"]
+
+
+def test_serial_number_substrings(client, headers, inventory):
+    assert sorted(search(client, headers, "4471")) == ["PM-4471-A", "US-4471-B"]
+    # The exact serial number comes first
+    assert search(client, headers, "US-4471-B")[0] == "US-4471-B"
+
+
+def test_misspelt_words_match_after_exact_ones(client, headers, inventory, make_asset):
+    assert search(client, headers, "moniter") == ["PM-4471-A"]
+    assert sorted(search(client, headers, "phillips")) == ["DF-1200", "PM-4471-A"]
+    assert search(client, headers, "ultrasond") == ["US-4471-B"]
+    assert search(client, headers, "xyzzy") == []
+
+    client.post("/addAsset", json=make_asset(5, asset_name="Monitors Cart", serial_number="MC-1"), headers=headers)
+    # An exact word prefix outranks a near miss
+    assert search(client, headers, "monitors") == ["MC-1", "PM-4471-A"]
+
+
+def test_filters_apply_to_every_kind_of_match(client, headers, inventory):
+    assert search(client, headers, "philips", status="ACTIVE") == ["PM-4471-A"]
+    assert search(client, headers, "4471", facility="Facility B") == ["US-4471-B"]
+    assert search(client, headers, "ultrasond", facility="Facility A") == []
+
+
+def test_search_follows_updates_and_deletes(client, headers, inventory, make_asset):
+    client.patch("/AST0002", json=make_asset(2, asset_name="Syringe Driver", serial_number="IP-0098"), headers=headers)
+    assert search(client, headers, "syringe") == ["IP-0098"]
+    assert search(client, headers, "infusion") == []
+
+    client.delete("/AST0002", headers=headers)
+    assert search(client, headers, "syringe") == []
+    assert search(client, headers, "syrynge") == []
@@ -0,0 +1,79 @@
+from datetime import date
+from decimal import Decimal
+
+from app.AssetsCrud import AssetCRUD
+from app.database import SessionLocal
+
+
+def add_inventory(client, headers, make_asset):
+    assets = [
+        make_asset(1, value="100.00", purchase_date="2025-01-10", warranty_expiry="2027-06-01"),
+        make_asset(2, value="300.00", purchase_date="2025-02-01", manufacturer="GE"),
+        make_asset(3, value="50.25", facility_name="Facility B", status="INACTIVE", manufacturer="GE"),
+    ]
+    assert client.post("/addAssets", json=assets, headers=headers).json()["created"] == 3
+
+
+def groups(stats):
+    return {
+        group["key"]: (group["count"], Decimal(group["total_value"]), Decimal(group["avg_value"]))
+        for group in stats["groups"]
+    }
+
+
+def test_stats_per_group(client, headers, make_asset):
+    add_inventory(client, headers, make_asset)
+
+    stats = client.get("/stats", headers=headers).json()
+    assert stats["group_by"] == "facility_name"
+    assert groups(stats) == {
+        "Facility A": (2, Decimal("400.00"), Decimal("200.00")),
+        "Facility B": (1, Decimal("50.25"), Decimal("50.25")),
+    }
+    totals = stats["totals"]
+    assert (totals["count"], Decimal(totals["total_value"]), Decimal(totals["avg_value"])) == (
+        3, Decimal("450.25"), Decimal("150.08")
+    )
+
+    by_month = client.get("/stats", params={"group_by": "purchase_month"}, headers=headers).json()
+    assert {key: value[0] for key, value in groups(by_month).items()} == {"2025-01": 2, "2025-02": 1}
+    by_status = client.get("/stats", params={"group_by": "status"}, headers=headers).json()
+    assert {key: value[0] for key, value in groups(by_status).items()} == {"ACTIVE": 2, "INACTIVE": 1}
+
+
+def test_stats_filters(client, headers, make_asset):
+    add_inventory(client, headers, make_asset)
+
+    stats = client.get("/stats", params={"group_by": "manufacturer", "status": "ACTIVE"}, headers=headers).json()
+    assert {key: value[0] for key, value in groups(stats).items()} == {"GE": 1, "Philips": 1}
+    stats = client.get("/stats", params={"facility": "Facility B"}, headers=headers).json()
+    assert stats["totals"]["count"] == 1
+    assert client.get("/stats", params={"status": "UNKNOWN"}, headers=headers).json()["groups"] == []
+
+
+def test_warranty_coverage(client, headers, make_asset):
+    add_inventory(client, headers, make_asset)
+
+    with SessionLocal() as db:
+        stats = AssetCRUD.compute_stats(db, "facility_name", today=date(2028, 1, 1))
+    facility_a = stats["groups"][0]
+    assert (facility_a["under_warranty"], facility_a["warranty_coverage"]) == (1, 0.5)
+    assert stats["totals"]["under_warranty"] == 2
+
+
+def test_writes_invalidate_cached_stats(client, headers, make_asset):
+    assert client.get("/stats", headers=headers).json()["totals"]["count"] == 0
+
+    asset_id = client.post("/addAsset", json=make_asset(1), headers=headers).json()["asset_id"]
+    assert groups(client.get("/stats", headers=headers).json()) == {
+        "Facility A": (1, Decimal("1200.50"), Decimal("1200.50")),
+    }
+
+    client.patch(f"/{asset_id}", json=make_asset(1, facility_name="Facility B"), headers=headers)
+    assert list(groups(client.get("/stats", headers=headers).json())) == ["Facility B"]
+
+    client.post("/addAssets", json=[make_asset(2)], headers=headers)
+    assert client.get("/stats", headers=headers).json()["totals"]["count"] == 2
+
+    client.delete(f"/{asset_id}", headers=headers)
+    assert list(groups(client.get("/stats", headers=headers).json())) == ["Facility A"]